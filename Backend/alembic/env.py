@@ -42,6 +42,7 @@ from app.models import user_exam_access  # noqa
 from app.models import result_announcement  # noqa
 from app.models import exam_schedule  # noqa
 from app.models import payment  # noqa
+from app.models import leaderboard_entry  # noqa
 from app.models import enums  # noqa - Import enums to ensure they're registered
 
 target_metadata = Base.metadata
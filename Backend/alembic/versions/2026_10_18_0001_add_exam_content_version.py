@@ -0,0 +1,29 @@
+"""add exam content_version
+
+Revision ID: 2026_10_18_0001
+Revises: 2026_03_06_0001
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0001'
+down_revision: Union[str, Sequence[str], None] = '2026_03_06_0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'Exam',
+        sa.Column('content_version', sa.Integer(), nullable=False, server_default='1'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('Exam', 'content_version')
@@ -0,0 +1,28 @@
+"""add result idempotency_key
+
+Revision ID: 2026_10_18_0002
+Revises: 2026_10_18_0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0002'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('Result', sa.Column('idempotency_key', sa.String(length=255), nullable=True))
+    op.create_unique_constraint('uq_result_idempotency_key', 'Result', ['idempotency_key'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_result_idempotency_key', 'Result', type_='unique')
+    op.drop_column('Result', 'idempotency_key')
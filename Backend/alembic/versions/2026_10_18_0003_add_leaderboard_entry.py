@@ -0,0 +1,52 @@
+"""add LeaderboardEntry table
+
+Revision ID: 2026_10_18_0003
+Revises: 2026_10_18_0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0003'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'LeaderboardEntry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('result_id', sa.Integer(), nullable=False),
+        sa.Column('mark', sa.DECIMAL(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['exam_id'], ['Exam.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['User.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exam_id', 'user_id', name='uq_leaderboard_entry_exam_user'),
+    )
+    op.create_index(op.f('ix_LeaderboardEntry_id'), 'LeaderboardEntry', ['id'], unique=False)
+    op.create_index('ix_leaderboard_entry_exam_mark', 'LeaderboardEntry', ['exam_id', 'mark'], unique=False)
+
+    # Backfill with each candidate's best existing attempt
+    op.execute(
+        """
+        INSERT INTO "LeaderboardEntry" (exam_id, user_id, result_id, mark, updated_at)
+        SELECT DISTINCT ON (exam_id, user_id) exam_id, user_id, id, mark, submission_time
+        FROM "Result"
+        ORDER BY exam_id, user_id, mark DESC, id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leaderboard_entry_exam_mark', table_name='LeaderboardEntry')
+    op.drop_index(op.f('ix_LeaderboardEntry_id'), table_name='LeaderboardEntry')
+    op.drop_table('LeaderboardEntry')
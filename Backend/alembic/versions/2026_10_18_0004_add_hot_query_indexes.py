@@ -0,0 +1,53 @@
+"""add indexes for hot query shapes
+
+Revision ID: 2026_10_18_0004
+Revises: 2026_10_18_0003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0004'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial WHERE clause)
+INDEXES = [
+    ('ix_result_exam_user_attempt', 'Result', ['exam_id', 'user_id', 'attempt_number'], None),
+    ('ix_result_user_id', 'Result', ['user_id'], None),
+    ('ix_answer_result_id', 'Answer', ['result_id'], None),
+    ('ix_answer_question_id', 'Answer', ['question_id'], None),
+    ('ix_answer_result_uploaded', 'Answer', ['result_id', 'id'], 'uploaded_file IS NOT NULL'),
+    ('ix_question_exam_id', 'Question', ['exam_id', 'id'], None),
+    ('ix_exam_course_active', 'Exam', ['course_id', 'is_active'], None),
+    ('ix_user_course_course_user', 'user_course', ['Course_id', 'User_id'], None),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; building without it would
+    # lock Result/Answer against writes for the length of the build.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,71 @@
+"""make (exam_id, user_id, attempt_number) unique on Result
+
+Revision ID: 2026_10_18_0005
+Revises: 2026_10_18_0004
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0005'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Double submits raced on the old read-then-insert; renumber the clashing
+    # attempts in submission order so the unique index can be built.
+    op.execute(
+        """
+        UPDATE "Result" AS r
+        SET attempt_number = renumbered.attempt_number
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY exam_id, user_id ORDER BY attempt_number, submission_time, id
+            ) AS attempt_number
+            FROM "Result"
+            WHERE (exam_id, user_id) IN (
+                SELECT exam_id, user_id FROM "Result"
+                GROUP BY exam_id, user_id
+                HAVING COUNT(*) > COUNT(DISTINCT attempt_number)
+            )
+        ) AS renumbered
+        WHERE r.id = renumbered.id AND r.attempt_number <> renumbered.attempt_number
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_result_exam_user_attempt',
+            'Result',
+            ['exam_id', 'user_id', 'attempt_number'],
+            unique=True,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.execute(
+        'ALTER TABLE "Result" ADD CONSTRAINT uq_result_exam_user_attempt '
+        'UNIQUE USING INDEX uq_result_exam_user_attempt'
+    )
+    # The constraint's index serves the same lookups as the plain one
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_result_exam_user_attempt', table_name='Result', if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_result_exam_user_attempt',
+            'Result',
+            ['exam_id', 'user_id', 'attempt_number'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_constraint('uq_result_exam_user_attempt', 'Result', type_='unique')
@@ -0,0 +1,45 @@
+"""add exam session lookup and sweeper indexes
+
+Revision ID: 2026_10_18_0006
+Revises: 2026_10_18_0005
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0006'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_exam_session_exam_user',
+            'ExamSession',
+            ['exam_id', 'user_id', 'id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_exam_session_open_deadline',
+            'ExamSession',
+            ['must_complete_by'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('is_active'),
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_exam_session_open_deadline', table_name='ExamSession', if_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_exam_session_exam_user', table_name='ExamSession', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""add autosaved draft answers to ExamSession
+
+Revision ID: 2026_10_18_0007
+Revises: 2026_10_18_0006
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0007'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ExamSession', sa.Column('draft_answers', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('ExamSession', sa.Column('draft_saved_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ExamSession', 'draft_saved_at')
+    op.drop_column('ExamSession', 'draft_answers')
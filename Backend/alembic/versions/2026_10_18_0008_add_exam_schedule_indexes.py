@@ -0,0 +1,55 @@
+"""add exam schedule lookup and pending transition indexes
+
+Revision ID: 2026_10_18_0008
+Revises: 2026_10_18_0007
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0008'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PENDING_INDEXES = [
+    ('ix_exam_schedule_pending_publish', 'publish_at', 'is_published IS NOT TRUE'),
+    ('ix_exam_schedule_pending_start', 'start_at', 'is_expired IS NOT TRUE'),
+    ('ix_exam_schedule_pending_end', 'end_at', 'is_expired IS NOT TRUE'),
+    ('ix_exam_schedule_pending_remove', 'auto_remove_at', 'is_removed IS NOT TRUE'),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_exam_schedule_exam_id',
+            'ExamSchedule',
+            ['exam_id', 'id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        for name, column, predicate in PENDING_INDEXES:
+            op.create_index(
+                name,
+                'ExamSchedule',
+                [column],
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(predicate),
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(PENDING_INDEXES):
+            op.drop_index(name, table_name='ExamSchedule', if_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_exam_schedule_exam_id', table_name='ExamSchedule', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""keep one ResultAnnouncement per exam and store its export path
+
+Revision ID: 2026_10_18_0009
+Revises: 2026_10_18_0008
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0009'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ResultAnnouncement', sa.Column('result_file_path', sa.Text(), nullable=True))
+    # Every re-announcement used to add a row; the latest one is the current announcement
+    op.execute(
+        """
+        DELETE FROM "ResultAnnouncement" AS a
+        USING "ResultAnnouncement" AS newer
+        WHERE newer.exam_id = a.exam_id AND newer.id > a.id
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_result_announcement_exam',
+            'ResultAnnouncement',
+            ['exam_id'],
+            unique=True,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.execute(
+        'ALTER TABLE "ResultAnnouncement" ADD CONSTRAINT uq_result_announcement_exam '
+        'UNIQUE USING INDEX uq_result_announcement_exam'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_result_announcement_exam', 'ResultAnnouncement', type_='unique')
+    op.drop_column('ResultAnnouncement', 'result_file_path')
@@ -0,0 +1,44 @@
+"""add DocxImportJob table
+
+Revision ID: 2026_10_18_0010
+Revises: 2026_10_18_0009
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_18_0010'
+down_revision: Union[str, Sequence[str], None] = '2026_10_18_0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'DocxImportJob',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('total_chunks', sa.Integer(), nullable=False),
+        sa.Column('parsed_chunks', sa.Integer(), nullable=False),
+        sa.Column('questions_parsed', sa.Integer(), nullable=False),
+        sa.Column('question_ids', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['exam_id'], ['Exam.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_docx_import_job_finished_at', 'DocxImportJob', ['finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_docx_import_job_finished_at', table_name='DocxImportJob')
+    op.drop_table('DocxImportJob')
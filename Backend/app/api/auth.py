@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, Form, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.lib.db import get_db
 from app.services.user_service import *
-from app.utils.hashing import verify_password
+from app.utils.hashing import verify_password_async
 from app.utils.jwt import create_token, get_current_user, _compute_expiry
 from app.schemas.user import UserResponse
 from app.schemas.auth import LoginRequest, TokenResponse, RegisterRequest
@@ -16,10 +16,12 @@ router = APIRouter(prefix="/api", tags=["Auth"])
 @router.post("/login", response_model=TokenResponse)
 async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
     try:
-        print("Login attempt for:", payload.email, "Password: ", payload.password)
+        print("Login attempt for:", payload.email)
         user = await get_user_by_email(db, payload.email)
+        # End the read transaction so the pooled connection is not held while bcrypt runs
+        await db.commit()
 
-        if not user or not verify_password(payload.password, user.password_hash):
+        if not user or not await verify_password_async(payload.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, 
                 detail="Invalid credentials"
@@ -63,7 +65,8 @@ async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
 async def login_docs(db: AsyncSession = Depends(get_db), username: str = Form(), password: str = Form()):
     try:
         user = await get_user_by_email(db, username)
-        if not user or not verify_password(password, user.password_hash):
+        await db.commit()
+        if not user or not await verify_password_async(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, 
                 detail="Invalid credentials"
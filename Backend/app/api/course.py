@@ -17,7 +17,7 @@ from app.schemas.user import UserResponse
 from app.schemas.auth import CourseEnrollmentRequest
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.lib.db import get_db
+from app.lib.db import get_db, get_read_db
 from app.utils.jwt import get_current_user
 from app.models.user import User
 from typing import Optional, List
@@ -32,7 +32,7 @@ router = APIRouter(
 # ✅ Make public - no authentication required
 @router.get("/", response_model=list[CourseResponse])
 async def get_all_courses(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all courses - public endpoint"""
     return await get_all_courses_service(db, user_id=None)
@@ -48,7 +48,7 @@ async def create_course(
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
-async def get_course(course_id: int, db: AsyncSession = Depends(get_db)):
+async def get_course(course_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get single course - public endpoint"""
     return await get_course_service(course_id, db)
 
@@ -56,14 +56,14 @@ async def get_course(course_id: int, db: AsyncSession = Depends(get_db)):
 @router.get("/{course_id}/exams", response_model=List[ExamResponse])
 async def get_course_exams(
     course_id: int, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all exams for a specific course - public endpoint"""
     return await get_course_exams_service(course_id, db)
 
 
 @router.get("/{course_id}/with-exams")
-async def get_course_with_exams(course_id: int, db: AsyncSession = Depends(get_db)):
+async def get_course_with_exams(course_id: int, db: AsyncSession = Depends(get_read_db)):
     return await get_course_service(course_id, db)
 
 
@@ -1,14 +1,14 @@
 # Backend/app/api/exam.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request
-from fastapi import Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Header
+from fastapi import Body, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Annotated
 import os
 import shutil
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Union
 from app.services.exam_service import (
     get_all_exams_service, 
     create_exam_service, 
@@ -24,13 +24,32 @@ from app.services.exam_service import (
     get_detailed_exam_result_service,
     get_detailed_exam_result_anonymous_service,
     check_exam_access_service,
+    start_exam_session_service,
+    upload_mcq_docx_to_exam_service,
 )
+from app.services.catalog_service import get_exam_catalog_service
+from app.services.docx_import_service import get_import_job
+from app.services.draft_service import get_draft_service, save_draft_service
+from app.services.schedule_service import get_exam_schedule_service, save_exam_schedule_service
+from app.services.paper_service import PAPER_ENCODINGS, get_exam_paper_service
+from app.services.leaderboard_service import get_leaderboard_service, get_leaderboard_standing_service
 from app.services.google_drive_service import google_drive_service
-from app.schemas.exam import ExamCreateRequest, ExamResponse, ExamUpdateRequest, MCQBulkRequest, QuestionCreateRequest
-from app.schemas.result import ResultResponse, ResultDetailedResponse, AnswerCreate, AnonymousExamSubmitRequest
+from app.schemas.exam import DocxImportJobResponse, ExamCreateRequest, ExamResponse, ExamSummaryResponse, ExamPaperResponse, ExamScheduleRequest, ExamScheduleResponse, ExamSessionResponse, ExamUpdateRequest, MCQBulkRequest, QuestionCreateRequest
+from app.schemas.result import (
+    ResultResponse,
+    ResultDetailedResponse,
+    AnswerCreate,
+    AnonymousExamSubmitRequest,
+    SubmissionAckResponse,
+    DraftSaveResponse,
+    DraftResponse,
+    LeaderboardResponse,
+    LeaderboardStandingResponse,
+)
 
-from app.lib.db import get_db
-from app.utils.jwt import get_current_user, decode_token
+from app.lib.db import get_db, get_read_db
+from app.utils.jwt import get_current_user, decode_token, load_principal
+from app.utils.http_cache import etag_matches, negotiate_encoding
 from app.models.user import User
 from app.schemas.question import QuestionResponse
 from sqlalchemy.orm import selectinload
@@ -71,8 +90,7 @@ async def get_optional_user(
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await load_principal(db, user_id, payload.get("iat"))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
@@ -87,13 +105,27 @@ router = APIRouter(
 # ✅ PUBLIC - Anyone can see exams
 @router.get("/", response_model=list[ExamResponse])
 async def get_all_exams(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     course_id: Optional[int] = Query(None)
 ):
     """Get all exams - public endpoint"""
     return await get_all_exams_service(db, user_id=None, course_id=course_id)
 
 
+@router.get("/catalog", response_model=list[ExamSummaryResponse])
+async def get_exam_catalog(
+    db: AsyncSession = Depends(get_read_db),
+    course_id: Optional[int] = Query(None),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    """Exam summaries without questions - public endpoint, supports conditional GET"""
+    page = await get_exam_catalog_service(db, course_id=course_id)
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, page.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+
 # ✅ ADMIN/MODERATOR only
 @router.post("/")
 async def create_exam(
@@ -200,10 +232,28 @@ async def add_mcq_bulk_to_exam(exam_id: int, question_request: MCQBulkRequest, d
 	res = await add_mcq_bulk_to_exam_service(db, exam_id, question_request)
 	return res
 
-@router.post("/{exam_id}/mcq-docx-upload", status_code=status.HTTP_201_CREATED, response_model=list[QuestionResponse])
-async def upload_exam_docx(exam_id: int, file: Annotated[UploadFile, File(...)], db: AsyncSession = Depends(get_db)):
-	res = await upload_mcq_docx_to_exam_service(db, exam_id, file)
-	return res
+# ✅ ADMIN/MODERATOR only - Import questions from a DOCX in the background
+@router.post("/{exam_id}/mcq-docx-upload", status_code=status.HTTP_202_ACCEPTED, response_model=DocxImportJobResponse)
+async def upload_exam_docx(
+    exam_id: int,
+    file: Annotated[UploadFile, File(...)],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["ADMIN", "MODERATOR"]))
+):
+    """Returns a job at once; poll it for progress and the created question ids"""
+    return await upload_mcq_docx_to_exam_service(db, exam_id, file)
+
+
+# ✅ ADMIN/MODERATOR only
+@router.get("/{exam_id}/mcq-docx-upload/{job_id}", response_model=DocxImportJobResponse)
+async def get_exam_docx_import(
+    exam_id: int,
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["ADMIN", "MODERATOR"]))
+):
+    """Status and progress of a DOCX import"""
+    return await get_import_job(db, exam_id, job_id)
 
 # ✅ ADMIN/MODERATOR only
 @router.post("/{exam_id}/mcq-bulk")
@@ -222,12 +272,31 @@ async def add_mcq_bulk_to_exam(
 @router.get("/{exam_id}", response_model=ExamResponse)
 async def get_exam(
     exam_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get exam details - public endpoint"""
     return await get_exam_service(exam_id, user_id=None, db=db)
 
 
+@router.get("/{exam_id}/paper", response_model=ExamPaperResponse)
+async def get_exam_paper(
+    exam_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    """Question paper without answers, served from pre-rendered (compressed) bytes - public endpoint"""
+    paper = await get_exam_paper_service(db, exam_id)
+    encoding = negotiate_encoding(accept_encoding, PAPER_ENCODINGS)
+    headers = {"ETag": paper.etag_for(encoding), "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(if_none_match, *paper.etags):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=paper.body(encoding), media_type="application/json", headers=headers)
+
+
 @router.get("/{exam_id}/access-check")
 async def check_exam_access(
     exam_id: int,
@@ -311,25 +380,90 @@ async def delete_question(
     return result
 
 
+# ✅ ADMIN/MODERATOR only - Publish, expire and remove the exam automatically
+@router.put("/{exam_id}/schedule", response_model=ExamScheduleResponse)
+async def save_exam_schedule(
+    exam_id: int,
+    schedule: ExamScheduleRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["ADMIN", "MODERATOR"]))
+):
+    """Create or replace the exam's schedule; the exam stays hidden until publish_at"""
+    return await save_exam_schedule_service(db, exam_id, schedule.model_dump())
+
+
+# ✅ ADMIN/MODERATOR only
+@router.get("/{exam_id}/schedule", response_model=ExamScheduleResponse)
+async def get_exam_schedule(
+    exam_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["ADMIN", "MODERATOR"]))
+):
+    """Current schedule and which transitions have happened"""
+    return await get_exam_schedule_service(db, exam_id)
+
+
+# ✅ AUTHENTICATED users only - Start (or resume) a timed session
+@router.post("/{exam_id}/start", response_model=ExamSessionResponse)
+async def start_exam(
+    exam_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Start the exam timer; submissions are checked against its deadline."""
+    return await start_exam_session_service(db, exam_id, current_user.id)
+
+
+# ✅ AUTHENTICATED users only - Autosave changed answers of the open session
+@router.put("/{exam_id}/draft", response_model=DraftSaveResponse)
+async def save_exam_draft(
+    exam_id: int,
+    answers: List[AnswerCreate],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Send only the answers that changed; a cleared answer has no option, text or file."""
+    return await save_draft_service(db, exam_id, current_user.id, answers)
+
+
+# ✅ AUTHENTICATED users only - Restore autosaved answers
+@router.get("/{exam_id}/draft", response_model=DraftResponse)
+async def get_exam_draft(
+    exam_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Autosaved answers of the open session"""
+    return await get_draft_service(db, exam_id, current_user.id)
+
+
 # ✅ AUTHENTICATED users only - Submit exam
-@router.post("/{exam_id}/submit", response_model=ResultResponse)
+@router.post("/{exam_id}/submit", response_model=Union[ResultDetailedResponse, ResultResponse, SubmissionAckResponse])
 async def submit_exam(
     exam_id: int,
     answers: List[AnswerCreate],
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=128),
+    include_answers: bool = Query(False, description="Re-read and return the stored answers")
 ):
-    """Submit exam answers"""
-    return await submit_exam_service(db, exam_id, current_user.id, answers)
+    """Submit exam answers. Retries carrying the same Idempotency-Key never create a new attempt."""
+    return await submit_exam_service(
+        db, exam_id, current_user.id, answers,
+        idempotency_key=idempotency_key,
+        include_answers=include_answers
+    )
 
 
 # ✅ PUBLIC - Anonymous submit (creates/fetches an anonymous user)
-@router.post("/{exam_id}/submit/anonymous", response_model=ResultResponse)
-@router.post("/{exam_id}/submit/anonymous/", response_model=ResultResponse)
+@router.post("/{exam_id}/submit/anonymous", response_model=Union[ResultDetailedResponse, ResultResponse, SubmissionAckResponse])
+@router.post("/{exam_id}/submit/anonymous/", response_model=Union[ResultDetailedResponse, ResultResponse, SubmissionAckResponse])
 async def submit_exam_anonymous(
     exam_id: int,
     payload: AnonymousExamSubmitRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=128),
+    include_answers: bool = Query(False, description="Re-read and return the stored answers")
 ):
     return await submit_exam_anonymous_service(
         db,
@@ -337,7 +471,9 @@ async def submit_exam_anonymous(
         name=payload.name,
         email=payload.email,
         active_mobile=payload.active_mobile,
-        answers=payload.answers
+        answers=payload.answers,
+        idempotency_key=idempotency_key,
+        include_answers=include_answers
     )
 
 
@@ -345,13 +481,35 @@ async def submit_exam_anonymous(
 @router.get("/{exam_id}/result/details", response_model=ResultDetailedResponse)
 async def get_detailed_exam_result(
     exam_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get detailed exam result"""
     return await get_detailed_exam_result_service(db, exam_id, current_user.id)
 
 
+# ✅ PUBLIC - Exam leaderboard (summary + top candidates)
+@router.get("/{exam_id}/leaderboard", response_model=LeaderboardResponse)
+async def get_exam_leaderboard(
+    exam_id: int,
+    top: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Top candidates with highest and average mark"""
+    return await get_leaderboard_service(db, exam_id, top=top)
+
+
+# ✅ AUTHENTICATED users only - Own rank and percentile
+@router.get("/{exam_id}/leaderboard/me", response_model=LeaderboardStandingResponse)
+async def get_my_leaderboard_standing(
+    exam_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Rank and percentile of the current user's best attempt"""
+    return await get_leaderboard_standing_service(db, exam_id, current_user.id)
+
+
 # ✅ PUBLIC - Get result for anonymous user by email
 @router.get("/{exam_id}/result/details/anonymous", response_model=ResultDetailedResponse)
 async def get_detailed_exam_result_anonymous(
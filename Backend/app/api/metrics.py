@@ -0,0 +1,24 @@
+# Backend/app/api/metrics.py
+from fastapi import APIRouter, Depends
+
+from app.lib.db import get_pool_metrics
+from app.models.user import User
+from app.utils.hashing import password_hash_pool
+from app.utils.jwt import require_admin
+
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["Metrics"]
+)
+
+
+@router.get("/password-hashing")
+async def get_password_hashing_metrics(current_user: User = Depends(require_admin)):
+    """Queue depth and throughput of this worker's password-hash pool"""
+    return password_hash_pool.stats()
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics(current_user: User = Depends(require_admin)):
+    """Checked-out/overflow connections and checkout wait times of this worker's pool"""
+    return get_pool_metrics()
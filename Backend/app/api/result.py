@@ -1,11 +1,14 @@
 from app.services import result_service
 from app.schemas import ResultResponse, ResultDetailedResponse
-from fastapi import APIRouter, Depends
-from app.lib.db import get_db
+from app.schemas.result import ResultAnnouncementResponse, ResultPageResponse
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from app.lib.db import get_db, get_read_db
 from app.utils.jwt import get_current_user, require_admin
 from app.models.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
 
 router = APIRouter(
@@ -16,26 +19,81 @@ router = APIRouter(
 
 @router.get("/", response_model=List[ResultResponse])
 async def get_all_results(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     # current_user: User = Depends(require_admin)
 ):
     return await result_service.get_all_results_service(db)
 
 
 
+@router.get("/page", response_model=ResultPageResponse)
+async def get_results_page(
+    limit: int = Query(50, ge=1, le=500),
+    before_id: Optional[int] = Query(None, description="next_cursor of the previous page"),
+    exam_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    include_answers: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    """Keyset-paginated results, newest first"""
+    return await result_service.get_results_page_service(
+        db, limit, before_id, exam_id, user_id, submitted_from, submitted_to, include_answers
+    )
+
+
+@router.get("/stream")
+async def stream_results(
+    exam_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    include_answers: bool = False,
+    current_user: User = Depends(require_admin)
+):
+    """All matching results as newline-delimited JSON, newest first"""
+    return StreamingResponse(
+        result_service.stream_results_service(exam_id, user_id, submitted_from, submitted_to, include_answers),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.get("/for-student", response_model=List[ResultResponse])
 async def get_results_for_student(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     return await result_service.get_all_results_service(db, detailed=True, current_user=current_user)
 
 
 
+@router.post("/announce/{exam_id}", response_model=ResultAnnouncementResponse)
+async def announce_exam_results(
+    exam_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Rank all results of an exam, publish them and export a CSV"""
+    return await result_service.announce_exam_results_service(db, exam_id, current_user.id)
+
+
+@router.get("/announce/{exam_id}/export")
+async def download_exam_results_export(
+    exam_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """CSV exported by the exam's announcement"""
+    path = await result_service.get_result_export_service(db, exam_id)
+    return FileResponse(path, media_type="text/csv", filename=f"exam_{exam_id}_results.csv")
+
+
 @router.get("/{result_id}", response_model=ResultResponse)
 async def get_result(
     result_id: int, 
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     # current_user: User = Depends(get_current_user)
 ):
 	return await result_service.get_result_service(result_id, db)
@@ -44,7 +102,7 @@ async def get_result(
 @router.get("/{result_id}/detailed", response_model=ResultDetailedResponse)
 async def get_result_detailed(
     result_id: int, 
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     # current_user: User = Depends(get_current_user)
 ):
 	return await result_service.get_result_service(result_id, db, detailed=True)
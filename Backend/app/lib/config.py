@@ -5,6 +5,17 @@ from typing import List, Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DB_POOL_PROFILE: str = "api"  # api | worker | bulk-import (see POOL_PROFILES in app/lib/db.py)
+    # Optional overrides of the selected profile
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[float] = None
+    DB_POOL_RECYCLE: Optional[int] = None
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = None
+    DB_PREPARED_STATEMENT_CACHE_SIZE: Optional[int] = None
+    # Optional read replica for read-only endpoints (same pool profile as the primary)
+    DATABASE_READ_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 10.0  # after a write, the client's reads stay on the primary this long (via a cookie/header)
         
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173,http://alokbortikaedu.com:3000,http://alokbortikaedu.com"
@@ -30,6 +41,73 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads/questions"  # ✅ CHANGED: Relative to Backend root
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5MB in bytes
     ALLOWED_IMAGE_EXTENSIONS: List[str] = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
+    RESULT_EXPORT_DIR: str = "uploads/results"  # Announcement CSVs (unguessable names; downloaded through the admin API)
+    # ========================================================================
+    
+    # ========================================================================
+    # In-process caches (per worker; validated against DB version columns)
+    # ========================================================================
+    ANSWER_KEY_CACHE_SIZE: int = 256  # compiled answer keys, one per exam
+    PRINCIPAL_CACHE_SIZE: int = 10000  # authenticated users, keyed by (user id, token iat)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 10.0  # upper bound for role/ban changes made through other workers
+    LEADERBOARD_CACHE_SIZE: int = 32  # in-memory exam leaderboards
+    LEADERBOARD_REFRESH_SECONDS: float = 5.0  # reload from LeaderboardEntry to see other workers' results
+    EXAM_CATALOG_CACHE_SIZE: int = 64  # serialized public catalog pages, one per course filter
+    EXAM_PAPER_CACHE_SIZE: int = 64  # pre-rendered (and pre-compressed) question papers
+    EXAM_PAPER_VERSION_CHECK_SECONDS: float = 2.0  # how long a paper is served before re-checking content_version
+    # ========================================================================
+
+    # ========================================================================
+    # Password hashing (bcrypt runs on a bounded thread pool, off the event loop)
+    # ========================================================================
+    PASSWORD_HASH_WORKERS: int = 4  # concurrent bcrypt operations per worker process; 0 = inline
+    PASSWORD_HASH_MAX_PENDING: int = 64  # queued operations beyond this are rejected with 503
+    # ========================================================================
+    
+    # ========================================================================
+    # Submission ingest (write-behind) mode
+    # When enabled, /submit grades in memory, acknowledges with a provisional
+    # score and a background writer batches Results/Answers into the database.
+    # ========================================================================
+    SUBMISSION_INGEST_MODE: bool = False
+    SUBMISSION_QUEUE_PATH: str = "var/submission_queue.sqlite3"  # Relative to Backend root
+    SUBMISSION_FLUSH_INTERVAL_SECONDS: float = 1.0
+    SUBMISSION_FLUSH_BATCH_SIZE: int = 500
+    SUBMISSION_QUEUE_RETENTION_HOURS: int = 24  # how long flushed keys still dedupe retries
+    SUBMISSION_CLAIM_TIMEOUT_SECONDS: float = 300.0  # rows claimed by a writer that died go back to pending after this
+    SUBMISSION_MAX_ATTEMPTS: int = 5  # a row that keeps failing while the database is up is marked failed after this
+    # Answer rows per submission: "values" (multi-row INSERT via insertmanyvalues), "copy" (asyncpg COPY) or "orm"
+    ANSWER_BULK_INSERT_METHOD: str = "values"
+    # ========================================================================
+
+    # ========================================================================
+    # Exam sessions (server-side deadlines)
+    # ========================================================================
+    EXAM_SESSION_REQUIRED: bool = False  # reject submits without a started session
+    EXAM_SESSION_GRACE_SECONDS: int = 30  # slack past must_complete_by for submits in flight
+    EXAM_SESSION_SWEEP_INTERVAL_SECONDS: float = 5.0  # 0 disables the sweeper on this worker
+    EXAM_SESSION_SWEEP_BATCH_SIZE: int = 500
+    EXAM_DRAFT_FLUSH_INTERVAL_SECONDS: float = 0.1  # saves within this window share one UPDATE; a save returns once written
+    EXAM_DRAFT_FLUSH_BATCH_SIZE: int = 1000  # sessions per UPDATE
+    EXAM_DRAFT_MAX_ANSWERS: int = 500  # per session, bounds the buffered draft size
+    # ========================================================================
+
+    # ========================================================================
+    # Exam scheduling (ExamSchedule publish / expire / remove)
+    # ========================================================================
+    EXAM_SCHEDULER_ENABLED: bool = True
+    EXAM_SCHEDULER_HORIZON_SECONDS: int = 3600  # transitions due this far ahead are kept in memory
+    EXAM_SCHEDULER_PREWARM_SECONDS: int = 120  # papers and answer keys are built this long before start_at
+    # ========================================================================
+
+    # ========================================================================
+    # DOCX question import (process pool)
+    # ========================================================================
+    DOCX_IMPORT_WORKERS: int = 0  # pool processes; 0 = one per CPU
+    DOCX_IMPORT_CHUNK_QUESTIONS: int = 25  # questions parsed per pool task
+    DOCX_IMPORT_MAX_BYTES: int = 50 * 1024 * 1024
+    DOCX_IMPORT_JOB_RETENTION_SECONDS: int = 3600  # finished jobs stay pollable this long
+    DOCX_IMPORT_JOB_TIMEOUT_SECONDS: int = 1800  # unfinished jobs older than this were lost with their worker
     # ========================================================================
     
     # ========================================================================
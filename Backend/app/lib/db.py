@@ -1,10 +1,18 @@
 # lib/db.py
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
 from app.lib.config import settings
 
+from dataclasses import dataclass, replace
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+import math
 import os
+import time
 
 def sanitize_db_url(url: str) -> str:
     """Strip sslmode and other incompatible params for asyncpg."""
@@ -29,16 +37,129 @@ def sanitize_db_url(url: str) -> str:
     new_url = urlunparse(parsed._replace(query=new_query))
     return new_url
 
+@dataclass(frozen=True)
+class PoolProfile:
+    """Connection pool and statement cache settings for one kind of process."""
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float  # seconds to wait for a free connection before failing
+    pool_recycle: int  # seconds before a connection is replaced
+    statement_cache_size: int  # asyncpg's per-connection statement cache (0 behind pgbouncer)
+    prepared_statement_cache_size: int  # SQLAlchemy's per-connection prepared statement cache
+
+
+# Per process, so Postgres needs (pool_size + max_overflow) x processes connections.
+# The api profile keeps 4 uvicorn workers at 60 connections, well under the default
+# max_connections of 100, leaving room for a worker and an import job.
+POOL_PROFILES = {
+    "api": PoolProfile(pool_size=10, max_overflow=5, pool_timeout=10, pool_recycle=1800,
+                       statement_cache_size=100, prepared_statement_cache_size=256),
+    "worker": PoolProfile(pool_size=3, max_overflow=2, pool_timeout=30, pool_recycle=1800,
+                          statement_cache_size=100, prepared_statement_cache_size=100),
+    "bulk-import": PoolProfile(pool_size=2, max_overflow=0, pool_timeout=60, pool_recycle=3600,
+                               statement_cache_size=0, prepared_statement_cache_size=0),
+}
+
+
+def resolve_pool_profile() -> PoolProfile:
+    """The profile named by DB_POOL_PROFILE, with any DB_* overrides from Settings applied."""
+    if settings.DB_POOL_PROFILE not in POOL_PROFILES:
+        raise ValueError(
+            f"Unknown DB_POOL_PROFILE {settings.DB_POOL_PROFILE!r}; expected one of {sorted(POOL_PROFILES)}"
+        )
+    overrides = {
+        field: getattr(settings, f"DB_{field.upper()}")
+        for field in PoolProfile.__dataclass_fields__
+        if getattr(settings, f"DB_{field.upper()}") is not None
+    }
+    return replace(POOL_PROFILES[settings.DB_POOL_PROFILE], **overrides)
+
+
+class PoolStats:
+    """Connection checkout wait times, recorded by InstrumentedQueuePool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout took (queue wait plus connecting)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        pool_stats.record(time.perf_counter() - started)
+        return connection
+
+
+pool_profile = resolve_pool_profile()
+
+
+def _create_engine(url: str, poolclass=InstrumentedQueuePool):
+    return create_async_engine(
+        sanitize_db_url(url),
+        echo= False, # settings.ENVIRONMENT == "development",
+        future=True,
+        poolclass=poolclass,
+        pool_pre_ping=True,
+        pool_size=pool_profile.pool_size,
+        max_overflow=pool_profile.max_overflow,
+        pool_timeout=pool_profile.pool_timeout,
+        pool_recycle=pool_profile.pool_recycle,
+        connect_args={
+            "statement_cache_size": pool_profile.statement_cache_size,
+            "prepared_statement_cache_size": pool_profile.prepared_statement_cache_size,
+        },
+    )
+
+
 # Create async engine with sanitized URL
-engine = create_async_engine(
-    sanitize_db_url(settings.DATABASE_URL),
-    echo= False, # settings.ENVIRONMENT == "development",
-    future=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+engine = _create_engine(settings.DATABASE_URL)
+
+# Optional read replica; checkout metrics are only recorded for the primary
+read_engine = (
+    _create_engine(settings.DATABASE_READ_URL, poolclass=AsyncAdaptedQueuePool)
+    if settings.DATABASE_READ_URL
+    else None
 )
 
+
+def get_pool_metrics() -> dict:
+    """Snapshot of this process's connection pool."""
+    pool = engine.pool
+    return {
+        "profile": settings.DB_POOL_PROFILE,
+        "pool_size": pool.size(),
+        "max_overflow": pool_profile.max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "avg_wait_ms": round(1000 * pool_stats.wait_seconds_total / pool_stats.checkouts, 3) if pool_stats.checkouts else 0.0,
+        "max_wait_ms": round(1000 * pool_stats.wait_seconds_max, 3),
+        "replica": None if read_engine is None else {
+            "pool_size": read_engine.pool.size(),
+            "checked_out": read_engine.pool.checkedout(),
+            "overflow": max(read_engine.pool.overflow(), 0),
+        },
+    }
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -48,18 +169,114 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Sessions for read-only endpoints: the replica when configured, otherwise the primary
+ReadSessionLocal = async_sessionmaker(
+    read_engine or engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
 
+# ---------------------------------------------------------------------------
+# Read-your-writes: a response to a request that wrote carries the write time
+# in a short-lived cookie and header. Reads that send it back within
+# READ_YOUR_WRITES_SECONDS go to the primary, so nobody sees replica lag on
+# their own submission or edit, whichever worker serves the read. A forged
+# value only moves that client's reads to the primary.
+# ---------------------------------------------------------------------------
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+def _session_wrote(session: AsyncSession) -> bool:
+    # Pending changes count too: get_db commits them after the response has started
+    return bool(session.info.get("has_writes") or session.new or session.dirty or session.deleted)
+
+
+class ReadYourWritesMiddleware:
+    """Stamp responses of requests whose database session wrote with the write time."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sessions = []
+        scope.setdefault("state", {})["db_sessions"] = sessions
+
+        async def send_with_stamp(message):
+            if message["type"] == "http.response.start" and any(_session_wrote(s) for s in sessions):
+                stamp = f"{time.time():.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{LAST_WRITE_COOKIE}={stamp}; Max-Age={math.ceil(settings.READ_YOUR_WRITES_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+                headers.append(LAST_WRITE_HEADER, stamp)
+            await send(message)
+
+        await self.app(scope, receive, send_with_stamp)
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the client's last write (cookie or header) is within READ_YOUR_WRITES_SECONDS."""
+    stamp = request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER)
+    try:
+        return time.time() - float(stamp) < settings.READ_YOUR_WRITES_SECONDS
+    except (TypeError, ValueError):
+        return False
+
+
 # Dependency to get DB session
-async def get_db():
+async def get_db(request: Request):
+    """Yield a request session.
+
+    The session checks out a connection only when the request first runs a
+    statement, so requests answered from in-process caches never touch the
+    pool; commit/rollback are skipped when no transaction was started.
+    """
     async with AsyncSessionLocal() as session:
+        request_sessions = getattr(request.state, "db_sessions", None)
+        if request_sessions is not None:
+            request_sessions.append(session)
         try:
             yield session
-            await session.commit()
+            if session.in_transaction():
+                await session.commit()
         except Exception:
-            await session.rollback()
+            if session.in_transaction():
+                await session.rollback()
             raise
         finally:
             await session.close()
+
+
+async def get_read_db(request: Request):
+    """Yield a session for read-only endpoints; it is never committed.
+
+    Uses the read replica when one is configured, except for clients that wrote
+    within READ_YOUR_WRITES_SECONDS, whose reads stay on the primary.
+    """
+    use_primary = read_engine is None or wrote_recently(request)
+    async with (AsyncSessionLocal if use_primary else ReadSessionLocal)() as session:
+        yield session
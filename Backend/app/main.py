@@ -3,14 +3,17 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+import asyncio
 import logging
 import os
 from pathlib import Path
+from typing import Optional
 
 load_dotenv()
 
 from app.api import upload
 from app.lib.config import settings
+from app.lib.db import LAST_WRITE_HEADER, ReadYourWritesMiddleware
 import logging
 from fastapi.staticfiles import StaticFiles
 import shutil
@@ -35,7 +38,9 @@ app.add_middleware(
     allow_credentials=settings.ALLOWED_CREDENTIALS,
     allow_methods=settings.ALLOWED_METHODS,
     allow_headers=settings.ALLOWED_HEADERS,
+    expose_headers=[LAST_WRITE_HEADER],
 )
+app.add_middleware(ReadYourWritesMiddleware)
 
 from app.api import (
     test_router,
@@ -43,10 +48,64 @@ from app.api import (
     exam_router,
     course_router,
     user_router,
-    result_router
+    result_router,
+    metrics_router,
 )
 
 
+_background_stop = asyncio.Event()
+_ingest_writer: Optional[asyncio.Task] = None
+_session_sweeper: Optional[asyncio.Task] = None
+_draft_flusher: Optional[asyncio.Task] = None
+_exam_scheduler: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_submission_writer():
+    global _ingest_writer
+    if settings.SUBMISSION_INGEST_MODE:
+        from app.services.submission_ingest import run_submission_writer
+        _ingest_writer = asyncio.create_task(run_submission_writer(_background_stop))
+
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    global _session_sweeper
+    if settings.EXAM_SESSION_SWEEP_INTERVAL_SECONDS > 0:
+        from app.services.session_service import run_session_sweeper
+        _session_sweeper = asyncio.create_task(run_session_sweeper(_background_stop))
+
+
+@app.on_event("startup")
+async def start_draft_flusher():
+    global _draft_flusher
+    from app.services.draft_service import run_draft_flusher
+    _draft_flusher = asyncio.create_task(run_draft_flusher(_background_stop))
+
+
+@app.on_event("startup")
+async def start_exam_scheduler():
+    global _exam_scheduler
+    if settings.EXAM_SCHEDULER_ENABLED:
+        from app.services.schedule_service import run_exam_scheduler
+        _exam_scheduler = asyncio.create_task(run_exam_scheduler(_background_stop))
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    _background_stop.set()
+    if _ingest_writer is not None:
+        await _ingest_writer
+    if _session_sweeper is not None:
+        await _session_sweeper
+    if _draft_flusher is not None:
+        await _draft_flusher
+    if _exam_scheduler is not None:
+        await _exam_scheduler
+    from app.services.docx_import_service import shutdown_import_pool
+    shutdown_import_pool()
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Exam System API!"}
@@ -58,6 +117,7 @@ app.include_router(exam_router)
 app.include_router(course_router)
 app.include_router(user_router)
 app.include_router(result_router)
+app.include_router(metrics_router)
 app.include_router(upload.router)  # ✅ No prefix needed - already in router
 
 # ✅ Mount static files AFTER including routers
@@ -17,6 +17,8 @@ from app.models.result_announcement import ResultAnnouncement
 from app.models.exam_schedule import ExamSchedule
 from app.models.payment import Payment
 from app.models.admission_request import AdmissionRequest
+from app.models.leaderboard_entry import LeaderboardEntry
+from app.models.docx_import_job import DocxImportJob
 
 # Enums - import from enums.py  
 from app.models.enums import (
@@ -48,6 +50,8 @@ __all__ = [
     "ResultAnnouncement",
     "ExamSchedule",
     "Payment",
+    "LeaderboardEntry",
+    "DocxImportJob",
     
     # Enums (Python - Pydantic schemas er jonno)
     "UserRole",
@@ -1,11 +1,17 @@
 # app/models/answer.py
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DECIMAL, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DECIMAL, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from app.lib.db import Base
 
 class Answer(Base):
     __tablename__ = "Answer"
+    __table_args__ = (
+        Index("ix_answer_result_id", "result_id"),
+        Index("ix_answer_question_id", "question_id"),
+        # Written uploads only: the written_submission_file lookup per result
+        Index("ix_answer_result_uploaded", "result_id", "id", postgresql_where=text("uploaded_file IS NOT NULL")),
+    )
     id = Column(Integer, primary_key=True, index=True)
     question_id = Column(Integer, ForeignKey("Question.id"))
     exam_id = Column(Integer, ForeignKey("Exam.id"))
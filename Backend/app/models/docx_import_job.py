@@ -0,0 +1,45 @@
+# models/docx_import_job.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from app.lib.db import Base
+from datetime import datetime
+
+QUEUED = "queued"
+PARSING = "parsing"
+SAVING = "saving"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class DocxImportJob(Base):
+    """Status of a background DOCX question import, readable from any worker."""
+    __tablename__ = "DocxImportJob"
+    __table_args__ = (
+        # Pruning of finished jobs
+        Index("ix_docx_import_job_finished_at", "finished_at"),
+    )
+
+    id = Column(String(32), primary_key=True)
+    exam_id = Column(Integer, ForeignKey("Exam.id", ondelete="CASCADE"), nullable=False)
+    filename = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default=QUEUED)
+    total_chunks = Column(Integer, nullable=False, default=0)
+    parsed_chunks = Column(Integer, nullable=False, default=0)
+    questions_parsed = Column(Integer, nullable=False, default=0)
+    question_ids = Column(JSONB, nullable=False, default=list)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def job_id(self) -> str:
+        return self.id
+
+    @property
+    def progress(self) -> float:
+        if self.status == COMPLETED:
+            return 1.0
+        if not self.total_chunks:
+            return 0.0
+        # Saving is the last step, so parsing fills at most 95%
+        return round(0.95 * self.parsed_chunks / self.total_chunks, 3)
@@ -1,11 +1,14 @@
 # Backend/app/models/exam.py
-from sqlalchemy import Column, Integer, String, Text, Date, DECIMAL, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, DECIMAL, ForeignKey, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.lib.db import Base 
 from datetime import datetime
 
 class Exam(Base):
     __tablename__ = "Exam"
+    __table_args__ = (
+        Index("ix_exam_course_active", "course_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -29,6 +32,9 @@ class Exam(Base):
     result_announcement_time = Column(DateTime, nullable=True)
     auto_remove_after_days = Column(Integer, nullable=True, default=30)  # auto remove
 
+    # Bumped whenever questions or marking change; cached answer keys compare against it
+    content_version = Column(Integer, nullable=False, default=1, server_default="1")
+
     deleted_at = Column(DateTime, nullable=True)  # soft delete
     is_deleted = Column(Boolean, default=False)
 
@@ -1,12 +1,21 @@
 # models/exam_schedule.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, Text, Index, text
 from sqlalchemy.orm import relationship
 from app.lib.db import Base
 from datetime import datetime
 
 class ExamSchedule(Base):
     __tablename__ = "ExamSchedule"
-    
+    __table_args__ = (
+        # Schedule of an exam
+        Index("ix_exam_schedule_exam_id", "exam_id", "id"),
+        # Scheduler: transitions still pending, by due time
+        Index("ix_exam_schedule_pending_publish", "publish_at", postgresql_where=text("is_published IS NOT TRUE")),
+        Index("ix_exam_schedule_pending_start", "start_at", postgresql_where=text("is_expired IS NOT TRUE")),
+        Index("ix_exam_schedule_pending_end", "end_at", postgresql_where=text("is_expired IS NOT TRUE")),
+        Index("ix_exam_schedule_pending_remove", "auto_remove_at", postgresql_where=text("is_removed IS NOT TRUE")),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     exam_id = Column(Integer, ForeignKey("Exam.id"), nullable=False)
     
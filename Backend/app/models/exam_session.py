@@ -1,12 +1,19 @@
 # models/exam_session.py
-from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from app.lib.db import Base
 from datetime import datetime
 
 class ExamSession(Base):
     __tablename__ = "ExamSession"
-    
+    __table_args__ = (
+        # Latest session of a user for an exam
+        Index("ix_exam_session_exam_user", "exam_id", "user_id", "id"),
+        # Sweeper: open sessions by deadline
+        Index("ix_exam_session_open_deadline", "must_complete_by", postgresql_where=text("is_active")),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("User.id"), nullable=False)
     exam_id = Column(Integer, ForeignKey("Exam.id"), nullable=False)
@@ -21,6 +28,10 @@ class ExamSession(Base):
     is_submitted = Column(Boolean, default=False)
     is_auto_submitted = Column(Boolean, default=False)
     is_abandoned = Column(Boolean, default=False)  # incomplete session
+
+    # Autosaved answers: {"<question_id>": {selected_option, submitted_answer_text, uploaded_file} | null}
+    draft_answers = Column(JSONB, nullable=True)
+    draft_saved_at = Column(DateTime, nullable=True)
     
     # Relationships
     user = relationship("User", backref="exam_sessions")
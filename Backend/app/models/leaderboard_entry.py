@@ -0,0 +1,21 @@
+# models/leaderboard_entry.py
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, DECIMAL, Index, UniqueConstraint
+from app.lib.db import Base
+from datetime import datetime
+
+class LeaderboardEntry(Base):
+    """Best mark of each candidate per exam, maintained as results arrive."""
+    __tablename__ = "LeaderboardEntry"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "user_id", name="uq_leaderboard_entry_exam_user"),
+        Index("ix_leaderboard_entry_exam_mark", "exam_id", "mark"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("Exam.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("User.id"), nullable=False)
+    
+    # Best attempt (no FK: deleting a Result re-derives the entry afterwards)
+    result_id = Column(Integer, nullable=False)
+    mark = Column(DECIMAL, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,11 +1,15 @@
 # Backend/app/models/question.py
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, DECIMAL, Text
+from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, DECIMAL, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from app.lib.db import Base
 
 class Question(Base):
     __tablename__ = "Question"
+    __table_args__ = (
+        # Questions of an exam in id order (papers, answer keys, counts)
+        Index("ix_question_exam_id", "exam_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     q_type = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
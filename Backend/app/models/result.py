@@ -1,5 +1,5 @@
 # app/models/result.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from app.lib.db import Base
@@ -7,6 +7,13 @@ from datetime import datetime
 
 class Result(Base):
     __tablename__ = "Result"
+    __table_args__ = (
+        UniqueConstraint("idempotency_key", name="uq_result_idempotency_key"),
+        # One row per attempt; also serves "latest attempt" lookups (backward scan for DESC)
+        UniqueConstraint("exam_id", "user_id", "attempt_number", name="uq_result_exam_user_attempt"),
+        # A student's result history
+        Index("ix_result_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     correct_answers = Column(Integer, nullable=False)
@@ -21,6 +28,7 @@ class Result(Base):
     announced_at = Column(DateTime, nullable=True)
     course_id = Column(Integer, ForeignKey("Course.id"), nullable=True)
     session_id = Column(Integer, ForeignKey("ExamSession.id"), nullable=True)
+    idempotency_key = Column(String(255), nullable=True)  # "<user_id>:<exam_id>:<client key>"
 
 
 
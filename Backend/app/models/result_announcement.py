@@ -1,11 +1,14 @@
 # models/result_announcement.py
-from sqlalchemy import DECIMAL, Column, Integer, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import DECIMAL, Column, Integer, DateTime, ForeignKey, Text, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.lib.db import Base
 from datetime import datetime
 
 class ResultAnnouncement(Base):
     __tablename__ = "ResultAnnouncement"
+    __table_args__ = (
+        UniqueConstraint("exam_id", name="uq_result_announcement_exam"),  # re-announcing replaces it
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     exam_id = Column(Integer, ForeignKey("Exam.id"), nullable=False)
@@ -18,6 +21,7 @@ class ResultAnnouncement(Base):
     
     # File export
     result_file_url = Column(Text, nullable=True)  # CSV/Excel download link
+    result_file_path = Column(Text, nullable=True)  # export file under RESULT_EXPORT_DIR; never served statically
     
     # Admin tracking
     announced_by = Column(Integer, ForeignKey("User.id"), nullable=False)
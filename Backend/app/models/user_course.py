@@ -1,5 +1,5 @@
 # app/models/user_course.py
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from app.lib.db import Base
 
@@ -7,5 +7,7 @@ user_course = Table(
     "user_course", 
     Base.metadata,
     Column("User_id", Integer, ForeignKey("User.id"), primary_key=True),
-    Column("Course_id", Integer, ForeignKey("Course.id"), primary_key=True)
+    Column("Course_id", Integer, ForeignKey("Course.id"), primary_key=True),
+    # The primary key (User_id, Course_id) serves enrollment checks; this serves course rosters
+    Index("ix_user_course_course_user", "Course_id", "User_id"),
 )
\ No newline at end of file
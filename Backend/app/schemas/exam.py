@@ -1,7 +1,7 @@
 # Backend/app/schemas/exam.py
 from pydantic import BaseModel, Field, validator, root_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime, timezone
 from decimal import Decimal
 from .question import QuestionCreateRequest
 
@@ -116,6 +116,117 @@ class ExamResponse(BaseModel):
         return data
 
 
+class ExamSummaryResponse(BaseModel):
+    """Catalog entry: exam metadata without questions or answers."""
+    id: int
+    title: str
+    description: Optional[str] = None
+    start_time: datetime
+    end_time: date
+    duration_minutes: int
+    mark: Decimal
+    minus_mark: Decimal
+    course_id: Optional[int] = None
+    course_title: Optional[str] = None
+    is_mcq: Optional[bool] = True
+    exam_type: str
+    is_active: Optional[bool] = True
+    allow_multiple_attempts: Optional[bool] = False
+    show_detailed_results_after: Optional[datetime] = None
+    price: Optional[Decimal] = None
+    is_free: Optional[bool] = False
+    question_count: int = 0
+
+    class Config:
+        from_attributes = True
+
+
+class PaperQuestionResponse(BaseModel):
+    """Question as delivered to candidates: no answer key."""
+    id: int
+    q_type: str
+    content: str
+    image_url: Optional[str] = None
+    second_image_url: Optional[str] = None
+    description: Optional[str] = None
+    option_a: Optional[str] = None
+    option_b: Optional[str] = None
+    option_c: Optional[str] = None
+    option_d: Optional[str] = None
+    option_a_image_url: Optional[str] = None
+    option_b_image_url: Optional[str] = None
+    option_c_image_url: Optional[str] = None
+    option_d_image_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ExamPaperResponse(ExamSummaryResponse):
+    """Pre-rendered question paper of one exam version."""
+    content_version: int
+    questions: List[PaperQuestionResponse] = []
+
+
+class ExamSessionResponse(BaseModel):
+    """A candidate's timed session; submissions after must_complete_by are rejected."""
+    id: int
+    exam_id: int
+    user_id: int
+    started_at: datetime
+    must_complete_by: datetime
+    remaining_seconds: int
+
+
+class DocxImportJobResponse(BaseModel):
+    """Background DOCX import; status is queued, parsing, saving, completed or failed."""
+    job_id: str
+    exam_id: int
+    filename: str
+    status: str
+    progress: float
+    total_chunks: int
+    parsed_chunks: int
+    questions_parsed: int
+    question_ids: List[int] = []
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ExamScheduleRequest(BaseModel):
+    """Times are UTC; auto_remove_at defaults to end_at + the exam's auto_remove_after_days."""
+    publish_at: Optional[datetime] = None
+    start_at: datetime
+    end_at: datetime
+    auto_remove_at: Optional[datetime] = None
+
+    @validator('publish_at', 'start_at', 'end_at', 'auto_remove_at')
+    def to_naive_utc(cls, v):
+        # Stored columns are naive UTC
+        if v is not None and v.tzinfo is not None:
+            v = v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+
+class ExamScheduleResponse(BaseModel):
+    id: int
+    exam_id: int
+    publish_at: Optional[datetime] = None
+    start_at: datetime
+    end_at: datetime
+    auto_remove_at: Optional[datetime] = None
+    is_published: bool
+    is_expired: bool
+    is_removed: bool
+
+    class Config:
+        from_attributes = True
+
+
 class ExamUpdateRequest(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
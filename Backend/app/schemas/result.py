@@ -32,6 +32,19 @@ class AnswerCreate(BaseModel):
     uploaded_file: Optional[str] = None # For written answers
 
 
+class DraftSaveResponse(BaseModel):
+    session_id: int
+    saved: int
+    remaining_seconds: int
+
+
+class DraftResponse(BaseModel):
+    """Autosaved answers of an exam session."""
+    session_id: int
+    answers: List[AnswerCreate] = []
+    remaining_seconds: int
+
+
 class AnswerResponse(BaseModel):
     id: int
     question_id: int
@@ -74,6 +87,67 @@ class ResultResponse(BaseModel):
         from_attributes = True
 
 
+class SubmissionAckResponse(BaseModel):
+    """Provisional acknowledgement returned when submissions are ingested write-behind."""
+    idempotency_key: str
+    exam_id: int
+    user_id: int
+    correct_answers: int
+    incorrect_answers: int
+    mark: float
+    submission_time: datetime
+    status: str = "queued"
+
+
+class LeaderboardEntryResponse(BaseModel):
+    rank: int
+    user_id: int
+    name: str
+    mark: float
+
+
+class LeaderboardResponse(BaseModel):
+    exam_id: int
+    total_candidates: int
+    highest_mark: Optional[float] = None
+    average_mark: Optional[float] = None
+    entries: List[LeaderboardEntryResponse] = Field(default_factory=list)
+
+
+class LeaderboardStandingResponse(BaseModel):
+    exam_id: int
+    user_id: int
+    mark: float
+    rank: int
+    percentile: float
+    total_candidates: int
+
+
+class ResultAnnouncementResponse(BaseModel):
+    id: int
+    exam_id: int
+    announced_at: datetime
+    total_students: int
+    highest_marks: Optional[float] = None
+    average_marks: Optional[float] = None
+    result_file_url: Optional[str] = None
+    announced_by: int
+    is_published: bool
+
+    class Config:
+        from_attributes = True
+
+
+class ResultListItemResponse(ResultResponse):
+    """Admin listing row; answers are only present when requested."""
+    answers_details: Optional[List[AnswerResponse]] = None
+
+
+class ResultPageResponse(BaseModel):
+    items: List[ResultListItemResponse] = Field(default_factory=list)
+    next_cursor: Optional[int] = None  # pass as ``before_id`` to fetch the next page
+
+
 class AdminResultResponse(BaseModel):
     id: int
     exam_id: int
@@ -0,0 +1,102 @@
+# Backend/app/services/catalog_service.py
+"""
+Public exam catalog.
+
+The catalog is a summary projection of Exam (plus course title and question
+count) that never touches question text or answers. Each worker caches the
+serialized JSON per course filter together with its strong ETag, so repeat
+requests cost one small aggregate over Exam and, for matching If-None-Match
+headers, no body at all.
+
+Cached entries are tagged with a fingerprint of the Exam table (row count,
+highest id, sum of content_version). Exam and question mutations, and
+course updates (for the course title), bump content_version, so edits made
+through any worker change the fingerprint; mutations through this worker
+also drop the cache directly.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lib.cache import LRUCache
+from app.lib.config import settings
+from app.models import Course, Exam
+from app.models.question import Question
+from app.schemas.exam import ExamSummaryResponse
+
+
+@dataclass(frozen=True)
+class CatalogPage:
+    """Serialized catalog body and its strong validator."""
+    fingerprint: Tuple[int, int, int]
+    body: bytes
+    etag: str
+
+
+_catalog_adapter = TypeAdapter(List[ExamSummaryResponse])
+
+# One entry per course_id filter (None = whole catalog)
+_catalog_cache = LRUCache(maxsize=settings.EXAM_CATALOG_CACHE_SIZE)
+
+
+def invalidate_exam_catalog() -> None:
+    """Drop this worker's cached catalog pages."""
+    _catalog_cache.clear()
+
+
+async def _catalog_fingerprint(db: AsyncSession) -> Tuple[int, int, int]:
+    row = (await db.execute(
+        select(
+            func.count(Exam.id),
+            func.coalesce(func.max(Exam.id), 0),
+            func.coalesce(func.sum(Exam.content_version), 0),
+        )
+    )).one()
+    return tuple(int(value) for value in row)
+
+
+async def _build_catalog(db: AsyncSession, course_id: Optional[int], fingerprint) -> CatalogPage:
+    question_counts = (
+        select(Question.exam_id, func.count(Question.id).label("question_count"))
+        .group_by(Question.exam_id)
+        .subquery()
+    )
+    # LIVE exams first, newest first - same order as get_all_exams_service
+    priority_order = case((Exam.exam_type == "LIVE", 0), else_=1)
+    query = (
+        select(
+            Exam.id, Exam.title, Exam.description, Exam.start_time, Exam.end_time, Exam.duration_minutes,
+            Exam.mark, Exam.minus_mark, Exam.course_id, Course.title.label("course_title"), Exam.is_mcq,
+            Exam.exam_type, Exam.is_active, Exam.allow_multiple_attempts, Exam.show_detailed_results_after,
+            Exam.price, Exam.is_free,
+            func.coalesce(question_counts.c.question_count, 0).label("question_count"),
+        )
+        .outerjoin(Course, Course.id == Exam.course_id)
+        .outerjoin(question_counts, question_counts.c.exam_id == Exam.id)
+        .order_by(priority_order, Exam.id.desc())
+    )
+    if course_id is not None:
+        query = query.where(Exam.course_id == course_id)
+
+    rows = (await db.execute(query)).mappings().all()
+    body = _catalog_adapter.dump_json([ExamSummaryResponse.model_validate(dict(row)) for row in rows])
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return CatalogPage(fingerprint=fingerprint, body=body, etag=etag)
+
+
+async def get_exam_catalog_service(db: AsyncSession, course_id: Optional[int] = None) -> CatalogPage:
+    """Return the catalog page for ``course_id``, rebuilding it only when exams changed."""
+    fingerprint = await _catalog_fingerprint(db)
+    page = _catalog_cache.get(course_id)
+    if page is not None and page.fingerprint == fingerprint:
+        return page
+
+    page = await _build_catalog(db, course_id, fingerprint)
+    _catalog_cache.set(course_id, page)
+    return page
+
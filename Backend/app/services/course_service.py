@@ -1,6 +1,6 @@
 # Backend/app/services/course_service.py
 from app.models import Course, UserCourseRelation, Exam, User
-from sqlalchemy import select, join, or_, delete
+from sqlalchemy import select, join, or_, delete, update
 from app.schemas import (
     CourseCreate, 
     CourseUpdate
@@ -9,6 +9,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
+from app.services.catalog_service import invalidate_exam_catalog
+from app.services.paper_service import invalidate_exam_paper
 
 
 async def get_all_courses_service(db: AsyncSession, user_id: Optional[int]) -> List[Course]:
@@ -81,8 +83,18 @@ async def update_course_service(course_id: int, course_update: CourseUpdate, db:
     update_data = course_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(course, field, value)
-    
+    # Catalog entries and papers carry the course title; a new content_version
+    # makes every worker rebuild them, this one drops them right away
+    await db.execute(
+        update(Exam)
+        .where(Exam.course_id == course_id)
+        .values(content_version=Exam.content_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
     await db.commit()
+    invalidate_exam_catalog()
+    invalidate_exam_paper()
     await db.refresh(course)
     return course
 
@@ -0,0 +1,186 @@
+# Backend/app/services/docx_import_service.py
+"""
+Background DOCX question import.
+
+Parsing a Word file (lxml traversal, OMML to LaTeX, image extraction) is
+CPU-bound, so it runs in a process pool instead of on the event loop. A scan
+splits the document into chunks of DOCX_IMPORT_CHUNK_QUESTIONS questions at
+"==" boundaries; the chunks are parsed in parallel and the questions are
+inserted in document order once all chunks are done, so an import adds
+either every question or none.
+
+Job status is kept in the DocxImportJob table, so a poll can land on any
+worker; the parsing runs on the worker that accepted the upload. Jobs left
+unfinished past DOCX_IMPORT_JOB_TIMEOUT_SECONDS (their worker restarted) are
+marked failed when the next import starts.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from docx.opc.exceptions import PackageNotFoundError
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lib.config import settings
+from app.lib.db import AsyncSessionLocal
+from app.models import DocxImportJob, Exam
+from app.models.docx_import_job import COMPLETED, FAILED, PARSING, SAVING
+from app.models.question import Question
+from app.schemas.question import QuestionCreateRequest
+from app.services.catalog_service import invalidate_exam_catalog
+from app.services.grading_service import invalidate_answer_key
+from app.services.paper_service import invalidate_exam_paper
+from app.utils.docx_to_questions import DocxChunk, parse_docx_chunk, scan_question_chunks
+
+_pool: Optional[ProcessPoolExecutor] = None
+_running: Set[asyncio.Task] = set()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: pool processes must not inherit the event loop or open database connections
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.DOCX_IMPORT_WORKERS or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_import_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# Pool tasks are referenced through this module: a fresh pool process then imports
+# app.lib before app.models, the order the package imports need
+
+def _scan_in_pool(file_path: str) -> List[DocxChunk]:
+    return scan_question_chunks(file_path, settings.DOCX_IMPORT_CHUNK_QUESTIONS)
+
+
+def _parse_in_pool(file_path: str, chunk: DocxChunk) -> List[QuestionCreateRequest]:
+    return parse_docx_chunk(file_path, chunk)
+
+
+async def _update_job(job_id: str, **values) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(DocxImportJob).where(DocxImportJob.id == job_id).values(**values))
+        await db.commit()
+
+
+async def get_import_job(db: AsyncSession, exam_id: int, job_id: str) -> DocxImportJob:
+    job = await db.get(DocxImportJob, job_id)
+    if job is None or job.exam_id != exam_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return job
+
+
+async def insert_imported_questions(exam_id: int, questions: List[QuestionCreateRequest]) -> List[int]:
+    """Insert parsed questions in order in one transaction; return their ids."""
+    if not questions:
+        return []
+    rows = [
+        {
+            "exam_id": exam_id,
+            "q_type": question.q_type,
+            "content": question.content,
+            "image_url": question.image_url,
+            "second_image_url": question.second_image_url,
+            "description": question.description,
+            "option_a": question.option_a,
+            "option_b": question.option_b,
+            "option_c": question.option_c,
+            "option_d": question.option_d,
+            "option_a_image_url": question.option_a_image_url,
+            "option_b_image_url": question.option_b_image_url,
+            "option_c_image_url": question.option_c_image_url,
+            "option_d_image_url": question.option_d_image_url,
+            "answer": question.answer or None,
+        }
+        for question in questions
+    ]
+    async with AsyncSessionLocal() as db:
+        inserted = await db.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), rows)
+        question_ids = list(inserted.scalars().all())
+        await db.execute(
+            update(Exam)
+            .where(Exam.id == exam_id)
+            .values(content_version=Exam.content_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    invalidate_answer_key(exam_id)
+    invalidate_exam_paper(exam_id)
+    invalidate_exam_catalog()
+    return question_ids
+
+
+async def _run_import(job_id: str, exam_id: int, file_path: str) -> None:
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        await _update_job(job_id, status=PARSING)
+        chunks = await loop.run_in_executor(pool, _scan_in_pool, file_path)
+        await _update_job(job_id, total_chunks=len(chunks))
+        parsing = [loop.run_in_executor(pool, _parse_in_pool, file_path, chunk) for chunk in chunks]
+        for parsed_chunks, done in enumerate(asyncio.as_completed(parsing), start=1):
+            await done
+            await _update_job(job_id, parsed_chunks=parsed_chunks)
+
+        questions = [question for future in parsing for question in future.result()]
+        await _update_job(job_id, status=SAVING, questions_parsed=len(questions))
+        question_ids = await insert_imported_questions(exam_id, questions)
+        await _update_job(job_id, status=COMPLETED, question_ids=question_ids, finished_at=datetime.utcnow())
+    except PackageNotFoundError:
+        await _update_job(job_id, status=FAILED, error="File is not a valid DOCX document", finished_at=datetime.utcnow())
+    except Exception as e:
+        print(f"[docx-import] Job {job_id} for exam {exam_id} failed: {e}")
+        if isinstance(e, BrokenProcessPool) and _pool is pool:
+            shutdown_import_pool()  # the next job starts a fresh pool
+        await _update_job(job_id, status=FAILED, error=str(e) or type(e).__name__, finished_at=datetime.utcnow())
+    finally:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+
+async def start_docx_import(exam_id: int, filename: str, content: bytes) -> DocxImportJob:
+    """Save an uploaded DOCX, record its job and start importing it in the background."""
+    job = DocxImportJob(id=uuid.uuid4().hex, exam_id=exam_id, filename=filename)
+    # Committed before the task starts, so the job is pollable as soon as it is returned
+    async with AsyncSessionLocal() as db:
+        now = datetime.utcnow()
+        retention = timedelta(seconds=settings.DOCX_IMPORT_JOB_RETENTION_SECONDS)
+        await db.execute(delete(DocxImportJob).where(DocxImportJob.finished_at < now - retention))
+        # A worker that restarted mid-import never finishes its job; fail it so polls stop
+        timeout = timedelta(seconds=settings.DOCX_IMPORT_JOB_TIMEOUT_SECONDS)
+        await db.execute(
+            update(DocxImportJob)
+            .where(DocxImportJob.finished_at.is_(None), DocxImportJob.created_at < now - timeout)
+            .values(status=FAILED, error="Import was interrupted", finished_at=now)
+        )
+        db.add(job)
+        await db.commit()
+
+    # Outside uploads/, which is served publicly
+    fd, file_path = tempfile.mkstemp(prefix=f"docx-import-{job.id}-", suffix=".docx")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+
+    task = asyncio.create_task(_run_import(job.id, exam_id, file_path))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return job
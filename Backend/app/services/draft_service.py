@@ -0,0 +1,261 @@
+# Backend/app/services/draft_service.py
+"""
+Autosaved answer drafts for exam sessions.
+
+Candidates send changed answers as they go. Changes are buffered per session
+in memory, where repeated edits of the same question collapse into one entry,
+and a background flusher merges the buffered changes of every session into
+ExamSession.draft_answers with one UPDATE per batch of sessions. Merging with
+jsonb || (instead of overwriting) keeps drafts correct when a candidate's
+requests are spread over several workers.
+
+A save returns once the flush that carries it has committed (a group
+commit), so a saved draft is in the database whichever worker later
+submits or auto-submits the session. Saves arriving within one flush
+interval share the UPDATE. A submit (or the sweeper's auto-submit) grades
+the stored draft plus any changes still buffered on its own worker, so the
+final submit request can be empty.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, bindparam, cast, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lib.config import settings
+from app.lib.db import AsyncSessionLocal
+from app.models import Exam, ExamSession
+from app.schemas.result import AnswerCreate
+from app.services.grading_service import get_answer_key, grade_submission
+from app.services.session_service import ActiveSession, get_indexed_session, is_expired, load_latest_session
+from app.services.submission_ingest import build_idempotency_key, persist_graded_submissions
+
+DraftPatch = Dict[str, Optional[dict]]  # question id (as a JSON key) -> answer fields, None = cleared
+
+_pending: Dict[int, DraftPatch] = {}  # session id -> changes not yet flushed
+_next_flush: Optional[asyncio.Future] = None  # resolved when the changes now in _pending are written
+
+
+def _draft_entry(answer: AnswerCreate) -> Optional[dict]:
+    if answer.selected_option is None and not answer.submitted_answer_text and not answer.uploaded_file:
+        return None
+    return {
+        "selected_option": answer.selected_option,
+        "submitted_answer_text": answer.submitted_answer_text,
+        "uploaded_file": answer.uploaded_file,
+    }
+
+
+def merge_draft(*patches: Optional[DraftPatch]) -> List[AnswerCreate]:
+    """Apply patches in order (later wins) and return the answers left standing."""
+    merged: DraftPatch = {}
+    for patch in patches:
+        if patch:
+            merged.update(patch)
+    return [
+        AnswerCreate(question_id=int(question_id), **entry)
+        for question_id, entry in merged.items()
+        if entry is not None
+    ]
+
+
+def pending_draft(session_id: int) -> DraftPatch:
+    return _pending.get(session_id, {})
+
+
+def discard_draft(session_id: int) -> None:
+    _pending.pop(session_id, None)
+
+
+async def load_stored_draft(db: AsyncSession, session_id: int) -> DraftPatch:
+    stored = await db.execute(select(ExamSession.draft_answers).where(ExamSession.id == session_id))
+    return stored.scalar() or {}
+
+
+async def _require_open_session(db: AsyncSession, exam_id: int, user_id: int) -> ActiveSession:
+    exam_session = get_indexed_session(exam_id, user_id)
+    if exam_session is None:
+        await load_latest_session(db, exam_id, user_id)
+        exam_session = get_indexed_session(exam_id, user_id)
+    if exam_session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No exam session in progress")
+    if is_expired(exam_session):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Time is up for this exam")
+    return exam_session
+
+
+def _wait_for_flush() -> asyncio.Future:
+    global _next_flush
+    if _next_flush is None:
+        _next_flush = asyncio.get_running_loop().create_future()
+    # Shielded: a disconnecting client must not cancel the flush other saves wait on
+    return asyncio.shield(_next_flush)
+
+
+async def save_draft_service(db: AsyncSession, exam_id: int, user_id: int, answers: List[AnswerCreate]) -> dict:
+    """Buffer changed answers for the user's open session; return once the next flush has written them."""
+    exam_session = await _require_open_session(db, exam_id, user_id)
+    patch = _pending.setdefault(exam_session.id, {})
+    if len(patch.keys() | {str(answer.question_id) for answer in answers}) > settings.EXAM_DRAFT_MAX_ANSWERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too many answers in draft")
+    for answer in answers:
+        patch[str(answer.question_id)] = _draft_entry(answer)
+    await _wait_for_flush()
+    return {"session_id": exam_session.id, "saved": len(answers), "remaining_seconds": exam_session.remaining_seconds()}
+
+
+async def get_draft_service(db: AsyncSession, exam_id: int, user_id: int) -> dict:
+    """Return the user's current draft, e.g. to restore answers after a reconnect."""
+    exam_session = await _require_open_session(db, exam_id, user_id)
+    stored = await load_stored_draft(db, exam_session.id)
+    return {
+        "session_id": exam_session.id,
+        "answers": merge_draft(stored, pending_draft(exam_session.id)),
+        "remaining_seconds": exam_session.remaining_seconds(),
+    }
+
+
+# The whole batch travels as one JSONB object {session id: patch}, so the statement
+# text never changes and stays in the compiled and prepared statement caches
+_patches = func.jsonb_each(bindparam("patches", type_=JSONB)).table_valued("key", "value")
+_FLUSH_STATEMENT = (
+    update(ExamSession)
+    .where(ExamSession.id == cast(_patches.c.key, Integer), ExamSession.is_active == True)
+    .values(
+        draft_answers=func.coalesce(ExamSession.draft_answers, cast({}, JSONB)).op("||")(_patches.c.value),
+        draft_saved_at=bindparam("saved_at"),
+    )
+    .execution_options(synchronize_session=False)
+)
+
+
+async def flush_drafts(limit: Optional[int] = None) -> int:
+    """Write buffered changes to the database; return how many sessions were flushed.
+
+    Saves waiting on this flush are released once it is done. If a batch
+    fails they get a 503, and its changes are kept for the next flush.
+    """
+    global _next_flush
+    # Swap the buffer out without awaiting, so edits made during the writes go to a fresh one
+    taken = list(_pending.items())
+    _pending.clear()
+    waiting, _next_flush = _next_flush, None
+
+    batch_size = limit or settings.EXAM_DRAFT_FLUSH_BATCH_SIZE
+    flushed, failed = 0, False
+    for start in range(0, len(taken), batch_size):
+        chunk = taken[start:start + batch_size]
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(_FLUSH_STATEMENT, {"patches": dict(chunk), "saved_at": datetime.utcnow()})
+                await db.commit()
+            flushed += len(chunk)
+        except Exception as e:
+            print(f"[drafts] Flush of {len(chunk)} drafts failed: {e}")
+            failed = True
+            # Put the changes back under any newer edits made meanwhile
+            for session_id, patch in chunk:
+                _pending[session_id] = {**patch, **_pending.get(session_id, {})}
+
+    if waiting is not None:
+        if failed:
+            waiting.set_exception(HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Draft could not be saved, please retry"
+            ))
+        else:
+            waiting.set_result(flushed)
+    return flushed
+
+
+async def run_draft_flusher(stop: asyncio.Event) -> None:
+    """Flush drafts every EXAM_DRAFT_FLUSH_INTERVAL_SECONDS until ``stop`` is set, then once more."""
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.EXAM_DRAFT_FLUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        if _pending or _next_flush is not None:
+            await flush_drafts()
+
+
+async def auto_submit_drafts(db: AsyncSession, closed: Sequence[Tuple[int, int, int, datetime, Optional[DraftPatch]]]) -> int:
+    """Grade the drafts of sessions the sweeper closed in this transaction, then commit.
+
+    ``closed`` holds (session id, exam id, user id, deadline, stored draft).
+    Results go through the batched ingest writer; sessions without any
+    answers are marked abandoned instead. Returns how many Results were written.
+    """
+    drafts, abandoned = [], []
+    for session_id, exam_id, user_id, deadline, stored in closed:
+        # Buffered changes are dropped only once the Results are committed
+        answers = merge_draft(stored, _pending.get(session_id))
+        if answers:
+            drafts.append((session_id, exam_id, user_id, deadline, answers))
+        else:
+            abandoned.append(session_id)
+
+    exam_ids = {exam_id for _, exam_id, _, _, _ in drafts}
+    exams = {
+        exam.id: exam
+        for exam in (await db.execute(select(Exam).where(Exam.id.in_(exam_ids)))).scalars()
+    } if exam_ids else {}
+
+    graded = []
+    for session_id, exam_id, user_id, deadline, answers in drafts:
+        answer_key = await get_answer_key(db, exams[exam_id])
+        # A written question saved without text or file counts as unanswered rather than failing the batch
+        answers = [
+            a for a in answers
+            if a.question_id in answer_key.entries
+            and (answer_key.entries[a.question_id].q_type == "MCQ" or a.submitted_answer_text or a.uploaded_file)
+        ]
+        outcome = grade_submission(answer_key, answers)
+        graded.append({
+            "idempotency_key": build_idempotency_key(user_id, exam_id, f"auto-{session_id}"),
+            "exam_id": exam_id,
+            "user_id": user_id,
+            "correct_answers": outcome.correct_answers,
+            "incorrect_answers": outcome.incorrect_answers,
+            "mark": outcome.mark,
+            "submission_time": deadline.isoformat(),
+            "session_id": session_id,
+            "answer_rows": outcome.answer_rows,
+        })
+
+    if abandoned:
+        await db.execute(
+            update(ExamSession)
+            .where(ExamSession.id.in_(abandoned))
+            .values(is_abandoned=True)
+            .execution_options(synchronize_session=False)
+        )
+    if graded:
+        await persist_graded_submissions(db, graded)  # commits
+    else:
+        await db.commit()
+    for session_id, *_ in closed:
+        _pending.pop(session_id, None)
+    return len(graded)
+
+
+async def close_failed_session(session_id: int) -> None:
+    """Close a session whose draft could not be graded, keeping the draft (with buffered changes) stored."""
+    patch = _pending.get(session_id) or {}
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ExamSession)
+            .where(ExamSession.id == session_id, ExamSession.is_active == True)
+            .values(
+                is_active=False,
+                is_auto_submitted=True,
+                completed_at=ExamSession.must_complete_by,
+                draft_answers=func.coalesce(ExamSession.draft_answers, cast({}, JSONB)).op("||")(cast(patch, JSONB)),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    _pending.pop(session_id, None)
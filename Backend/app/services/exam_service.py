@@ -1,4 +1,4 @@
-from app.models import Exam, Course, UserCourseRelation, Result, Answer
+from app.models import Exam, Course, UserCourseRelation, Result, Answer, User, ExamSession
 from app.models.question import Question
 from app.utils.google_drive import validate_and_convert_image_url, convert_google_drive_url
 from app.schemas.exam import (
@@ -10,31 +10,62 @@ from app.schemas.exam import (
 from app.schemas.result import ResultCreate, ResultDetailedResponse # Corrected import path
 from app.schemas.question import QuestionResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, case
+from sqlalchemy import select, func, case, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
-from fastapi import HTTPException, status
-from typing import List, Optional
+from fastapi import HTTPException, UploadFile, status
+from typing import List, Optional, Union
 from datetime import datetime
-from app.services.user_service import create_or_get_anonymous_user, get_user_by_email
+from app.lib.config import settings
+from app.services.user_service import upsert_anonymous_user, get_user_by_email
+from app.services.grading_service import (
+    GradingOutcome,
+    get_answer_key,
+    grade_submission,
+    invalidate_answer_key,
+    resolve_correct_option_index,
+)
+from app.services.result_service import insert_answer_rows
+from app.services.catalog_service import invalidate_exam_catalog
+from app.services.paper_service import invalidate_exam_paper
+from app.services.leaderboard_service import apply_to_cached_leaderboards, upsert_leaderboard_entries
+from app.services.docx_import_service import DocxImportJob, start_docx_import
+from app.services.draft_service import discard_draft, load_stored_draft, merge_draft, pending_draft
+from app.services.session_service import (
+    ActiveSession,
+    check_submission_deadline,
+    forget_session,
+    get_indexed_session,
+    is_expired,
+    latest_session_id,
+    load_latest_session,
+    lock_session_for_submit,
+    mark_session_submitted,
+    open_session,
+)
+from app.services.submission_ingest import (
+    build_idempotency_key,
+    enqueue_submission,
+    get_queued_submission,
+)
+
+
+# Inserts retried when a concurrent submit takes the same attempt number
+ATTEMPT_ALLOCATION_RETRIES = 5
 
 
 def _resolve_correct_option_index(question: Question) -> Optional[int]:
     """Return 0-based correct option index from the Question.answer letter/number field."""
-    if question.answer:
-        letter = str(question.answer).strip().upper()
-        letter_map = {"A": 0, "B": 1, "C": 2, "D": 3}
-        if letter in letter_map:
-            return letter_map[letter]
-        # Allow numeric strings (1-4) just in case
-        if letter.isdigit():
-            try:
-                numeric = int(letter)
-                if 1 <= numeric <= 4:
-                    return numeric - 1
-            except ValueError:
-                pass
+    return resolve_correct_option_index(question.answer)
+
 
-    return None
+def _bump_content_version(exam: Exam) -> None:
+    """Mark an exam's questions/marking as changed so cached answer keys, papers and the catalog get rebuilt."""
+    # SQL-side increment so concurrent edits never end up sharing a version
+    exam.content_version = Exam.content_version + 1
+    invalidate_answer_key(exam.id)
+    invalidate_exam_paper(exam.id)
+    invalidate_exam_catalog()
 
 
 async def get_all_exams_service(db: AsyncSession, user_id: Optional[int], course_id: Optional[int] = None) -> List[Exam]:
@@ -96,11 +127,30 @@ async def add_mcq_bulk_to_exam_service(
         )
         db.add(question_obj)
     
+    _bump_content_version(exam)
     await db.commit()
     await db.refresh(exam)
     return exam
 
 
+async def upload_mcq_docx_to_exam_service(db: AsyncSession, exam_id: int, file: UploadFile) -> DocxImportJob:
+    """Start importing the questions of a DOCX into an MCQ exam; progress is polled by job id"""
+    exam = await db.get(Exam, exam_id)
+    if exam is None:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    if not exam.is_mcq:
+        raise HTTPException(status_code=400, detail="DOCX import is only available for MCQ exams")
+    if not (file.filename or "").lower().endswith(".docx"):
+        raise HTTPException(status_code=400, detail="Only .docx files can be imported")
+
+    content = await file.read()
+    if not content:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    if len(content) > settings.DOCX_IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+    return await start_docx_import(exam_id, file.filename, content)
+
+
 async def add_question_to_exam_service(
     db: AsyncSession,
     exam_id: int,
@@ -184,6 +234,7 @@ async def add_question_to_exam_service(
     )
     
     db.add(question_obj)
+    _bump_content_version(exam)
     await db.commit()
     await db.refresh(question_obj)
     return question_obj
@@ -275,6 +326,7 @@ async def update_question_service(
     question.option_c_image_url = option_c_image_url if exam.is_mcq else None
     question.option_d_image_url = option_d_image_url if exam.is_mcq else None
     question.answer = question_data.answer if exam.is_mcq else None
+    _bump_content_version(exam)
     await db.commit()
     await db.refresh(question)
     
@@ -311,24 +363,53 @@ async def delete_exam_service(exam_id: int, db: AsyncSession) -> bool:
     await db.delete(exam)
     print(f"[DEBUG] Exam {exam_id} marked for deletion. Committing...")
     await db.commit()
+    invalidate_exam_catalog()
+    invalidate_exam_paper(exam_id)
     print(f"[DEBUG] Exam {exam_id} deletion committed.")
     return True
 
 
-async def submit_exam_service(db: AsyncSession, exam_id: int, user_id: int, answers: List[dict]) -> Result:
-    """Submit exam answers, calculate score, and store detailed results."""
-    exam = await db.execute(
-        select(Exam)
-        .options(selectinload(Exam.questions))
-        .options(selectinload(Exam.course))
-        .where(Exam.id == exam_id)
-    )
-    exam = exam.scalars().first()
+async def _load_submitted_result(db: AsyncSession, result_filter, include_answers: bool = False) -> Optional[Result]:
+    """Load a submitted Result with the relations its response serializes."""
+    # Eager-load to avoid triggering lazy loads during response serialization (MissingGreenlet).
+    options = [selectinload(Result.user), selectinload(Result.exam)]
+    if include_answers:
+        options.append(selectinload(Result.answers_details))
+    result_with_rels_q = await db.execute(select(Result).options(*options).where(result_filter))
+    return result_with_rels_q.scalars().first()
+
+
+def _build_submission_response(result_obj: Result, exam: Exam, user: Optional[User], outcome: GradingOutcome) -> dict:
+    """Build the ResultResponse payload from the committed Result and the in-memory grading outcome."""
+    written_submission_file = None
+    if exam.is_mcq is False:
+        written_submission_file = next(
+            (row["uploaded_file"] for row in outcome.answer_rows if row["uploaded_file"]),
+            None,
+        )
+
+    return {
+        "id": result_obj.id,
+        "exam_id": result_obj.exam_id,
+        "user_id": result_obj.user_id,
+        "correct_answers": outcome.correct_answers,
+        "incorrect_answers": outcome.incorrect_answers,
+        "mark": outcome.mark,
+        "submission_time": result_obj.submission_time,
+        "attempt_number": result_obj.attempt_number,
+        "written_submission_file": written_submission_file,
+        "user": {
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+            "active_mobile": user.active_mobile,
+        } if user else None,
+        "exam": {"id": exam.id, "title": exam.title, "is_mcq": exam.is_mcq},
+    }
 
-    if not exam:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
 
-    # Check if user must be enrolled; allow free/standalone exams without enrollment
+async def _ensure_enrolled(db: AsyncSession, exam: Exam, user_id: int) -> None:
+    """Reject users not enrolled in the exam's course; free/standalone exams need no enrollment."""
     enrollment_required = not (
         exam.course_id is None
         or exam.is_free
@@ -349,114 +430,234 @@ async def submit_exam_service(db: AsyncSession, exam_id: int, user_id: int, answ
                 detail="User not enrolled in the course for this exam"
             )
 
-    # Check for multiple attempts
+
+def _session_response(exam_session: ActiveSession) -> dict:
+    return {
+        "id": exam_session.id,
+        "exam_id": exam_session.exam_id,
+        "user_id": exam_session.user_id,
+        "started_at": exam_session.started_at,
+        "must_complete_by": exam_session.must_complete_by,
+        "remaining_seconds": exam_session.remaining_seconds(),
+    }
+
+
+async def start_exam_session_service(db: AsyncSession, exam_id: int, user_id: int) -> dict:
+    """Start the user's timed session for an exam, or resume the one already open."""
+    # The database decides: another worker's submit or the sweeper may have closed the indexed session
+    latest = await load_latest_session(db, exam_id, user_id)
+    if latest is None or not latest.is_active:
+        forget_session(exam_id, user_id)
+    exam_session = get_indexed_session(exam_id, user_id)
+    if exam_session is not None:
+        if is_expired(exam_session):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Time is up for this exam")
+        return _session_response(exam_session)
+
+    exam = await db.execute(
+        select(Exam)
+        .options(selectinload(Exam.course))
+        .where(Exam.id == exam_id)
+    )
+    exam = exam.scalars().first()
+    if not exam:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+
+    now = datetime.utcnow()
+    if exam.start_time and now < exam.start_time:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Exam has not started yet")
+    if exam.end_time and now.date() > exam.end_time:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Exam has ended")
+
+    await _ensure_enrolled(db, exam, user_id)
+
     if not exam.allow_multiple_attempts:
-        existing_result = await db.execute(select(Result).where(Result.exam_id == exam_id, Result.user_id == user_id))
-        if existing_result.scalar_one_or_none():
+        attempted = latest is not None or (await db.execute(
+            select(Result.id).where(Result.exam_id == exam_id, Result.user_id == user_id).limit(1)
+        )).first() is not None
+        if attempted:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Multiple attempts not allowed for this exam")
 
-    correct_answers_count = 0
-    incorrect_answers_count = 0
-    total_mark_obtained = 0.0
-    detailed_answers = []
-
-    for submitted_answer in answers:
-        question_id = submitted_answer.question_id
-        selected_option = submitted_answer.selected_option # For MCQ
-        submitted_answer_text = submitted_answer.submitted_answer_text # For Written
-        uploaded_file = submitted_answer.uploaded_file
-
-        question = next((q for q in exam.questions if q.id == question_id), None)
-        if not question:
-            continue # Skip if question not found in exam
-
-        is_correct = False
-        marks_for_question = 0.0
-        correct_option_index = _resolve_correct_option_index(question)
-
-        if question.q_type == "MCQ":
-            if (
-                selected_option is not None
-                and correct_option_index is not None
-                and selected_option == correct_option_index
-            ):
-                is_correct = True
-                marks_for_question = float(exam.mark) / len(exam.questions) # Assuming equal marks per question for now
-            else:
-                is_correct = False
-                marks_for_question = -float(exam.minus_mark)
-        else: # For written/other types, correctness and marks determined by admin later
-            if not submitted_answer_text and not uploaded_file:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Written question requires either submitted text or uploaded file link"
-                )
-            is_correct = None # Cannot determine automatically
-            marks_for_question = 0.0 # Will be graded later
+    exam_session = await open_session(db, exam_id, user_id, exam.duration_minutes)
+    return _session_response(exam_session)
+
+
+async def _insert_next_attempt(
+    db: AsyncSession, exam: Exam, user_id: int, outcome: GradingOutcome, scoped_key: str,
+    session_id: Optional[int] = None,
+) -> Optional[Result]:
+    """Insert the user's next attempt in one statement; return None if no row was inserted.
+
+    The attempt number is MAX(attempt_number) + 1 computed inside the INSERT, and
+    for single-attempt exams the HAVING clause yields no row once a Result exists.
+    Concurrent inserts of the same number (or idempotency key) hit a unique
+    constraint and are skipped by ON CONFLICT DO NOTHING rather than failing.
+    """
+    submission_time = datetime.utcnow()
+    next_attempt = (
+        select(
+            literal(exam.id), literal(user_id), literal(outcome.correct_answers),
+            literal(outcome.incorrect_answers), literal(outcome.mark, Result.mark.type),
+            literal(submission_time), func.coalesce(func.max(Result.attempt_number), 0) + 1,
+            literal(False), literal(scoped_key), literal(session_id, Result.session_id.type),
+        )
+        .where(Result.exam_id == exam.id, Result.user_id == user_id)
+    )
+    if not exam.allow_multiple_attempts:
+        next_attempt = next_attempt.having(func.count() == 0)
+
+    inserted = await db.execute(
+        pg_insert(Result)
+        .from_select(
+            ["exam_id", "user_id", "correct_answers", "incorrect_answers", "mark",
+             "submission_time", "attempt_number", "is_announced", "idempotency_key", "session_id"],
+            next_attempt,
+        )
+        .on_conflict_do_nothing()
+        .returning(Result.id, Result.attempt_number)
+    )
+    row = inserted.first()
+    if row is None:
+        return None
+    # Detached snapshot for the response; nothing is re-read from the database
+    return Result(
+        id=row.id, exam_id=exam.id, user_id=user_id, correct_answers=outcome.correct_answers,
+        incorrect_answers=outcome.incorrect_answers, mark=outcome.mark, submission_time=submission_time,
+        attempt_number=row.attempt_number, idempotency_key=scoped_key, session_id=session_id,
+    )
 
-        if is_correct is True:
-            correct_answers_count += 1
-        elif is_correct is False:
-            incorrect_answers_count += 1
-        
-        total_mark_obtained += marks_for_question
 
-        detailed_answers.append(
-            Answer(
-                question_id=question_id,
-                exam_id=exam_id,
-                selected_option=selected_option,
-                submitted_answer_text=submitted_answer_text,
-                uploaded_file=uploaded_file,
-                is_correct=is_correct,
-                correct_option_index=correct_option_index,
-                marks_obtained=marks_for_question
-            )
+async def submit_exam_service(
+    db: AsyncSession,
+    exam_id: int,
+    user_id: int,
+    answers: List[dict],
+    idempotency_key: Optional[str] = None,
+    include_answers: bool = False,
+    check_session: bool = True,
+) -> Union[Result, dict]:
+    """Submit exam answers, calculate score, and store detailed results.
+
+    The response is built from the in-memory grading outcome, so nothing is
+    re-read after the commit unless ``include_answers`` asks for the stored
+    answers. A repeated ``idempotency_key`` returns the original submission
+    instead of creating another attempt. In ingest mode the graded submission
+    is queued for the background writer and a provisional acknowledgement is
+    returned. With ``check_session`` the submission must fall within the
+    user's exam session, if they started one (always, with EXAM_SESSION_REQUIRED),
+    and the session's autosaved draft is graded along with ``answers``.
+    """
+    scoped_key = build_idempotency_key(user_id, exam_id, idempotency_key)
+    if idempotency_key:
+        if settings.SUBMISSION_INGEST_MODE:
+            queued = await get_queued_submission(scoped_key)
+            if queued:
+                return queued
+        else:
+            previous = await _load_submitted_result(db, Result.idempotency_key == scoped_key, include_answers)
+            if previous:
+                return previous
+
+    exam_query = select(Exam).options(selectinload(Exam.course)).where(Exam.id == exam_id)
+    load_session = check_session and get_indexed_session(exam_id, user_id) is None
+    if load_session:
+        # The user's latest session comes with the exam rather than in a query of its own
+        exam_query = exam_query.add_columns(ExamSession).outerjoin(
+            ExamSession, ExamSession.id == latest_session_id(exam_id, user_id)
         )
+    row = (await db.execute(exam_query)).first()
 
-    # Determine attempt number
-    last_attempt_result = await db.execute(
-        select(Result)
-        .where(Result.exam_id == exam_id, Result.user_id == user_id)
-        .order_by(Result.attempt_number.desc())
-        .limit(1)
-    )
-    last_attempt = last_attempt_result.scalar_one_or_none()
-    attempt_number = (last_attempt.attempt_number + 1) if last_attempt else 1
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+    exam = row[0]
+
+    await _ensure_enrolled(db, exam, user_id)
+    exam_session = None
+    if check_session:
+        exam_session = check_submission_deadline(exam_id, user_id, row[1] if load_session else None)
+    if exam_session:
+        # Held until the commit; the sweeper skips the session meanwhile
+        await lock_session_for_submit(db, exam_session)
+
+    # In ingest mode the Result is written later: persisted attempts are checked here,
+    # attempts still in the journal by enqueue_submission, atomically
+    if settings.SUBMISSION_INGEST_MODE and not exam.allow_multiple_attempts:
+        existing_result = await db.execute(
+            select(Result.id).where(Result.exam_id == exam_id, Result.user_id == user_id).limit(1)
+        )
+        if existing_result.first() is not None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Multiple attempts not allowed for this exam")
 
-    result_obj = Result(
-        exam_id=exam_id,
-        user_id=user_id,
-        correct_answers=correct_answers_count,
-        incorrect_answers=incorrect_answers_count,
-        mark=total_mark_obtained,
-        attempt_number=attempt_number,
-        answers_details=detailed_answers
-    )
+    if exam_session:
+        # Autosaved answers fill in every question the final request does not carry
+        stored = await load_stored_draft(db, exam_session.id)
+        submitted_ids = {answer.question_id for answer in answers}
+        answers = list(answers) + [
+            answer for answer in merge_draft(stored, pending_draft(exam_session.id))
+            if answer.question_id not in submitted_ids
+        ]
 
-    db.add(result_obj)
-    await db.commit()
-    await db.refresh(result_obj)
-
-    # Re-query the result with related objects eagerly loaded to avoid
-    # triggering lazy loads during response serialization (MissingGreenlet).
-    result_with_rels_q = await db.execute(
-        select(Result)
-        .options(
-            selectinload(Result.answers_details),
-            selectinload(Result.user),
-            selectinload(Result.exam).selectinload(Exam.questions)
+    answer_key = await get_answer_key(db, exam)
+    outcome = grade_submission(answer_key, answers)
+
+    if settings.SUBMISSION_INGEST_MODE:
+        ack = await enqueue_submission(
+            exam_id, user_id, scoped_key, outcome,
+            session_id=exam_session.id if exam_session else None,
+            single_attempt=not exam.allow_multiple_attempts,
         )
-        .where(Result.id == result_obj.id)
+        if exam_session:
+            # Closed now rather than when the writer persists it, so the sweeper never auto-submits it
+            await mark_session_submitted(db, [exam_session.id])
+            await db.commit()
+            forget_session(exam_id, user_id, exam_session.id)
+            discard_draft(exam_session.id)
+        return ack
+
+    for _ in range(ATTEMPT_ALLOCATION_RETRIES):
+        result_obj = await _insert_next_attempt(db, exam, user_id, outcome, scoped_key, exam_session.id if exam_session else None)
+        if result_obj is not None:
+            break
+        # Nothing inserted: a concurrent submit with the same key, an attempt the exam
+        # does not allow, or another attempt that took this number first (retried)
+        previous = await _load_submitted_result(db, Result.idempotency_key == scoped_key, include_answers)
+        if previous:
+            return previous
+        if not exam.allow_multiple_attempts:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Multiple attempts not allowed for this exam")
+    else:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Concurrent submissions for this exam, please retry")
+
+    # Result and its answers share one transaction; answers skip the ORM unit of work
+    await insert_answer_rows(
+        db, [{**row, "result_id": result_obj.id} for row in outcome.answer_rows]
     )
-    result_with_rels = result_with_rels_q.scalars().first()
-    return result_with_rels
+    await upsert_leaderboard_entries(db, [(exam_id, user_id, result_obj.id, outcome.mark)])
+    if exam_session:
+        await mark_session_submitted(db, [exam_session.id])
+    await db.commit()
+    if exam_session:
+        forget_session(exam_id, user_id, exam_session.id)
+        discard_draft(exam_session.id)
 
+    apply_to_cached_leaderboards([(exam_id, user_id, outcome.mark)])
 
-async def submit_exam_anonymous_service(db: AsyncSession, exam_id: int, name: str, email: str, active_mobile: Optional[str], answers: List[dict]) -> Result:
-    """Create/fetch an anonymous user and submit exam."""
-    user = await create_or_get_anonymous_user(db, name=name, email=email, active_mobile=active_mobile)
-    return await submit_exam_service(db, exam_id, user.id, answers)
+    if include_answers:
+        return await _load_submitted_result(db, Result.id == result_obj.id, include_answers=True)
+
+    # The submitting user is normally already in this session's identity map, so no query
+    user = await db.get(User, user_id)
+    return _build_submission_response(result_obj, exam, user, outcome)
+
+
+async def submit_exam_anonymous_service(db: AsyncSession, exam_id: int, name: str, email: str, active_mobile: Optional[str], answers: List[dict], idempotency_key: Optional[str] = None, include_answers: bool = False) -> Union[Result, dict]:
+    """Upsert an anonymous user and submit the exam in the same transaction."""
+    user = await upsert_anonymous_user(db, name=name, email=email, active_mobile=active_mobile)
+    if settings.SUBMISSION_INGEST_MODE:
+        # The background writer persists the result later, so the user row must exist by then
+        await db.commit()
+    # Anonymous candidates cannot start a session, so there is no deadline to check
+    return await submit_exam_service(db, exam_id, user.id, answers, idempotency_key=idempotency_key, include_answers=include_answers, check_session=False)
 
 
 async def get_detailed_exam_result_service(db: AsyncSession, exam_id: int, user_id: int) -> ResultDetailedResponse:
@@ -559,6 +760,7 @@ async def delete_question_service(db: AsyncSession, exam_id: int, question_id: i
 
     # Delete the question
     await db.delete(question)
+    _bump_content_version(exam)
     await db.commit()
     
     return {
@@ -665,6 +867,7 @@ async def create_exam_service(exam: ExamCreateRequest, db: AsyncSession) -> Exam
             db.add(question_obj)
         
         await db.commit()
+        invalidate_exam_catalog()
         await db.refresh(exam_obj)
         return exam_obj
         
@@ -802,6 +1005,7 @@ async def update_exam_service(
     for field, value in update_data.items():
         setattr(exam, field, value)
     
+    _bump_content_version(exam)
     await db.commit()
     await db.refresh(exam)
     return exam
\ No newline at end of file
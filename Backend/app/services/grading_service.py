@@ -0,0 +1,165 @@
+# Backend/app/services/grading_service.py
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lib.cache import LRUCache
+from app.lib.config import settings
+from app.models import Exam, Question
+
+
+OPTION_LETTER_INDEX = {"A": 0, "B": 1, "C": 2, "D": 3}
+
+
+def resolve_correct_option_index(answer: Optional[str]) -> Optional[int]:
+    """Return 0-based correct option index from a Question.answer letter/number value."""
+    if answer:
+        letter = str(answer).strip().upper()
+        if letter in OPTION_LETTER_INDEX:
+            return OPTION_LETTER_INDEX[letter]
+        # Allow numeric strings (1-4) just in case
+        if letter.isdigit():
+            numeric = int(letter)
+            if 1 <= numeric <= 4:
+                return numeric - 1
+
+    return None
+
+
+@dataclass(frozen=True)
+class AnswerKeyEntry:
+    """Grading data for one question: everything except its text and images."""
+    q_type: str
+    correct_option_index: Optional[int]
+    mark: float
+    minus_mark: float
+
+
+@dataclass(frozen=True)
+class CompiledAnswerKey:
+    """Answer key of one exam version, indexed by question id."""
+    exam_id: int
+    entries: Dict[int, AnswerKeyEntry]
+    version: int = 0
+
+    @property
+    def question_count(self) -> int:
+        return len(self.entries)
+
+
+@dataclass
+class GradingOutcome:
+    """Totals and Answer row values produced by grading one submission."""
+    correct_answers: int = 0
+    incorrect_answers: int = 0
+    mark: float = 0.0
+    answer_rows: List[dict] = field(default_factory=list)
+
+
+def compile_answer_key(exam_id: int, mark, minus_mark, questions: Sequence, version: int = 0) -> CompiledAnswerKey:
+    """Build an answer key from an exam's mark settings and its questions.
+
+    ``questions`` only needs ``id``, ``q_type`` and ``answer`` attributes, so both
+    Question instances and lightweight column rows can be compiled.
+    """
+    # Equal marks per question, matching the exam-level mark split used at submit time
+    per_question_mark = float(mark) / len(questions) if questions else 0.0
+    per_question_minus = float(minus_mark)
+
+    entries = {
+        q.id: AnswerKeyEntry(
+            q_type=q.q_type,
+            correct_option_index=resolve_correct_option_index(q.answer),
+            mark=per_question_mark,
+            minus_mark=per_question_minus,
+        )
+        for q in questions
+    }
+    return CompiledAnswerKey(exam_id=exam_id, entries=entries, version=version)
+
+
+# Compiled keys per exam id. Each worker keeps its own copy; entries are only
+# trusted while their version matches Exam.content_version, so an edit made
+# through any worker is picked up by all of them on the next submission.
+answer_key_cache = LRUCache(maxsize=settings.ANSWER_KEY_CACHE_SIZE)
+
+
+async def get_answer_key(db: AsyncSession, exam: Exam) -> CompiledAnswerKey:
+    """Return the compiled answer key for ``exam``, rebuilding it if the exam version changed.
+
+    A rebuild reads only the grading columns of the exam's questions, never
+    their text or image URLs.
+    """
+    version = exam.content_version or 0
+    cached = answer_key_cache.get(exam.id)
+    if cached is not None and cached.version == version:
+        return cached
+
+    rows = await db.execute(
+        select(Question.id, Question.q_type, Question.answer).where(Question.exam_id == exam.id)
+    )
+    answer_key = compile_answer_key(exam.id, exam.mark, exam.minus_mark, rows.all(), version=version)
+    answer_key_cache.set(exam.id, answer_key)
+    return answer_key
+
+
+def invalidate_answer_key(exam_id: int) -> None:
+    """Drop this worker's cached answer key for an exam."""
+    answer_key_cache.pop(exam_id)
+
+
+def grade_submission(answer_key: CompiledAnswerKey, answers: Sequence) -> GradingOutcome:
+    """Grade submitted answers against a compiled key in a single pass.
+
+    Answers for questions outside the exam are skipped. MCQ answers that are not
+    correct (including unselected ones) receive the negative mark; written answers
+    are stored ungraded for the admin to mark later.
+    """
+    entries = answer_key.entries
+    exam_id = answer_key.exam_id
+    outcome = GradingOutcome()
+    answer_rows = outcome.answer_rows
+
+    for submitted_answer in answers:
+        entry = entries.get(submitted_answer.question_id)
+        if entry is None:
+            continue  # Skip if question not found in exam
+
+        selected_option = submitted_answer.selected_option
+        submitted_answer_text = submitted_answer.submitted_answer_text
+        uploaded_file = submitted_answer.uploaded_file
+
+        if entry.q_type == "MCQ":
+            if selected_option is not None and selected_option == entry.correct_option_index:
+                is_correct = True
+                marks_for_question = entry.mark
+                outcome.correct_answers += 1
+            else:
+                is_correct = False
+                marks_for_question = -entry.minus_mark
+                outcome.incorrect_answers += 1
+        else:
+            if not submitted_answer_text and not uploaded_file:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Written question requires either submitted text or uploaded file link"
+                )
+            is_correct = None  # Cannot determine automatically
+            marks_for_question = 0.0  # Will be graded later
+
+        outcome.mark += marks_for_question
+        answer_rows.append({
+            "question_id": submitted_answer.question_id,
+            "exam_id": exam_id,
+            "selected_option": selected_option,
+            "submitted_answer_text": submitted_answer_text,
+            "uploaded_file": uploaded_file,
+            "is_correct": is_correct,
+            "correct_option_index": entry.correct_option_index,
+            "marks_obtained": marks_for_question,
+        })
+
+    return outcome
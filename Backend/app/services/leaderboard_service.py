@@ -0,0 +1,234 @@
+# Backend/app/services/leaderboard_service.py
+"""
+Per-exam leaderboards.
+
+LeaderboardEntry keeps each candidate's best mark per exam and is upserted in
+the same transaction that stores a Result. On top of it every worker keeps a
+sorted in-memory board per exam, so rank, percentile, highest and average
+are O(log n) or O(1) lookups instead of an ORDER BY over all results. Boards
+are reloaded from the table after LEADERBOARD_REFRESH_SECONDS (picking up other
+workers' submissions) and patched immediately for submissions made through
+this worker.
+
+Ranks are dense: candidates with equal marks share a rank and the next mark
+down gets the following rank.
+
+Boards are public only once the exam's results are released: after
+show_detailed_results_after when the exam sets one (when result details stop
+being hidden), otherwise once the results are announced.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lib.cache import LRUCache
+from app.lib.config import settings
+from app.models import Exam, LeaderboardEntry, Result, ResultAnnouncement, User
+
+
+class ExamLeaderboard:
+    """Sorted best marks of one exam's candidates."""
+
+    def __init__(self, exam_id: int, best_marks: Dict[int, float], announced: bool = False):
+        self.exam_id = exam_id
+        self.announced = announced
+        self.best_marks = dict(best_marks)
+        self._marks: List[float] = sorted(self.best_marks.values())  # ascending, with duplicates
+        self._mark_counts = Counter(self._marks)
+        self._distinct: List[float] = sorted(self._mark_counts)  # ascending, unique
+        self._total = sum(self._marks)
+
+    def __len__(self) -> int:
+        return len(self._marks)
+
+    def _add(self, mark: float) -> None:
+        insort(self._marks, mark)
+        if self._mark_counts[mark] == 0:
+            insort(self._distinct, mark)
+        self._mark_counts[mark] += 1
+        self._total += mark
+
+    def _remove(self, mark: float) -> None:
+        del self._marks[bisect_left(self._marks, mark)]
+        self._mark_counts[mark] -= 1
+        if self._mark_counts[mark] == 0:
+            del self._mark_counts[mark]
+            del self._distinct[bisect_left(self._distinct, mark)]
+        self._total -= mark
+
+    def record(self, user_id: int, mark: float) -> None:
+        """Apply a new result; only an improvement on the candidate's best mark changes the board."""
+        previous = self.best_marks.get(user_id)
+        if previous is not None:
+            if mark <= previous:
+                return
+            self._remove(previous)
+        self.best_marks[user_id] = mark
+        self._add(mark)
+
+    def rank_of_mark(self, mark: float) -> int:
+        return len(self._distinct) - bisect_right(self._distinct, mark) + 1
+
+    def rank_of(self, user_id: int) -> Optional[int]:
+        mark = self.best_marks.get(user_id)
+        return None if mark is None else self.rank_of_mark(mark)
+
+    def percentile_of(self, user_id: int) -> Optional[float]:
+        """Share of candidates (in %) scoring strictly below this candidate."""
+        mark = self.best_marks.get(user_id)
+        if mark is None:
+            return None
+        return round(100.0 * bisect_left(self._marks, mark) / len(self._marks), 2)
+
+    @property
+    def highest_mark(self) -> Optional[float]:
+        return self._distinct[-1] if self._distinct else None
+
+    @property
+    def average_mark(self) -> Optional[float]:
+        return round(self._total / len(self._marks), 4) if self._marks else None
+
+
+# Boards expire after the refresh interval so changes made through other
+# workers are picked up; this worker's own submissions are applied in place.
+_boards = LRUCache(maxsize=settings.LEADERBOARD_CACHE_SIZE, ttl=settings.LEADERBOARD_REFRESH_SECONDS)
+
+
+async def upsert_leaderboard_entries(db: AsyncSession, results: Iterable[Tuple[int, int, int, float]]) -> None:
+    """Record (exam_id, user_id, result_id, mark) tuples, keeping each candidate's best mark.
+
+    Runs inside the caller's transaction, next to the Result inserts.
+    """
+    best: Dict[Tuple[int, int], Tuple[int, float]] = {}
+    for exam_id, user_id, result_id, mark in results:
+        current = best.get((exam_id, user_id))
+        if current is None or mark > current[1]:
+            best[(exam_id, user_id)] = (result_id, mark)
+    if not best:
+        return
+
+    now = datetime.utcnow()
+    stmt = pg_insert(LeaderboardEntry).values([
+        {"exam_id": exam_id, "user_id": user_id, "result_id": result_id, "mark": mark, "updated_at": now}
+        for (exam_id, user_id), (result_id, mark) in best.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_leaderboard_entry_exam_user",
+        set_={
+            "result_id": stmt.excluded.result_id,
+            "mark": stmt.excluded.mark,
+            "updated_at": stmt.excluded.updated_at,
+        },
+        where=stmt.excluded.mark > LeaderboardEntry.mark,
+    )
+    await db.execute(stmt)
+
+
+def apply_to_cached_leaderboards(results: Iterable[Tuple[int, int, float]]) -> None:
+    """Patch this worker's cached boards with committed (exam_id, user_id, mark) results."""
+    for exam_id, user_id, mark in results:
+        board = _boards.get(exam_id)
+        if board is not None:
+            board.record(user_id, float(mark))
+
+
+async def rebuild_leaderboard_entry(db: AsyncSession, exam_id: int, user_id: int) -> None:
+    """Re-derive one candidate's entry from their remaining results (after a Result is deleted)."""
+    await db.flush()
+    await db.execute(
+        delete(LeaderboardEntry).where(LeaderboardEntry.exam_id == exam_id, LeaderboardEntry.user_id == user_id)
+    )
+    best = await db.execute(
+        select(Result.id, Result.mark)
+        .where(Result.exam_id == exam_id, Result.user_id == user_id)
+        .order_by(Result.mark.desc(), Result.id)
+        .limit(1)
+    )
+    row = best.first()
+    if row is not None:
+        db.add(LeaderboardEntry(exam_id=exam_id, user_id=user_id, result_id=row.id, mark=row.mark))
+    invalidate_leaderboard(exam_id)
+
+
+def invalidate_leaderboard(exam_id: Optional[int] = None) -> None:
+    """Drop this worker's cached board for an exam (or all boards)."""
+    if exam_id is None:
+        _boards.clear()
+    else:
+        _boards.pop(exam_id)
+
+
+async def get_exam_leaderboard(db: AsyncSession, exam_id: int) -> ExamLeaderboard:
+    """Return the in-memory board for an exam, loading it from LeaderboardEntry when missing or expired."""
+    board = _boards.get(exam_id)
+    if board is not None:
+        return board
+
+    rows = await db.execute(
+        select(LeaderboardEntry.user_id, LeaderboardEntry.mark).where(LeaderboardEntry.exam_id == exam_id)
+    )
+    announced = await db.scalar(select(exists().where(
+        ResultAnnouncement.exam_id == exam_id, ResultAnnouncement.is_published.isnot(False)
+    )))
+    board = ExamLeaderboard(exam_id, {user_id: float(mark) for user_id, mark in rows.all()}, announced=bool(announced))
+    _boards.set(exam_id, board)
+    return board
+
+
+async def get_released_leaderboard(db: AsyncSession, exam_id: int) -> ExamLeaderboard:
+    """The exam's board, or 403 while its results are not released yet."""
+    exam = await db.get(Exam, exam_id)
+    if not exam:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+
+    board = await get_exam_leaderboard(db, exam_id)
+    release_at = exam.show_detailed_results_after
+    if release_at is not None and datetime.utcnow() < release_at or release_at is None and not board.announced:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Results have not been announced yet")
+    return board
+
+
+async def get_leaderboard_service(db: AsyncSession, exam_id: int, top: int = 10) -> dict:
+    """Summary statistics plus the top ``top`` candidates of an exam."""
+    board = await get_released_leaderboard(db, exam_id)
+    top_rows = await db.execute(
+        select(LeaderboardEntry.user_id, User.name, LeaderboardEntry.mark)
+        .join(User, User.id == LeaderboardEntry.user_id)
+        .where(LeaderboardEntry.exam_id == exam_id)
+        .order_by(LeaderboardEntry.mark.desc(), LeaderboardEntry.updated_at)
+        .limit(top)
+    )
+    entries = [
+        {"rank": board.rank_of_mark(float(mark)), "user_id": user_id, "name": name, "mark": float(mark)}
+        for user_id, name, mark in top_rows.all()
+    ]
+    return {
+        "exam_id": exam_id,
+        "total_candidates": len(board),
+        "highest_mark": board.highest_mark,
+        "average_mark": board.average_mark,
+        "entries": entries,
+    }
+
+
+async def get_leaderboard_standing_service(db: AsyncSession, exam_id: int, user_id: int) -> dict:
+    """Rank and percentile of one candidate, answered from the in-memory board."""
+    board = await get_released_leaderboard(db, exam_id)
+    if user_id not in board.best_marks:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No result found for this user and exam")
+
+    return {
+        "exam_id": exam_id,
+        "user_id": user_id,
+        "mark": board.best_marks[user_id],
+        "rank": board.rank_of(user_id),
+        "percentile": board.percentile_of(user_id),
+        "total_candidates": len(board),
+    }
@@ -0,0 +1,139 @@
+# Backend/app/services/paper_service.py
+"""
+Pre-rendered exam papers.
+
+When a live exam opens, every candidate requests the same questions at once.
+Instead of loading and validating them per request, each worker renders the
+paper of an exam version (exam summary + questions, without answers) to JSON
+bytes once, compresses it with gzip (and brotli, when installed) and serves
+those bytes directly.
+
+A paper is tagged with Exam.content_version. It is served without touching
+the database for EXAM_PAPER_VERSION_CHECK_SECONDS, then the version is
+re-checked with a single-column query and the paper re-rendered if the exam,
+its questions or its course changed. Edits made through this worker drop the paper immediately.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lib.cache import LRUCache
+from app.lib.config import settings
+from app.models import Course, Exam
+from app.models.question import Question
+from app.schemas.exam import ExamPaperResponse
+
+try:  # optional: brotli is not part of the base requirements
+    import brotli
+except ImportError:  # pragma: no cover - depends on the deployment
+    brotli = None
+
+
+# Server preference order for Content-Encoding negotiation
+PAPER_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+@dataclass
+class ExamPaper:
+    """One exam version rendered to bytes, with its compressed variants."""
+    exam_id: int
+    version: int
+    etag: str  # of the identity body
+    bodies: Dict[Optional[str], bytes]  # keyed by Content-Encoding (None = identity)
+    checked_at: float = field(default_factory=time.monotonic)
+
+    def body(self, encoding: Optional[str]) -> bytes:
+        return self.bodies[encoding]
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETag of one representation; each content-coding gets its own."""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    @property
+    def etags(self) -> Tuple[str, ...]:
+        return tuple(self.etag_for(encoding) for encoding in self.bodies)
+
+
+_papers = LRUCache(maxsize=settings.EXAM_PAPER_CACHE_SIZE)
+# One render per exam at a time; concurrent requests wait for it instead of rendering again
+_render_locks: Dict[int, asyncio.Lock] = {}
+
+
+def invalidate_exam_paper(exam_id: Optional[int] = None) -> None:
+    """Drop this worker's rendered paper for an exam (or all papers)."""
+    if exam_id is None:
+        _papers.clear()
+    else:
+        _papers.pop(exam_id)
+
+
+async def _render_paper(db: AsyncSession, exam_id: int) -> ExamPaper:
+    question_count = (
+        select(func.count(Question.id)).where(Question.exam_id == Exam.id).scalar_subquery()
+    )
+    exam_row = (await db.execute(
+        select(
+            Exam.id, Exam.title, Exam.description, Exam.start_time, Exam.end_time, Exam.duration_minutes,
+            Exam.mark, Exam.minus_mark, Exam.course_id, Course.title.label("course_title"), Exam.is_mcq,
+            Exam.exam_type, Exam.is_active, Exam.allow_multiple_attempts, Exam.show_detailed_results_after,
+            Exam.price, Exam.is_free, Exam.content_version, question_count.label("question_count"),
+        )
+        .outerjoin(Course, Course.id == Exam.course_id)
+        .where(Exam.id == exam_id)
+    )).mappings().first()
+    if exam_row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+
+    question_rows = (await db.execute(
+        select(
+            Question.id, Question.q_type, Question.content, Question.image_url, Question.second_image_url,
+            Question.description, Question.option_a, Question.option_b, Question.option_c, Question.option_d,
+            Question.option_a_image_url, Question.option_b_image_url, Question.option_c_image_url,
+            Question.option_d_image_url,
+        )
+        .where(Question.exam_id == exam_id)
+        .order_by(Question.id)
+    )).mappings().all()
+
+    paper = ExamPaperResponse.model_validate({**exam_row, "questions": [dict(row) for row in question_rows]})
+    body = paper.model_dump_json().encode()
+
+    bodies: Dict[Optional[str], bytes] = {None: body, "gzip": gzip.compress(body, compresslevel=9)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body)
+
+    version = exam_row["content_version"]
+    etag = f'"paper-{exam_id}-v{version}-{hashlib.sha256(body).hexdigest()[:16]}"'
+    return ExamPaper(exam_id=exam_id, version=version, etag=etag, bodies=bodies)
+
+
+async def get_exam_paper_service(db: AsyncSession, exam_id: int) -> ExamPaper:
+    """Return the rendered paper of an exam's current version, rendering it at most once per version."""
+    paper = _papers.get(exam_id)
+    now = time.monotonic()
+    if paper is not None and now - paper.checked_at < settings.EXAM_PAPER_VERSION_CHECK_SECONDS:
+        return paper
+
+    if paper is not None:
+        version = await db.scalar(select(Exam.content_version).where(Exam.id == exam_id))
+        if version == paper.version:
+            paper.checked_at = now
+            return paper
+
+    lock = _render_locks.setdefault(exam_id, asyncio.Lock())
+    async with lock:
+        # Another request may have rendered it while we waited
+        current = _papers.get(exam_id)
+        if current is not None and current is not paper:
+            return current
+        paper = await _render_paper(db, exam_id)
+        _papers.set(exam_id, paper)
+        return paper
@@ -1,11 +1,79 @@
 from app.models.result import Result
 from app.models.answer import Answer
+from app.models.exam import Exam
+from app.models.result_announcement import ResultAnnouncement
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, update, func, literal, true, case, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional
+from decimal import Decimal
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import csv
+import io
+import json
+import secrets
 from app.models.user import User
+from app.lib.config import settings
+from app.lib.db import ReadSessionLocal
+from app.services.leaderboard_service import invalidate_leaderboard, rebuild_leaderboard_entry
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Rows fetched per round-trip while streaming announcement exports
+RESULT_EXPORT_CHUNK = 2000
+
+# Column order used for COPY; every answer row dict carries exactly these keys
+ANSWER_COLUMNS = (
+    "result_id",
+    "question_id",
+    "exam_id",
+    "selected_option",
+    "submitted_answer_text",
+    "uploaded_file",
+    "is_correct",
+    "correct_option_index",
+    "marks_obtained",
+)
+
+
+async def insert_answer_rows(db: AsyncSession, rows: List[dict], method: Optional[str] = None) -> None:
+    """Write Answer rows without building ORM objects, inside the caller's transaction.
+
+    ``method`` (default ``settings.ANSWER_BULK_INSERT_METHOD``):
+    - "values": multi-row INSERT ... VALUES (Core insertmanyvalues)
+    - "copy": asyncpg ``copy_records_to_table`` on the session's connection
+    - "orm": one Answer object per row, flushed through the unit of work
+    """
+    if not rows:
+        return
+    method = method or settings.ANSWER_BULK_INSERT_METHOD
+
+    if method == "copy":
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        records = [
+            tuple(
+                Decimal(str(row[column])) if column == "marks_obtained" else row[column]
+                for column in ANSWER_COLUMNS
+            )
+            for row in rows
+        ]
+        await raw_connection.driver_connection.copy_records_to_table(
+            Answer.__tablename__, records=records, columns=list(ANSWER_COLUMNS)
+        )
+    elif method == "orm":
+        db.add_all([Answer(**row) for row in rows])
+        await db.flush()
+    else:
+        # With RETURNING, SQLAlchemy's insertmanyvalues batches the rows into
+        # multi-row VALUES statements (plain asyncpg executemany sends one
+        # INSERT per row) and, unlike insert().values([...]), reuses the compiled SQL
+        await db.execute(insert(Answer.__table__).returning(Answer.__table__.c.id), rows)
 
 
 async def get_all_results_service(db: AsyncSession, detailed: bool = False, current_user: User = None) -> List[Result]:
@@ -38,6 +106,149 @@ async def get_all_results_service(db: AsyncSession, detailed: bool = False, curr
     return result_list
 
 
+# Rows fetched per round-trip when streaming the admin results listing
+RESULT_STREAM_CHUNK = 1000
+
+ANSWER_LIST_COLUMNS = (
+    "id", "question_id", "exam_id", "result_id", "selected_option", "submitted_answer_text",
+    "uploaded_file", "is_correct", "correct_option_index", "marks_obtained",
+)
+
+
+def _written_submission_file_column():
+    """First uploaded file of a written exam's result, computed in SQL instead of over answers_details."""
+    first_upload = (
+        select(Answer.uploaded_file)
+        .where(Answer.result_id == Result.id, Answer.uploaded_file.is_not(None), Answer.uploaded_file != "")
+        .order_by(Answer.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return case((Exam.is_mcq.is_(False), first_upload), else_=None).label("written_submission_file")
+
+
+def _result_list_query(
+    exam_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+):
+    """Flat projection of Result + user + exam, newest first, keyed on Result.id."""
+    query = (
+        select(
+            Result.id, Result.exam_id, Result.user_id, Result.correct_answers, Result.incorrect_answers,
+            Result.mark, Result.submission_time, Result.attempt_number,
+            _written_submission_file_column(),
+            User.name.label("user_name"), User.email.label("user_email"),
+            User.active_mobile.label("user_active_mobile"),
+            Exam.title.label("exam_title"), Exam.is_mcq.label("exam_is_mcq"),
+        )
+        .join(User, User.id == Result.user_id)
+        .join(Exam, Exam.id == Result.exam_id)
+        .order_by(Result.id.desc())
+    )
+    if exam_id is not None:
+        query = query.where(Result.exam_id == exam_id)
+    if user_id is not None:
+        query = query.where(Result.user_id == user_id)
+    if submitted_from is not None:
+        query = query.where(Result.submission_time >= submitted_from)
+    if submitted_to is not None:
+        query = query.where(Result.submission_time < submitted_to)
+    if before_id is not None:
+        query = query.where(Result.id < before_id)
+    return query
+
+
+def _result_list_item(row) -> dict:
+    return {
+        "id": row.id,
+        "exam_id": row.exam_id,
+        "user_id": row.user_id,
+        "correct_answers": row.correct_answers,
+        "incorrect_answers": row.incorrect_answers,
+        "mark": float(row.mark),
+        "submission_time": row.submission_time,
+        "attempt_number": row.attempt_number,
+        "written_submission_file": row.written_submission_file,
+        "user": {
+            "id": row.user_id,
+            "name": row.user_name,
+            "email": row.user_email,
+            "active_mobile": row.user_active_mobile,
+        },
+        "exam": {"id": row.exam_id, "title": row.exam_title, "is_mcq": row.exam_is_mcq},
+    }
+
+
+async def _load_answers_for_results(db: AsyncSession, result_ids: List[int]) -> Dict[int, List[dict]]:
+    """Answers of a page of results in one query, grouped by result id."""
+    answers: Dict[int, List[dict]] = {result_id: [] for result_id in result_ids}
+    if not result_ids:
+        return answers
+    rows = await db.execute(
+        select(*(getattr(Answer, column) for column in ANSWER_LIST_COLUMNS))
+        .where(Answer.result_id.in_(result_ids))
+        .order_by(Answer.result_id, Answer.id)
+    )
+    for row in rows.mappings():
+        answer = dict(row)
+        answer["marks_obtained"] = float(answer["marks_obtained"])
+        answers[answer["result_id"]].append(answer)
+    return answers
+
+
+async def get_results_page_service(
+    db: AsyncSession,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    exam_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    include_answers: bool = False,
+) -> dict:
+    """One keyset page of results (newest first) with the cursor for the next page."""
+    query = _result_list_query(exam_id, user_id, submitted_from, submitted_to, before_id).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    has_more = len(rows) > limit
+    items = [_result_list_item(row) for row in rows[:limit]]
+    if include_answers:
+        answers = await _load_answers_for_results(db, [item["id"] for item in items])
+        for item in items:
+            item["answers_details"] = answers[item["id"]]
+
+    return {"items": items, "next_cursor": items[-1]["id"] if has_more else None}
+
+
+async def stream_results_service(
+    exam_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    include_answers: bool = False,
+) -> AsyncIterator[bytes]:
+    """Yield matching results as NDJSON lines, read through a server-side cursor.
+
+    Uses its own (read replica, when configured) session so the cursor stays
+    open for the whole response body.
+    """
+    async with ReadSessionLocal() as db:
+        rows = await db.stream(
+            _result_list_query(exam_id, user_id, submitted_from, submitted_to)
+            .execution_options(yield_per=RESULT_STREAM_CHUNK)
+        )
+        async for chunk in rows.partitions(RESULT_STREAM_CHUNK):
+            items = [_result_list_item(row) for row in chunk]
+            if include_answers:
+                answers = await _load_answers_for_results(db, [item["id"] for item in items])
+                for item in items:
+                    item["answers_details"] = answers[item["id"]]
+            yield "".join(json.dumps(item, default=str) + "\n" for item in items).encode()
+
+
 async def get_result_service(result_id: int, db: AsyncSession, detailed: bool = False) -> Result:
     """Get result for an exam, optionally for a specific user and with detailed answers"""
     query = select(Result).where(Result.id == result_id).options(
@@ -80,8 +291,134 @@ async def delete_result_service(result_id: int, db: AsyncSession) -> dict:
         delete(Answer).where(Answer.result_id == result_id)
     )
     
-    # Delete the result
+    # Delete the result and re-derive the candidate's leaderboard entry without it
     await db.delete(result)
+    await rebuild_leaderboard_entry(db, result.exam_id, result.user_id)
     await db.commit()
     
     return {"message": "Result deleted successfully"}
+
+
+def _export_path(relative_path: Optional[str]) -> Optional[Path]:
+    return BACKEND_ROOT / relative_path if relative_path else None
+
+
+def _csv_text(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def announce_exam_results_service(db: AsyncSession, exam_id: int, announced_by: int) -> ResultAnnouncement:
+    """Rank, publish and export an exam's results without loading them into Python.
+
+    Candidates are ranked by their best attempt (highest mark, earliest on
+    ties), the attempt the leaderboard counts.
+    1. One UPDATE ... FROM a DENSE_RANK() window over the best attempts sets
+       position/is_announced/announced_at on every attempt of each candidate
+    2. One INSERT ... SELECT upserts the exam's single ResultAnnouncement with
+       aggregates over the same best attempts
+    3. A server-side cursor streams the best attempts into a CSV under
+       RESULT_EXPORT_DIR, downloadable through the admin API only
+    """
+    exam = await db.get(Exam, exam_id)
+    if not exam:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+
+    now = datetime.utcnow()
+    best = (
+        select(Result.id, Result.user_id, Result.mark)
+        .where(Result.exam_id == exam_id)
+        .order_by(Result.user_id, Result.mark.desc(), Result.id)
+        .distinct(Result.user_id)
+        .subquery()
+    )
+    ranked = (
+        select(best.c.user_id, func.dense_rank().over(order_by=best.c.mark.desc()).label("position"))
+        .subquery()
+    )
+    await db.execute(
+        update(Result)
+        .where(Result.exam_id == exam_id, Result.user_id == ranked.c.user_id)
+        .values(position=ranked.c.position, is_announced=True, announced_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+    previous_file = await db.scalar(
+        select(ResultAnnouncement.result_file_path).where(ResultAnnouncement.exam_id == exam_id)
+    )
+    upsert = pg_insert(ResultAnnouncement).from_select(
+        ["exam_id", "announced_at", "total_students", "highest_marks", "average_marks", "announced_by", "is_published"],
+        select(
+            literal(exam_id),
+            literal(now),
+            func.count(),
+            func.max(best.c.mark),
+            func.avg(best.c.mark),
+            literal(announced_by),
+            true(),
+        ),
+    )
+    announcement_id = await db.scalar(
+        upsert.on_conflict_do_update(
+            constraint="uq_result_announcement_exam",
+            set_={
+                column: upsert.excluded[column]
+                for column in ("announced_at", "total_students", "highest_marks", "average_marks", "announced_by", "is_published")
+            },
+        )
+        .returning(ResultAnnouncement.id)
+    )
+
+    # The export directory sits under the public /uploads mount, so the name must not be guessable
+    export_dir = BACKEND_ROOT / settings.RESULT_EXPORT_DIR
+    await asyncio.to_thread(export_dir.mkdir, parents=True, exist_ok=True)
+    file_path = f"{settings.RESULT_EXPORT_DIR.strip('/')}/exam_{exam_id}_results_{secrets.token_urlsafe(24)}.csv"
+
+    rows = await db.stream(
+        select(
+            Result.position, User.name, User.email, Result.mark, Result.correct_answers,
+            Result.incorrect_answers, Result.attempt_number, Result.submission_time,
+        )
+        .join(User, User.id == Result.user_id)
+        .where(Result.id.in_(select(best.c.id)))
+        .order_by(Result.position, Result.submission_time)
+        .execution_options(yield_per=RESULT_EXPORT_CHUNK)
+    )
+    # Each chunk is formatted in memory; the file I/O runs off the event loop
+    export_file = await asyncio.to_thread(open, BACKEND_ROOT / file_path, "w", newline="", encoding="utf-8")
+    try:
+        await asyncio.to_thread(export_file.write, _csv_text([[
+            "position", "name", "email", "mark", "correct_answers",
+            "incorrect_answers", "attempt_number", "submission_time",
+        ]]))
+        async for chunk in rows.partitions(RESULT_EXPORT_CHUNK):
+            await asyncio.to_thread(export_file.write, _csv_text(chunk))
+    finally:
+        await asyncio.to_thread(export_file.close)
+
+    await db.execute(
+        update(ResultAnnouncement)
+        .where(ResultAnnouncement.id == announcement_id)
+        .values(result_file_url=f"/api/result/announce/{exam_id}/export", result_file_path=file_path)
+    )
+    await db.commit()
+    # Announcing releases the exam's leaderboard; other workers follow within the refresh interval
+    invalidate_leaderboard(exam_id)
+
+    previous_path = _export_path(previous_file)
+    if previous_path is not None and previous_file != file_path:
+        await asyncio.to_thread(previous_path.unlink, missing_ok=True)
+
+    return await db.get(ResultAnnouncement, announcement_id)
+
+
+async def get_result_export_service(db: AsyncSession, exam_id: int) -> Path:
+    """Path of the CSV exported by the exam's latest announcement."""
+    file_path = await db.scalar(
+        select(ResultAnnouncement.result_file_path).where(ResultAnnouncement.exam_id == exam_id)
+    )
+    path = _export_path(file_path)
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No result export for this exam")
+    return path
@@ -0,0 +1,288 @@
+# Backend/app/services/schedule_service.py
+"""
+Exam lifecycle scheduler driven by ExamSchedule.
+
+Each worker keeps a heap of the transitions due within the next
+EXAM_SCHEDULER_HORIZON_SECONDS and sleeps until the earliest one:
+
+    publish   publish_at                      is_published, Exam.is_active = true, then prewarm
+    prewarm   start_at - PREWARM_SECONDS      render the paper and compile the answer key
+    expire    end_at                          is_expired, Exam.is_active = false
+    remove    auto_remove_at                  is_removed, Exam soft-deleted
+
+Transitions that fall due together are applied with one UPDATE per kind.
+The heap is refilled from partial indexes on the pending transitions (never
+by scanning the table) once per half horizon, and immediately when a
+schedule is saved through this worker. Every UPDATE re-checks the flag and
+the due time, so stale heap entries and workers racing on the same
+transition are harmless. Pre-warming runs on every worker because the paper
+and answer-key caches are per worker.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import literal, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lib.config import settings
+from app.lib.db import AsyncSessionLocal
+from app.models import Exam, ExamSchedule
+from app.services.catalog_service import invalidate_exam_catalog
+from app.services.grading_service import get_answer_key, invalidate_answer_key
+from app.services.paper_service import get_exam_paper_service, invalidate_exam_paper
+
+PUBLISH = "publish"
+PREWARM = "prewarm"
+EXPIRE = "expire"
+REMOVE = "remove"
+
+# (due at, tie-breaker, kind, schedule id, exam id)
+Transition = Tuple[datetime, int, str, int, int]
+
+_heap: List[Transition] = []
+_queued: set = set()  # (kind, schedule id, due at) already in the heap
+_counter = itertools.count()
+_wake = asyncio.Event()
+
+
+def _prewarm_lead() -> timedelta:
+    return timedelta(seconds=settings.EXAM_SCHEDULER_PREWARM_SECONDS)
+
+
+def _push(due_at: datetime, kind: str, schedule_id: int, exam_id: int) -> None:
+    key = (kind, schedule_id, due_at)
+    if key not in _queued:
+        _queued.add(key)
+        heapq.heappush(_heap, (due_at, next(_counter), kind, schedule_id, exam_id))
+
+
+def _transitions(schedule: ExamSchedule) -> List[Tuple[datetime, str]]:
+    due = []
+    if schedule.publish_at and not schedule.is_published:
+        due.append((schedule.publish_at, PUBLISH))
+    if not schedule.is_expired:
+        if schedule.start_at > datetime.utcnow():
+            due.append((schedule.start_at - _prewarm_lead(), PREWARM))
+        due.append((schedule.end_at, EXPIRE))
+    if schedule.auto_remove_at and not schedule.is_removed:
+        due.append((schedule.auto_remove_at, REMOVE))
+    return due
+
+
+def notify_schedule_changed(schedule: ExamSchedule) -> None:
+    """Queue a saved schedule's upcoming transitions and wake the scheduler."""
+    horizon = datetime.utcnow() + timedelta(seconds=settings.EXAM_SCHEDULER_HORIZON_SECONDS)
+    for due_at, kind in _transitions(schedule):
+        if due_at < horizon:
+            _push(due_at, kind, schedule.id, schedule.exam_id)
+    _wake.set()
+
+
+async def load_upcoming_transitions(db: AsyncSession, horizon: datetime) -> int:
+    """Queue every pending transition due before ``horizon``; overdue ones fire at once."""
+    now = datetime.utcnow()
+    lead = _prewarm_lead()
+    pending = union_all(
+        select(ExamSchedule.publish_at, literal(PUBLISH), ExamSchedule.id, ExamSchedule.exam_id)
+        .where(ExamSchedule.is_published.isnot(True), ExamSchedule.publish_at < horizon),
+        # Exams that already started are warmed by their first request instead
+        select(ExamSchedule.start_at - lead, literal(PREWARM), ExamSchedule.id, ExamSchedule.exam_id)
+        .where(ExamSchedule.is_expired.isnot(True), ExamSchedule.start_at < horizon + lead, ExamSchedule.start_at > now),
+        select(ExamSchedule.end_at, literal(EXPIRE), ExamSchedule.id, ExamSchedule.exam_id)
+        .where(ExamSchedule.is_expired.isnot(True), ExamSchedule.end_at < horizon),
+        select(ExamSchedule.auto_remove_at, literal(REMOVE), ExamSchedule.id, ExamSchedule.exam_id)
+        .where(ExamSchedule.is_removed.isnot(True), ExamSchedule.auto_remove_at < horizon),
+    )
+    rows = (await db.execute(pending)).all()
+    for due_at, kind, schedule_id, exam_id in rows:
+        _push(due_at, kind, schedule_id, exam_id)
+    return len(rows)
+
+
+def _pop_due(now: datetime) -> Dict[str, List[Tuple[int, int]]]:
+    due: Dict[str, List[Tuple[int, int]]] = {}
+    while _heap and _heap[0][0] <= now:
+        due_at, _, kind, schedule_id, exam_id = heapq.heappop(_heap)
+        _queued.discard((kind, schedule_id, due_at))
+        due.setdefault(kind, []).append((schedule_id, exam_id))
+    return due
+
+
+# kind -> (due column, schedule flag, values written to Exam)
+_STATE_CHANGES = {
+    PUBLISH: (ExamSchedule.publish_at, "is_published", lambda now: {"is_active": True}),
+    EXPIRE: (ExamSchedule.end_at, "is_expired", lambda now: {"is_active": False}),
+    REMOVE: (ExamSchedule.auto_remove_at, "is_removed", lambda now: {"is_active": False, "is_deleted": True, "deleted_at": now}),
+}
+
+
+async def apply_transitions(db: AsyncSession, kind: str, schedule_ids: List[int], now: datetime) -> List[int]:
+    """Apply one kind of state change to a batch of schedules; return the exams that changed."""
+    due_column, flag, exam_values = _STATE_CHANGES[kind]
+    flag_column = getattr(ExamSchedule, flag)
+    changed = await db.execute(
+        update(ExamSchedule)
+        .where(ExamSchedule.id.in_(schedule_ids), flag_column.isnot(True), due_column <= now)
+        .values({flag: True})
+        .returning(ExamSchedule.exam_id)
+        .execution_options(synchronize_session=False)
+    )
+    exam_ids = sorted(set(changed.scalars().all()))
+    if exam_ids:
+        # is_active is part of the cached catalog and papers; a new version makes every worker rebuild them
+        await db.execute(
+            update(Exam)
+            .where(Exam.id.in_(exam_ids))
+            .values(content_version=Exam.content_version + 1, **exam_values(now))
+            .execution_options(synchronize_session=False)
+        )
+    return exam_ids
+
+
+async def prewarm_exam(exam_id: int) -> None:
+    """Render the paper and compile the answer key into this worker's caches."""
+    async with AsyncSessionLocal() as db:
+        await get_exam_paper_service(db, exam_id)
+        exam = await db.get(Exam, exam_id)
+        if exam is not None:
+            await get_answer_key(db, exam)
+
+
+async def run_due_transitions(now: Optional[datetime] = None) -> int:
+    """Fire every queued transition that is due; return how many heap entries were handled."""
+    now = now or datetime.utcnow()
+    due = _pop_due(now)
+    if not due:
+        return 0
+
+    changed: Dict[str, List[int]] = {}
+    state_changes = {kind: entries for kind, entries in due.items() if kind in _STATE_CHANGES}
+    if state_changes:
+        async with AsyncSessionLocal() as db:
+            for kind, entries in state_changes.items():
+                changed[kind] = await apply_transitions(db, kind, [schedule_id for schedule_id, _ in entries], now)
+            await db.commit()
+    changed_exams = {exam_id for exam_ids in changed.values() for exam_id in exam_ids}
+    if changed_exams:
+        invalidate_exam_catalog()
+        for exam_id in changed_exams:
+            invalidate_exam_paper(exam_id)
+            invalidate_answer_key(exam_id)
+
+    # Publishing bumps the version, so a freshly published exam is warmed again
+    warm = {exam_id for _, exam_id in due.get(PREWARM, [])} | set(changed.get(PUBLISH, []))
+    for exam_id in warm - set(changed.get(EXPIRE, [])) - set(changed.get(REMOVE, [])):
+        try:
+            await prewarm_exam(exam_id)
+        except Exception as e:
+            print(f"[scheduler] Pre-warming exam {exam_id} failed: {e}")
+
+    return sum(len(entries) for entries in due.values())
+
+
+async def run_exam_scheduler(stop: asyncio.Event) -> None:
+    """Fire schedule transitions on time until ``stop`` is set."""
+    horizon_seconds = settings.EXAM_SCHEDULER_HORIZON_SECONDS
+    next_load = 0.0
+
+    while not stop.is_set():
+        try:
+            if time.monotonic() >= next_load:
+                async with AsyncSessionLocal() as db:
+                    await load_upcoming_transitions(db, datetime.utcnow() + timedelta(seconds=horizon_seconds))
+                # Reload well before the horizon runs out so nothing is loaded late
+                next_load = time.monotonic() + horizon_seconds / 2
+            await run_due_transitions()
+        except Exception as e:
+            print(f"[scheduler] Iteration failed: {e}")
+            next_load = min(next_load, time.monotonic() + 30)
+
+        # Sleep until the next transition, the next reload, a schedule change or shutdown
+        timeout = next_load - time.monotonic()
+        if _heap:
+            timeout = min(timeout, (_heap[0][0] - datetime.utcnow()).total_seconds())
+        _wake.clear()
+        if timeout > 0:
+            waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(_wake.wait())]
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+
+
+async def get_exam_schedule_service(db: AsyncSession, exam_id: int) -> ExamSchedule:
+    schedule = (await db.execute(
+        select(ExamSchedule).where(ExamSchedule.exam_id == exam_id).order_by(ExamSchedule.id.desc()).limit(1)
+    )).scalars().first()
+    if schedule is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam has no schedule")
+    return schedule
+
+
+async def save_exam_schedule_service(db: AsyncSession, exam_id: int, data: dict) -> ExamSchedule:
+    """Create or replace an exam's schedule and queue its transitions.
+
+    The exam's start/end times follow the schedule. Without an explicit
+    auto_remove_at, removal falls on end_at + Exam.auto_remove_after_days.
+    Without a future publish_at the schedule counts as published at once, and
+    moving end_at or auto_remove_at of an expired or removed exam into the
+    future brings the exam back.
+    """
+    exam = await db.get(Exam, exam_id)
+    if exam is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+    if data["end_at"] <= data["start_at"]:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_at must be after start_at")
+
+    auto_remove_at = data.get("auto_remove_at")
+    if auto_remove_at is None and exam.auto_remove_after_days:
+        auto_remove_at = data["end_at"] + timedelta(days=exam.auto_remove_after_days)
+
+    schedule = (await db.execute(
+        select(ExamSchedule).where(ExamSchedule.exam_id == exam_id).order_by(ExamSchedule.id.desc()).limit(1)
+    )).scalars().first()
+    if schedule is None:
+        schedule = ExamSchedule(exam_id=exam_id)
+        db.add(schedule)
+
+    now = datetime.utcnow()
+    was_published, was_expired, was_removed = bool(schedule.is_published), bool(schedule.is_expired), bool(schedule.is_removed)
+    schedule.publish_at = data.get("publish_at")
+    schedule.start_at = data["start_at"]
+    schedule.end_at = data["end_at"]
+    schedule.auto_remove_at = auto_remove_at
+    # Without a future publish_at the exam is published now; no transition is queued for it
+    publish_pending = schedule.publish_at is not None and schedule.publish_at > now
+    schedule.is_published = not publish_pending
+    # Moving a time into the future re-arms its transition
+    schedule.is_expired = schedule.end_at <= now and was_expired
+    schedule.is_removed = bool(auto_remove_at is not None and auto_remove_at <= now) and was_removed
+
+    exam.start_time = schedule.start_at
+    exam.end_time = schedule.end_at.date()
+    if publish_pending:
+        exam.is_active = False  # hidden until published
+    elif (
+        (schedule.is_published and not was_published)
+        or (was_expired and not schedule.is_expired)
+        or (was_removed and not schedule.is_removed)
+    ) and not schedule.is_expired and not schedule.is_removed:
+        # Nothing else would bring the exam back once its hiding transition is undone
+        exam.is_active = True
+        if was_removed:
+            exam.is_deleted = False
+            exam.deleted_at = None
+    exam.content_version = Exam.content_version + 1
+    await db.commit()
+    await db.refresh(schedule)
+
+    invalidate_exam_catalog()
+    invalidate_exam_paper(exam_id)
+    invalidate_answer_key(exam_id)
+    notify_schedule_changed(schedule)
+    return schedule
@@ -0,0 +1,282 @@
+# Backend/app/services/session_service.py
+"""
+Server-side exam sessions.
+
+Starting an exam opens an ExamSession whose must_complete_by is started_at
+plus the exam duration. Submissions are checked against that deadline (with
+EXAM_SESSION_GRACE_SECONDS of slack for the request in flight), and a
+background sweeper closes sessions whose deadline has passed, marking them
+auto-submitted in batched UPDATEs and grading their autosaved drafts.
+
+Open sessions are kept in a per-worker index keyed by (exam_id, user_id), so
+the deadline check on submit is a dict lookup. On a miss (no session, or one
+opened on another worker or before a restart) the submit loads the user's
+latest session in the same query as the exam, and an open one fills the
+index. A heap ordered by deadline lets the sweeper drop expired entries
+without scanning the index.
+
+A submit locks its session row (FOR UPDATE) and the sweeper claims rows with
+FOR UPDATE SKIP LOCKED, so a session is closed by exactly one of them.
+"""
+
+import asyncio
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.lib.config import settings
+from app.lib.db import AsyncSessionLocal
+from app.models import ExamSession
+
+
+@dataclass(frozen=True)
+class ActiveSession:
+    id: int
+    exam_id: int
+    user_id: int
+    started_at: datetime
+    must_complete_by: datetime
+
+    def remaining_seconds(self, now: Optional[datetime] = None) -> int:
+        return max(0, int((self.must_complete_by - (now or datetime.utcnow())).total_seconds()))
+
+
+_active: Dict[Tuple[int, int], ActiveSession] = {}
+_deadlines: List[Tuple[datetime, int, int, int]] = []  # (must_complete_by, session id, exam id, user id)
+
+
+def _grace() -> timedelta:
+    return timedelta(seconds=settings.EXAM_SESSION_GRACE_SECONDS)
+
+
+def _snapshot(session: ExamSession) -> ActiveSession:
+    return ActiveSession(
+        id=session.id,
+        exam_id=session.exam_id,
+        user_id=session.user_id,
+        started_at=session.started_at,
+        must_complete_by=session.must_complete_by,
+    )
+
+
+def register_session(session: ActiveSession) -> None:
+    """Add an open session to this worker's index."""
+    _active[(session.exam_id, session.user_id)] = session
+    heapq.heappush(_deadlines, (session.must_complete_by, session.id, session.exam_id, session.user_id))
+
+
+def forget_session(exam_id: int, user_id: int, session_id: Optional[int] = None) -> None:
+    """Drop a closed session from the index (only if it is still the indexed one)."""
+    current = _active.get((exam_id, user_id))
+    if current is not None and (session_id is None or current.id == session_id):
+        del _active[(exam_id, user_id)]
+
+
+def _prune_expired(cutoff: datetime) -> None:
+    while _deadlines and _deadlines[0][0] < cutoff:
+        _, session_id, exam_id, user_id = heapq.heappop(_deadlines)
+        forget_session(exam_id, user_id, session_id)
+
+
+async def load_latest_session(db: AsyncSession, exam_id: int, user_id: int) -> Optional[ExamSession]:
+    """Return the user's most recent session for an exam, indexing it if still open."""
+    row = await db.execute(
+        select(ExamSession)
+        .where(ExamSession.exam_id == exam_id, ExamSession.user_id == user_id)
+        .order_by(ExamSession.id.desc())
+        .limit(1)
+    )
+    latest = row.scalars().first()
+    if latest is not None and latest.is_active:
+        register_session(_snapshot(latest))
+    return latest
+
+
+def latest_session_id(exam_id: int, user_id: int):
+    """Scalar subquery for the id of the user's most recent session for an exam."""
+    latest = aliased(ExamSession)
+    return (
+        select(latest.id)
+        .where(latest.exam_id == exam_id, latest.user_id == user_id)
+        .order_by(latest.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def get_indexed_session(exam_id: int, user_id: int) -> Optional[ActiveSession]:
+    return _active.get((exam_id, user_id))
+
+
+def is_expired(session: ActiveSession, now: Optional[datetime] = None) -> bool:
+    return (now or datetime.utcnow()) > session.must_complete_by + _grace()
+
+
+def timed_out(session: Optional[ExamSession]) -> bool:
+    """True if the session was closed by the sweeper rather than by a submission."""
+    return session is not None and bool(session.is_auto_submitted) and not session.is_submitted
+
+
+async def open_session(db: AsyncSession, exam_id: int, user_id: int, duration_minutes: int) -> ActiveSession:
+    """Create and commit a new session; it is indexed once committed."""
+    started_at = datetime.utcnow()
+    session = ExamSession(
+        exam_id=exam_id,
+        user_id=user_id,
+        started_at=started_at,
+        must_complete_by=started_at + timedelta(minutes=duration_minutes),
+        is_active=True,
+    )
+    db.add(session)
+    await db.commit()
+    active = _snapshot(session)
+    register_session(active)
+    return active
+
+
+def check_submission_deadline(exam_id: int, user_id: int, latest: Optional[ExamSession] = None) -> Optional[ActiveSession]:
+    """Validate a submission against the user's session and return that session.
+
+    ``latest`` is the user's most recent session, loaded by the caller when
+    the index has none. Returns None when the user never started one and
+    sessions are optional.
+    """
+    session = get_indexed_session(exam_id, user_id)
+    if session is None:
+        if timed_out(latest):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Time is up for this exam")
+        if latest is None or not latest.is_active:
+            if settings.EXAM_SESSION_REQUIRED:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Start the exam before submitting")
+            return None
+        session = _snapshot(latest)
+        register_session(session)
+
+    if is_expired(session):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Time is up for this exam")
+    return session
+
+
+async def lock_session_for_submit(db: AsyncSession, session: ActiveSession) -> None:
+    """Lock the session row until the submit commits; fail if it was closed meanwhile."""
+    locked = await db.execute(
+        select(ExamSession.is_active, ExamSession.is_auto_submitted)
+        .where(ExamSession.id == session.id)
+        .with_for_update()
+    )
+    locked = locked.first()
+    if locked is not None and locked.is_active:
+        return
+    forget_session(session.exam_id, session.user_id, session.id)
+    if locked is not None and locked.is_auto_submitted:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Time is up for this exam")
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This exam session has already been submitted")
+
+
+async def mark_session_submitted(db: AsyncSession, session_ids: List[int]) -> None:
+    """Close sessions whose submission is being written in the current transaction."""
+    if not session_ids:
+        return
+    await db.execute(
+        update(ExamSession)
+        .where(ExamSession.id.in_(session_ids), ExamSession.is_active == True)
+        .values(is_active=False, is_submitted=True, completed_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _close_sessions(db: AsyncSession, claimed) -> list:
+    """Mark the sessions selected by ``claimed`` auto-submitted; return their rows."""
+    closed = await db.execute(
+        update(ExamSession)
+        .where(ExamSession.id.in_(claimed.scalar_subquery()))
+        .values(is_active=False, is_auto_submitted=True, completed_at=ExamSession.must_complete_by)
+        .returning(
+            ExamSession.id, ExamSession.exam_id, ExamSession.user_id,
+            ExamSession.must_complete_by, ExamSession.draft_answers,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return closed.all()
+
+
+async def sweep_expired_sessions(limit: Optional[int] = None) -> int:
+    """Auto-submit up to ``limit`` sessions past their deadline; return how many were closed.
+
+    Each closed session's autosaved draft is graded into a Result in the same
+    transaction; sessions with no answers are marked abandoned. If the batch
+    fails, its sessions are retried one per transaction, and a session that
+    still fails is closed without a Result, its draft kept in draft_answers.
+
+    Rows are claimed with SKIP LOCKED, so sweepers on several workers split
+    the backlog instead of blocking on each other, and a session locked by an
+    in-flight submit is left to it; once that commits the session is no
+    longer active.
+    """
+    cutoff = datetime.utcnow() - _grace()
+    # Drafts are accepted until the grace period ends; one flush interval later the
+    # saves still in flight then have reached the database, on whichever worker
+    drafts_settled = cutoff - timedelta(seconds=settings.EXAM_DRAFT_FLUSH_INTERVAL_SECONDS)
+    expired = (
+        select(ExamSession.id)
+        .where(ExamSession.is_active == True, ExamSession.must_complete_by < drafts_settled)
+        .order_by(ExamSession.must_complete_by)
+        .limit(limit or settings.EXAM_SESSION_SWEEP_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    # draft_service builds on this module, so it is imported here
+    from app.services.draft_service import auto_submit_drafts, close_failed_session
+
+    async with AsyncSessionLocal() as db:
+        closed = await _close_sessions(db, expired)
+        try:
+            await auto_submit_drafts(db, closed)
+            failed = []
+        except Exception as e:
+            print(f"[sessions] Auto-submitting {len(closed)} sessions failed: {e}")
+            failed = [session_id for session_id, *_ in closed]
+
+    # Retry each session of a failed batch alone, so one bad draft cannot stall the sweep
+    if failed:
+        closed = []
+        for session_id in failed:
+            async with AsyncSessionLocal() as db:
+                one = await _close_sessions(db, expired.where(ExamSession.id == session_id))
+                try:
+                    await auto_submit_drafts(db, one)
+                    submitted = True
+                except Exception as e:
+                    print(f"[sessions] Session {session_id} could not be auto-submitted: {e}")
+                    submitted = False
+            if one and not submitted:
+                await close_failed_session(session_id)
+            closed.extend(one)
+
+    for session_id, exam_id, user_id, _, _ in closed:
+        forget_session(exam_id, user_id, session_id)
+    # Sessions closed by other workers' sweepers leave the index here
+    _prune_expired(cutoff)
+    return len(closed)
+
+
+async def run_session_sweeper(stop: asyncio.Event) -> None:
+    """Close expired sessions until ``stop`` is set."""
+    while not stop.is_set():
+        try:
+            closed = await sweep_expired_sessions()
+        except Exception as e:
+            print(f"[sessions] Sweep failed: {e}")
+            closed = 0
+
+        # Keep sweeping while full batches come back; otherwise wait for the next tick
+        if closed < settings.EXAM_SESSION_SWEEP_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.EXAM_SESSION_SWEEP_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,442 @@
+# Backend/app/services/submission_ingest.py
+"""
+Write-behind ingest for exam submissions.
+
+With SUBMISSION_INGEST_MODE enabled, submit requests are graded in memory and
+appended to a local SQLite journal (one file shared by all workers on the
+host), then acknowledged with a provisional score. A background writer per
+worker drains the journal and persists Results and Answers to Postgres with
+batched multi-row INSERTs (Answers through insert_answer_rows).
+
+Every submission carries an idempotency key. The journal rejects duplicate
+keys, and Result.idempotency_key is unique with ON CONFLICT DO NOTHING, so
+client retries and overlapping writers never create a second attempt. A
+writer claims the rows it takes, so workers never flush the same batch;
+claims left behind by a writer that died are released after
+SUBMISSION_CLAIM_TIMEOUT_SECONDS. For single-attempt exams the journal
+admits one in-flight submission per user (checked and inserted in one
+SQLite transaction), and the writer drops any attempt beyond the first.
+
+A row that fails to persist on its own while the database is reachable goes
+back to pending with its attempt counted; after SUBMISSION_MAX_ATTEMPTS it is
+marked failed. Rows that fail because the database is down stay pending
+without using up attempts.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.lib.config import settings
+from app.lib.db import AsyncSessionLocal
+from app.models import Exam, Result
+from app.services.grading_service import GradingOutcome
+from app.services.result_service import insert_answer_rows
+from app.services.leaderboard_service import apply_to_cached_leaderboards, upsert_leaderboard_entries
+from app.services.session_service import mark_session_submitted
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent.parent
+
+STATUS_PENDING = "pending"
+STATUS_CLAIMED = "claimed"
+STATUS_FLUSHED = "flushed"
+STATUS_FAILED = "failed"
+
+# Outcomes of SubmissionQueue.put
+PUT_QUEUED = "queued"
+PUT_DUPLICATE = "duplicate"
+PUT_REJECTED = "rejected"
+
+
+def build_idempotency_key(user_id: int, exam_id: int, client_key: Optional[str]) -> str:
+    """Scope a client-supplied key to the user and exam; generate one if absent."""
+    return f"{user_id}:{exam_id}:{client_key or uuid.uuid4().hex}"
+
+
+class SubmissionQueue:
+    """Durable FIFO of graded submissions, stored in a SQLite file (WAL mode)."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._owner = uuid.uuid4().hex  # this writer's claims
+        # Autocommit: transactions are opened explicitly where they are needed
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS submissions (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                exam_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                error TEXT,
+                created_at REAL NOT NULL,
+                flushed_at REAL,
+                owner TEXT,
+                claimed_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Journals created before rows were claimed and retried
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(submissions)")}
+        for column, kind in (("owner", "TEXT"), ("claimed_at", "REAL"), ("attempts", "INTEGER NOT NULL DEFAULT 0")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE submissions ADD COLUMN {column} {kind}")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_submissions_pending ON submissions (status, seq)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_submissions_exam_user ON submissions (exam_id, user_id)"
+        )
+        self._reclaim_stale()
+
+    def _put(self, key: str, exam_id: int, user_id: int, payload: dict, single_attempt: bool = False) -> str:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so no other worker can slip an attempt in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT 1 FROM submissions WHERE idempotency_key = ?", (key,)).fetchone():
+                    return PUT_DUPLICATE
+                if single_attempt and self._conn.execute(
+                    "SELECT 1 FROM submissions WHERE exam_id = ? AND user_id = ? AND status != ? LIMIT 1",
+                    (exam_id, user_id, STATUS_FAILED),
+                ).fetchone():
+                    return PUT_REJECTED
+                self._conn.execute(
+                    "INSERT INTO submissions (idempotency_key, exam_id, user_id, payload, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, exam_id, user_id, json.dumps(payload), time.time()),
+                )
+                return PUT_QUEUED
+            finally:
+                self._conn.execute("COMMIT")
+
+    def _get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM submissions WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _take(self, limit: int) -> List[Tuple[int, dict]]:
+        """Claim up to ``limit`` pending rows for this writer, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "UPDATE submissions SET status = ?, owner = ?, claimed_at = ? "
+                "WHERE seq IN (SELECT seq FROM submissions WHERE status = ? ORDER BY seq LIMIT ?) "
+                "RETURNING seq, payload",
+                (STATUS_CLAIMED, self._owner, time.time(), STATUS_PENDING, limit),
+            ).fetchall()
+        return sorted((seq, json.loads(payload)) for seq, payload in rows)
+
+    def _release(self, seqs: List[int]) -> None:
+        if not seqs:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE submissions SET status = ?, owner = NULL, claimed_at = NULL WHERE seq = ? AND owner = ?",
+                [(STATUS_PENDING, seq, self._owner) for seq in seqs],
+            )
+
+    def _retry(self, failures: List[Tuple[int, str]], max_attempts: int) -> List[int]:
+        """Count a failed attempt for each row and release it, or fail it once ``max_attempts`` is used up.
+
+        Returns the seqs that were marked failed.
+        """
+        if not failures:
+            return []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                failed = []
+                for seq, error in failures:
+                    row = self._conn.execute(
+                        "UPDATE submissions SET attempts = attempts + 1, error = ?, owner = NULL, claimed_at = NULL, "
+                        "status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END, "
+                        "flushed_at = CASE WHEN attempts + 1 >= ? THEN ? ELSE flushed_at END "
+                        "WHERE seq = ? AND owner = ? RETURNING status",
+                        (error, max_attempts, STATUS_FAILED, STATUS_PENDING, max_attempts, time.time(), seq, self._owner),
+                    ).fetchone()
+                    if row and row[0] == STATUS_FAILED:
+                        failed.append(seq)
+                return failed
+            finally:
+                self._conn.execute("COMMIT")
+
+    def _reclaim_stale(self) -> int:
+        """Return rows claimed by a writer that stopped before flushing them to the queue."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE submissions SET status = ?, owner = NULL, claimed_at = NULL "
+                "WHERE status = ? AND claimed_at < ?",
+                (STATUS_PENDING, STATUS_CLAIMED, time.time() - settings.SUBMISSION_CLAIM_TIMEOUT_SECONDS),
+            )
+        return cursor.rowcount
+
+    def _mark(self, seqs: List[int], status: str, error: Optional[str] = None) -> None:
+        if not seqs:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE submissions SET status = ?, error = ?, flushed_at = ? WHERE seq = ?",
+                [(status, error, time.time(), seq) for seq in seqs],
+            )
+
+    def _purge(self, older_than: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM submissions WHERE status = ? AND flushed_at < ?",
+                (STATUS_FLUSHED, older_than),
+            )
+
+    # SQLite calls are short but blocking, so they run off the event loop
+    async def put(self, key: str, exam_id: int, user_id: int, payload: dict, single_attempt: bool = False) -> str:
+        return await asyncio.to_thread(self._put, key, exam_id, user_id, payload, single_attempt)
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def take(self, limit: int) -> List[Tuple[int, dict]]:
+        return await asyncio.to_thread(self._take, limit)
+
+    async def release(self, seqs: List[int]) -> None:
+        await asyncio.to_thread(self._release, seqs)
+
+    async def retry(self, failures: List[Tuple[int, str]], max_attempts: int) -> List[int]:
+        return await asyncio.to_thread(self._retry, failures, max_attempts)
+
+    async def reclaim_stale(self) -> int:
+        return await asyncio.to_thread(self._reclaim_stale)
+
+    async def mark(self, seqs: List[int], status: str, error: Optional[str] = None) -> None:
+        await asyncio.to_thread(self._mark, seqs, status, error)
+
+    async def purge(self, older_than: float) -> None:
+        await asyncio.to_thread(self._purge, older_than)
+
+
+_queue: Optional[SubmissionQueue] = None
+
+
+def get_submission_queue() -> SubmissionQueue:
+    """Open the journal on first use so workers without ingest mode never create it."""
+    global _queue
+    if _queue is None:
+        _queue = SubmissionQueue(BACKEND_ROOT / settings.SUBMISSION_QUEUE_PATH)
+    return _queue
+
+
+async def enqueue_submission(
+    exam_id: int,
+    user_id: int,
+    idempotency_key: str,
+    outcome: GradingOutcome,
+    session_id: Optional[int] = None,
+    single_attempt: bool = False,
+) -> dict:
+    """Journal a graded submission and return its provisional acknowledgement.
+
+    Retrying with the same idempotency key returns the original acknowledgement.
+    With ``single_attempt``, a second submission from the user is rejected
+    while the first is still in the journal.
+    """
+    queue = get_submission_queue()
+    ack = {
+        "idempotency_key": idempotency_key,
+        "exam_id": exam_id,
+        "user_id": user_id,
+        "correct_answers": outcome.correct_answers,
+        "incorrect_answers": outcome.incorrect_answers,
+        "mark": outcome.mark,
+        "submission_time": datetime.utcnow().isoformat(),
+        "status": "queued",
+    }
+    payload = {**ack, "session_id": session_id, "answer_rows": outcome.answer_rows}
+    queued = await queue.put(idempotency_key, exam_id, user_id, payload, single_attempt=single_attempt)
+    if queued == PUT_DUPLICATE:
+        existing = await queue.get(idempotency_key)
+        return _ack_from_payload(existing)
+    if queued == PUT_REJECTED:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Multiple attempts not allowed for this exam")
+    return ack
+
+
+async def get_queued_submission(idempotency_key: str) -> Optional[dict]:
+    """Return the acknowledgement of an already-journaled submission, if any."""
+    payload = await get_submission_queue().get(idempotency_key)
+    return _ack_from_payload(payload) if payload else None
+
+
+def _ack_from_payload(payload: dict) -> dict:
+    return {key: value for key, value in payload.items() if key not in ("answer_rows", "session_id")}
+
+
+async def persist_graded_submissions(db, payloads: List[dict]) -> List[str]:
+    """Insert Results (multi-row, ON CONFLICT DO NOTHING) and their Answers in one transaction.
+
+    Returns the idempotency keys that were dropped because their single-attempt
+    exam already has a Result for the user.
+    """
+    # Keys an earlier flush already persisted are left to ON CONFLICT below
+    persisted_keys = set((await db.execute(
+        select(Result.idempotency_key).where(Result.idempotency_key.in_([p["idempotency_key"] for p in payloads]))
+    )).scalars().all())
+    pairs = {(p["exam_id"], p["user_id"]) for p in payloads}
+    last_attempts = await db.execute(
+        select(Result.exam_id, Result.user_id, func.max(Result.attempt_number))
+        .where(tuple_(Result.exam_id, Result.user_id).in_(pairs))
+        .group_by(Result.exam_id, Result.user_id)
+    )
+    next_attempt: Dict[Tuple[int, int], int] = {
+        (exam_id, user_id): last for exam_id, user_id, last in last_attempts.all()
+    }
+    single_attempt = set((await db.execute(
+        select(Exam.id).where(Exam.id.in_({exam_id for exam_id, _ in pairs}), Exam.allow_multiple_attempts.isnot(True))
+    )).scalars().all())
+
+    # (exam_id, user_id, attempt_number) is unique: if a direct submit takes one of these
+    # numbers meanwhile, the batch fails and the per-row retry re-reads the maximum
+    result_rows = []
+    rejected = []
+    for p in payloads:
+        pair = (p["exam_id"], p["user_id"])
+        if p["exam_id"] in single_attempt and next_attempt.get(pair, 0) >= 1 and p["idempotency_key"] not in persisted_keys:
+            rejected.append(p["idempotency_key"])
+            continue
+        next_attempt[pair] = next_attempt.get(pair, 0) + 1
+        result_rows.append({
+            "exam_id": p["exam_id"],
+            "user_id": p["user_id"],
+            "correct_answers": p["correct_answers"],
+            "incorrect_answers": p["incorrect_answers"],
+            "mark": p["mark"],
+            "submission_time": datetime.fromisoformat(p["submission_time"]),
+            "attempt_number": next_attempt[pair],
+            "idempotency_key": p["idempotency_key"],
+            "session_id": p.get("session_id"),
+        })
+
+    result_ids = {}
+    if result_rows:
+        inserted = await db.execute(
+            pg_insert(Result)
+            .values(result_rows)
+            .on_conflict_do_nothing(index_elements=[Result.idempotency_key])
+            .returning(Result.id, Result.idempotency_key)
+        )
+        result_ids = {key: result_id for result_id, key in inserted.all()}
+
+    # Keys that conflicted were already persisted by an earlier flush; skip their answers
+    answer_rows = [
+        {**row, "result_id": result_ids[p["idempotency_key"]]}
+        for p in payloads
+        if p["idempotency_key"] in result_ids
+        for row in p["answer_rows"]
+    ]
+    await insert_answer_rows(db, answer_rows)
+
+    persisted = [p for p in payloads if p["idempotency_key"] in result_ids]
+    await upsert_leaderboard_entries(db, [
+        (p["exam_id"], p["user_id"], result_ids[p["idempotency_key"]], p["mark"]) for p in persisted
+    ])
+    await mark_session_submitted(db, [p["session_id"] for p in persisted if p.get("session_id")])
+
+    await db.commit()
+    apply_to_cached_leaderboards([(p["exam_id"], p["user_id"], p["mark"]) for p in persisted])
+    return rejected
+
+
+async def _mark_rejected(seqs: List[int]) -> None:
+    for seq in seqs:
+        print(f"[ingest] Submission #{seq} dropped: the exam allows a single attempt")
+    await get_submission_queue().mark(seqs, STATUS_FAILED, error="Multiple attempts not allowed for this exam")
+
+
+async def _database_reachable() -> bool:
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+
+async def flush_pending_submissions(limit: Optional[int] = None) -> int:
+    """Persist up to ``limit`` journaled submissions; return how many left the queue (persisted or failed)."""
+    queue = get_submission_queue()
+    batch = await queue.take(limit or settings.SUBMISSION_FLUSH_BATCH_SIZE)
+    if not batch:
+        return 0
+
+    try:
+        async with AsyncSessionLocal() as db:
+            rejected = set(await persist_graded_submissions(db, [payload for _, payload in batch]))
+        await queue.mark([seq for seq, p in batch if p["idempotency_key"] not in rejected], STATUS_FLUSHED)
+        await _mark_rejected([seq for seq, p in batch if p["idempotency_key"] in rejected])
+        return len(batch)
+    except Exception as e:
+        print(f"[ingest] Batch flush of {len(batch)} submissions failed: {e}")
+
+    # Isolate the bad rows so one poisoned submission cannot stall the whole queue
+    failed: List[Tuple[int, str]] = []
+    for seq, payload in batch:
+        try:
+            async with AsyncSessionLocal() as db:
+                rejected = await persist_graded_submissions(db, [payload])
+            if rejected:
+                await _mark_rejected([seq])
+            else:
+                await queue.mark([seq], STATUS_FLUSHED)
+        except Exception as e:
+            failed.append((seq, str(e)))
+
+    if len(failed) == len(batch) and not await _database_reachable():
+        # The database is down, not the rows: keep them pending without using up attempts
+        await queue.release([seq for seq, _ in batch])
+        return 0
+    for seq in await queue.retry(failed, settings.SUBMISSION_MAX_ATTEMPTS):
+        print(f"[ingest] Submission #{seq} could not be persisted after {settings.SUBMISSION_MAX_ATTEMPTS} attempts")
+    return len(batch) - len(failed)
+
+
+async def run_submission_writer(stop: asyncio.Event) -> None:
+    """Drain the journal until ``stop`` is set, then flush whatever is left."""
+    retention = settings.SUBMISSION_QUEUE_RETENTION_HOURS * 3600
+    last_purge = 0.0
+
+    while not stop.is_set():
+        try:
+            flushed = await flush_pending_submissions()
+            if time.time() - last_purge > 60:
+                await get_submission_queue().purge(time.time() - retention)
+                await get_submission_queue().reclaim_stale()
+                last_purge = time.time()
+        except Exception as e:
+            print(f"[ingest] Writer iteration failed: {e}")
+            flushed = 0
+
+        # Keep draining while full batches are waiting; otherwise sleep until the next tick
+        if flushed < settings.SUBMISSION_FLUSH_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.SUBMISSION_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    while await flush_pending_submissions():
+        pass
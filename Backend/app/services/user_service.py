@@ -9,17 +9,20 @@ from app.models import (
     UserExamAccess,
     Payment,
     AdmissionRequest,
+    LeaderboardEntry,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from app.schemas import RegisterRequest
 from app.schemas.user import UserUpdate
-from app.utils.hashing import get_password_hash
+from app.utils.hashing import UNUSABLE_PASSWORD, get_password_hash_async
+from app.services.leaderboard_service import invalidate_leaderboard
+from app.utils.jwt import invalidate_principal
 from app.models.enums import UserRole
 from typing import List, Optional
-import secrets
 
 
 async def get_user_by_email(db: AsyncSession, email: str):
@@ -49,7 +52,7 @@ async def create_user(db: AsyncSession, payload: RegisterRequest):
         user = User(
             name=payload.name,
             email=payload.email,
-            password_hash=get_password_hash(payload.password),
+            password_hash=await get_password_hash_async(payload.password),
             active_mobile=payload.active_mobile,
             whatsapp=payload.whatsapp,
             dob=payload.dob,
@@ -140,6 +143,7 @@ async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate) -
                 setattr(user, field, value)
         
         await db.commit()
+        invalidate_principal(user_id)
         await db.refresh(user)
         
         return user
@@ -174,9 +178,12 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
         await db.execute(delete(UserCourseRelation).where(UserCourseRelation.c.User_id == user_id))
         await db.execute(delete(Payment).where(Payment.user_id == user_id))
         await db.execute(delete(AdmissionRequest).where(AdmissionRequest.user_id == user_id))
+        await db.execute(delete(LeaderboardEntry).where(LeaderboardEntry.user_id == user_id))
         
         await db.delete(user)
         await db.commit()
+        invalidate_principal(user_id)
+        invalidate_leaderboard()
         
         return True
         
@@ -189,24 +196,27 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
         )
 
 
-async def create_or_get_anonymous_user(db: AsyncSession, name: str, email: str, active_mobile: Optional[str] = None) -> User:
-    """Fetch user by email; if none, create an is_anonymous user with random password."""
-    existing = await get_user_by_email(db, email)
-    if existing:
-        return existing
+async def upsert_anonymous_user(db: AsyncSession, name: str, email: str, active_mobile: Optional[str] = None) -> User:
+    """Return the user for ``email``, creating an is_anonymous user if there is none.
 
-    random_password = secrets.token_hex(8)
-    user = User(
+    One INSERT ... ON CONFLICT (email) statement, without committing, so the
+    caller can store the submission in the same transaction. Anonymous users
+    get an unusable password marker instead of a bcrypt hash; nobody logs in
+    with them.
+    """
+    stmt = pg_insert(User).values(
         name=name,
         email=email,
-        password_hash=get_password_hash(random_password),
+        password_hash=UNUSABLE_PASSWORD,
         active_mobile=active_mobile,
         role=UserRole.USER.value,
         is_anonymous=True,
-        is_active=True
+        is_active=True,
     )
-
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    return user
\ No newline at end of file
+    # A no-op update makes RETURNING yield the existing row on conflict
+    stmt = stmt.on_conflict_do_update(index_elements=[User.email], set_={"email": stmt.excluded.email})
+    result = await db.scalars(
+        stmt.returning(User),
+        execution_options={"populate_existing": True},
+    )
+    return result.one()
\ No newline at end of file
@@ -1,12 +1,24 @@
 import re
-from typing import List, Optional, Tuple
-from app.utils.docx_utils import extract_questions_from_docx
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from docx import Document
+from docx.document import Document as DocxDocument
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from app.utils.docx_utils import iter_block_fragments, iter_block_items, store_image
 from app.schemas import QuestionCreateRequest
 
 
 DELIM_QUESTION = '=='
 DELIM_SECTION = '--'
 
+# Extracted images go where uploaded question images live (served by the /uploads mount)
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+IMAGE_DIR = BACKEND_ROOT / 'uploads' / 'questions'
+IMAGE_URL = '/uploads/questions'
+
 
 _MARKER_TEMPLATE = r'^(?:<span[^>]*?>)?\s*{token}\s*(?:</span>)?$'
 
@@ -39,19 +51,14 @@ def _split_text_and_image(section: str) -> Tuple[Optional[str], Optional[str]]:
 
     text_value = '\n'.join(text_parts).strip() if text_parts else None
 
-    # If image_tag is base64, save it as file and return URL
+    # If image_tag is base64 (embedded images), save it as file and return URL
     if image_tag and image_tag.startswith('data:'):
-        import base64, mimetypes, os
+        import base64, mimetypes
         header, b64data = image_tag.split(',', 1)
         mime = header.split(';')[0][5:]
         ext = mimetypes.guess_extension(mime) or '.png'
-        filename = f"img_{abs(hash(image_tag))}{ext}"
-        public_dir = os.path.join(os.path.dirname(__file__), '../../public')
-        os.makedirs(public_dir, exist_ok=True)
-        file_path = os.path.join(public_dir, filename)
-        with open(file_path, 'wb') as f:
-            f.write(base64.b64decode(b64data))
-        url = f"/public/{filename}"
+        filename = store_image(base64.b64decode(b64data), IMAGE_DIR, ext)
+        url = f"{IMAGE_URL}/{filename}"
         return text_value, url
     return text_value, image_tag
 
@@ -99,40 +106,36 @@ def _build_question_from_segments(segments: List[str]) -> Optional[QuestionCreat
     return QuestionCreateRequest(
         q_type="MCQ",
         content=content_text or content_img or '',
-        image=content_img,
+        image_url=content_img,
         option_a=option_text.get('a'),
-        option_a_img=option_img.get('a'),
+        option_a_image_url=option_img.get('a'),
         option_b=option_text.get('b'),
-        option_b_img=option_img.get('b'),
+        option_b_image_url=option_img.get('b'),
         option_c=option_text.get('c'),
-        option_c_img=option_img.get('c'),
+        option_c_image_url=option_img.get('c'),
         option_d=option_text.get('d'),
-        option_d_img=option_img.get('d'),
+        option_d_image_url=option_img.get('d'),
         answer=answer
     )
 
 
-def docx_to_questions(file_path: str) -> List[QuestionCreateRequest]:
-    """Parse a DOCX file into a list of QuestionCreateRequest objects.
+def image_storage_config() -> Dict[str, Union[bool, Path, str]]:
+    """Image settings for one parse: images go straight from the DOCX into IMAGE_DIR, named by content."""
+    return {
+        'embed': False,
+        'dir': IMAGE_DIR,
+        'url': IMAGE_URL,
+        'content_addressed': True,
+    }
 
-    Expected structure per question:
-    - lines until "--" => question content (text or image)
-    - subsequent "--" blocks => options A, B, C, D
-    - next block => answers (comma/space separated, case-insensitive)
-    - next block (optional) => explanation
-    - next block (optional) => tags (comma separated)
-    Questions are separated by lines containing "==".
-    Empty blocks are honored, so consecutive "--" keeps an empty explanation
-    before a tags block.
-    """
 
-    fragments = extract_questions_from_docx(file_path)
-    questions: List[QuestionCreateRequest] = []
+def iter_question_segments(fragments: Iterable[str]) -> Iterator[List[str]]:
+    """Group fragments into per-question segment lists, yielding each at its "==" delimiter."""
     segments: List[str] = []
     current_lines: List[str] = []
 
     def flush_segment(force: bool = False):
-        nonlocal current_lines, segments
+        nonlocal current_lines
         if current_lines or force:
             segments.append('\n'.join(current_lines).strip())
             current_lines = []
@@ -144,9 +147,7 @@ def docx_to_questions(file_path: str) -> List[QuestionCreateRequest]:
         if _is_marker(fragment, DELIM_QUESTION):
             flush_segment(force=bool(current_lines))
             if segments:
-                question = _build_question_from_segments(segments)
-                if question:
-                    questions.append(question)
+                yield segments
             segments = []
             current_lines = []
             continue
@@ -154,8 +155,105 @@ def docx_to_questions(file_path: str) -> List[QuestionCreateRequest]:
 
     flush_segment(force=bool(current_lines))
     if segments:
+        yield segments
+
+
+def iter_questions(fragments: Iterable[str]) -> Iterator[QuestionCreateRequest]:
+    for segments in iter_question_segments(fragments):
         question = _build_question_from_segments(segments)
         if question:
-            questions.append(question)
+            yield question
+
+
+def fragments_to_questions(fragments: Iterable[str]) -> List[QuestionCreateRequest]:
+    """Group content fragments into questions using the "==" and "--" delimiters."""
+    return list(iter_questions(fragments))
+
+
+def iter_docx_questions(
+    file_path: Union[str, Path],
+    image_config: Optional[Dict[str, Union[bool, Path, str]]] = None
+) -> Iterator[QuestionCreateRequest]:
+    """Stream the questions of a DOCX, each one as soon as its "==" delimiter is read.
+
+    Blocks are rendered one at a time and images are written out as they are
+    met, so only the question being assembled is held in memory (besides the
+    document itself).
+    """
+    doc = Document(str(file_path))
+    config = image_config if image_config is not None else image_storage_config()
+    yield from iter_questions(iter_block_fragments(doc, iter_block_items(doc), config))
+
+
+def docx_to_questions(file_path: str) -> List[QuestionCreateRequest]:
+    """Parse a DOCX file into a list of QuestionCreateRequest objects.
+
+    Expected structure per question:
+    - lines until "--" => question content (text or image)
+    - subsequent "--" blocks => options A, B, C, D
+    - next block => answers (comma/space separated, case-insensitive)
+    - next block (optional) => explanation
+    - next block (optional) => tags (comma separated)
+    Questions are separated by lines containing "==".
+    Empty blocks are honored, so consecutive "--" keeps an empty explanation
+    before a tags block.
+    """
 
-    return questions
\ No newline at end of file
+    return list(iter_docx_questions(file_path))
+
+
+# A chunk is (first block, end block, index of its first paragraph) in document order
+DocxChunk = Tuple[int, int, int]
+
+
+@lru_cache(maxsize=1)
+def _open_document(file_path: str) -> DocxDocument:
+    # A pool process usually parses several chunks of the same upload in a row
+    return Document(file_path)
+
+
+def _is_question_break(doc: DocxDocument, paragraph: Paragraph, paragraph_index: int) -> bool:
+    """The parser's "==" test for one paragraph (a formatted "==" is not a delimiter).
+
+    The plain-text check rules out almost every paragraph; only the rest are
+    rendered the way the parser sees them.
+    """
+    if paragraph.text.strip() != DELIM_QUESTION:
+        return False
+    fragments = iter_block_fragments(doc, [paragraph], image_storage_config(), paragraph_index)
+    return _is_marker(next(fragments, ''), DELIM_QUESTION)
+
+
+def scan_question_chunks(file_path: str, questions_per_chunk: int) -> List[DocxChunk]:
+    """Split a DOCX into block ranges of about ``questions_per_chunk`` questions.
+
+    Only plain paragraph text is read here, except for paragraphs reading
+    "==", so the scan stays cheap. Every chunk ends right after a "==" paragraph (or at the end of the document),
+    so parsing the chunks separately yields the same questions in the same order.
+    """
+    doc = _open_document(file_path)
+    chunks: List[DocxChunk] = []
+    chunk_start = chunk_paragraph = paragraph_index = 0
+    questions = 0
+    block_index = -1
+    for block_index, block in enumerate(iter_block_items(doc)):
+        if isinstance(block, Paragraph):
+            paragraph_index += 1
+            if _is_question_break(doc, block, paragraph_index - 1):
+                questions += 1
+                if questions == questions_per_chunk:
+                    chunks.append((chunk_start, block_index + 1, chunk_paragraph))
+                    chunk_start, chunk_paragraph, questions = block_index + 1, paragraph_index, 0
+        else:
+            paragraph_index += len(block._tbl.findall('.//' + qn('w:p')))
+    if block_index + 1 > chunk_start:
+        chunks.append((chunk_start, block_index + 1, chunk_paragraph))
+    return chunks
+
+
+def parse_docx_chunk(file_path: str, chunk: DocxChunk) -> List[QuestionCreateRequest]:
+    """Parse the questions in one chunk returned by ``scan_question_chunks``."""
+    start, end, paragraph_index = chunk
+    doc = _open_document(file_path)
+    blocks = islice(iter_block_items(doc), start, end)
+    return list(iter_questions(iter_block_fragments(doc, blocks, image_storage_config(), paragraph_index)))
@@ -4,11 +4,15 @@ from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.oxml.ns import qn
 from docx.table import Table, _Cell
 from docx.text.paragraph import Paragraph
+from lxml import etree
 from pathlib import Path
 import base64
+import hashlib
 import html
 import mimetypes
-from typing import Dict, List, Optional, Tuple, Union
+import os
+import weakref
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 
 WORD_NAMESPACES: Dict[str, str] = {
@@ -242,37 +246,53 @@ def iter_block_items(parent: Union[DocxDocument, _Cell, Paragraph]):
             yield Table(child, parent)
 
 
+# numbering part -> {numId: {ilvl: numFmt}}, built on first use per document
+_numbering_indexes = weakref.WeakKeyDictionary()
+
+
+def build_numbering_index(numbering_element) -> Dict[str, Dict[str, Optional[str]]]:
+    """Map every w:num to the level formats of its abstract numbering definition.
+
+    The first definition of an id wins, as with the lookups this replaces.
+    """
+    val = qn('w:val')
+    ilvl_attr = qn('w:ilvl')
+    abstract_levels: Dict[str, Dict[str, Optional[str]]] = {}
+    for abstract in numbering_element.iter(qn('w:abstractNum')):
+        abs_id = abstract.get(qn('w:abstractNumId'))
+        if abs_id is None or abs_id in abstract_levels:
+            continue
+        levels: Dict[str, Optional[str]] = {}
+        for lvl in abstract.iterchildren(qn('w:lvl')):
+            ilvl = lvl.get(ilvl_attr)
+            num_fmt = lvl.find(qn('w:numFmt'))
+            if ilvl is not None and ilvl not in levels and num_fmt is not None:
+                levels[ilvl] = num_fmt.get(val)
+        abstract_levels[abs_id] = levels
+
+    index: Dict[str, Dict[str, Optional[str]]] = {}
+    for num in numbering_element.iter(qn('w:num')):
+        num_id = num.get(qn('w:numId'))
+        if num_id is None or num_id in index:
+            continue
+        abstract = num.find(qn('w:abstractNumId'))
+        abs_id = abstract.get(val) if abstract is not None else None
+        index[num_id] = abstract_levels.get(abs_id, {})
+    return index
+
+
 def get_numbering_format(numbering_part, num_id: str, ilvl: int) -> Optional[str]:
     if numbering_part is None:
         return None
-    try:
-        numbering_element = numbering_part.element
-    except AttributeError:
-        return None
-    num_elements = oxml_xpath(
-        numbering_element,
-        f".//w:num[@w:numId='{num_id}']"
-    )
-    if not num_elements:
-        return None
-    abstract = num_elements[0].find('w:abstractNumId', WORD_NAMESPACES)
-    if abstract is None:
-        return None
-    abs_id = abstract.get(qn('w:val'))
-    if abs_id is None:
-        return None
-    abstract_elements = oxml_xpath(
-        numbering_element,
-        f".//w:abstractNum[@w:abstractNumId='{abs_id}']"
-    )
-    if not abstract_elements:
-        return None
-    num_fmt = abstract_elements[0].find(
-        f"./w:lvl[@w:ilvl='{ilvl}']/w:numFmt", WORD_NAMESPACES
-    )
-    if num_fmt is None:
-        return None
-    return num_fmt.get(qn('w:val'))
+    index = _numbering_indexes.get(numbering_part)
+    if index is None:
+        try:
+            numbering_element = numbering_part.element
+        except AttributeError:
+            return None
+        index = build_numbering_index(numbering_element)
+        _numbering_indexes[numbering_part] = index
+    return index.get(str(num_id), {}).get(str(ilvl))
 
 
 def detect_list_info(
@@ -310,188 +330,277 @@ def detect_list_info(
     return None
 
 
-def omml_to_latex(math_element):
-    nsmap = WORD_NAMESPACES
-
-    def get_text_content(elem):
-        if elem is None:
-            return ''
-        if elem.tag == qn('m:t'):
-            return escape_latex(elem.text or '')
-        fragments = []
-        if elem.text:
-            fragments.append(escape_latex(elem.text))
-        for child in elem:
-            fragments.append(get_text_content(child))
-            if child.tail:
-                fragments.append(escape_latex(child.tail))
-        return ''.join(fragments)
-
-    def render_cases(rows):
-        formatted_rows = [' & '.join(row) for row in rows]
-        return '\\begin{cases}' + ' \\\\ '.join(formatted_rows) + '\\end{cases}'
-
-    def process_element(elem):
-        if elem is None:
-            return ''
-        tag = elem.tag
-
-        if tag in (qn('m:f'), qn('m:frac')):
-            num = process_element(elem.find('m:num', nsmap))
-            den = process_element(elem.find('m:den', nsmap))
-            return f'\\frac{{{num}}}{{{den}}}'
-
-        if tag == qn('m:sSup'):
-            base = process_element(elem.find('m:e', nsmap))
-            sup = process_element(elem.find('m:sup', nsmap))
-            return f'{{{base}}}^{{{sup}}}'
-
-        if tag == qn('m:sSub'):
-            base = process_element(elem.find('m:e', nsmap))
-            sub = process_element(elem.find('m:sub', nsmap))
-            return f'{{{base}}}_{{{sub}}}'
-
-        if tag == qn('m:sSubSup'):
-            base = process_element(elem.find('m:e', nsmap))
-            sub = process_element(elem.find('m:sub', nsmap))
-            sup = process_element(elem.find('m:sup', nsmap))
-            return f'{{{base}}}_{{{sub}}}^{{{sup}}}'
-
-        if tag == qn('m:rad'):
-            deg = process_element(elem.find('m:deg', nsmap))
-            base = process_element(elem.find('m:e', nsmap))
-            if deg.strip():
-                return f'\\sqrt[{deg}]{{{base}}}'
-            return f'\\sqrt{{{base}}}'
-
-        if tag in (qn('m:d'), qn('m:delim')):
-            begin = elem.find('m:dPr/m:begChr', nsmap)
-            end = elem.find('m:dPr/m:endChr', nsmap)
-            left = format_delimiter(begin.get(qn('m:val')) if begin is not None else '(')
-            right_char = end.get(qn('m:val')) if end is not None else GROUP_CHAR_CLOSE_MAP.get(left, ')')
-            right = format_delimiter(GROUP_CHAR_CLOSE_MAP.get(right_char, right_char))
-            content = process_element(elem.find('m:e', nsmap))
-            return f'\\left{left}{content}\\right{right}'
-
-        if tag in (qn('m:m'), qn('m:matrix')):
-            rows = []
-            for r in elem.findall('m:mr', nsmap):
-                cells = [process_element(c) for c in r.findall('m:e', nsmap)]
-                rows.append(' & '.join(cells))
-            return '\\begin{bmatrix}' + ' \\\\ '.join(rows) + '\\end{bmatrix}'
-
-        if tag == qn('m:eqArr'):
-            rows = [process_element(e) for e in elem.findall('m:e', nsmap)]
-            return '\\begin{aligned}' + ' \\\\ '.join(rows) + '\\end{aligned}'
-
-        if tag == qn('m:nary'):
-            chr_elem = elem.find('m:naryPr/m:chr', nsmap)
-            chr_val = chr_elem.get(qn('m:val')) if chr_elem is not None else '∑'
-            operator = NARY_LATEX_MAP.get(chr_val, f'\\operatorname{{{escape_latex(chr_val)}}}')
-            sub = process_element(elem.find('m:sub', nsmap))
-            sup = process_element(elem.find('m:sup', nsmap))
-            base = process_element(elem.find('m:e', nsmap))
-            if sub.strip():
-                operator += f'_{{{sub}}}'
-            if sup.strip():
-                operator += f'^{{{sup}}}'
-            return f'{operator} {base}'.strip()
-
-        if tag == qn('m:acc'):
-            acc_char_elem = elem.find('m:accPr/m:chr', nsmap)
-            acc_char = acc_char_elem.get(qn('m:val')) if acc_char_elem is not None else '^'
-            latex_cmd = ACCENT_LATEX_MAP.get(acc_char, r'\widehat')
-            base = process_element(elem.find('m:e', nsmap))
-            return f'{latex_cmd}{{{base}}}'
-
-        if tag == qn('m:groupChr'):
-            chr_elem = elem.find('m:groupChrPr/m:chr', nsmap)
-            chr_val = chr_elem.get(qn('m:val')) if chr_elem is not None else '|'
-            left = format_delimiter(chr_val)
-            right = format_delimiter(GROUP_CHAR_CLOSE_MAP.get(chr_val, chr_val))
-            content = process_element(elem.find('m:e', nsmap))
-            return f'\\left{left}{content}\\right{right}'
-
-        if tag == qn('m:bar'):
-            pos_elem = elem.find('m:barPr/m:pos', nsmap)
-            pos = pos_elem.get(qn('m:val')) if pos_elem is not None else 'top'
-            base = process_element(elem.find('m:e', nsmap))
-            return f'\\overline{{{base}}}' if pos == 'top' else f'\\underline{{{base}}}'
-
-        if tag == qn('m:box'):
-            content = [process_element(e) for e in elem.findall('m:e', nsmap)]
-            content = ''.join(content) if content else process_element(elem.find('m:e', nsmap))
-            return f'\\boxed{{{content}}}'
-
-        if tag in {qn('m:limLow'), qn('m:limUpp'), qn('m:lim')}:
-            base = process_element(elem.find('m:e', nsmap))
-            lim = process_element(elem.find('m:lim', nsmap))
-            sup = process_element(elem.find('m:sup', nsmap))
-            sub = process_element(elem.find('m:sub', nsmap))
-            result = base
-            if sub.strip():
-                result += f'_{{{sub}}}'
-            if lim.strip():
-                result += f'_{{{lim}}}'
-            if sup.strip():
-                result += f'^{{{sup}}}'
-            return result
-
-        if tag == qn('m:func'):
-            fname = process_element(elem.find('m:fName', nsmap)).strip()
-            argument = process_element(elem.find('m:e', nsmap))
-            latex_func = FUNCTION_LATEX_MAP.get(fname, f'\\operatorname{{{fname}}}')
-            if latex_func.startswith('\\operatorname'):
-                return f'{latex_func}\\left({argument}\\right)'
-            return f'{latex_func}{{{argument}}}'
-
-        if tag == qn('m:tbl'):
-            rows = []
-            max_cols = 0
-            for row in elem.findall('m:tr', nsmap):
-                cells = []
-                for cell in row.findall('m:tc', nsmap):
-                    cells.append(process_element(cell))
-                max_cols = max(max_cols, len(cells))
-                rows.append(cells)
-            if max_cols == 2:
-                return render_cases(rows)
-            body = ' \\\\ '.join(' & '.join(c) for c in rows)
-            cols = 'c' * max_cols if max_cols else 'c'
-            return f'\\begin{{array}}{{{cols}}}{body}\\end{{array}}'
-
-        if tag == qn('m:brk'):
-            return r'\\'
-
-        if tag == qn('m:phant'):
-            content = process_element(elem.find('m:e', nsmap))
-            return f'\\phantom{{{content}}}'
-
-        if tag == qn('m:r'):
-            parts = []
-            for child in elem:
-                if child.tag == qn('m:rPr'):
-                    continue
-                parts.append(process_element(child))
-            result = ''.join(parts)
-            if result:
-                return result
-            return get_text_content(elem)
-
-        if tag == qn('m:t'):
-            return escape_latex(elem.text or '')
-
-        children = []
-        for child in elem:
-            if child.tag == qn('m:rPr'):
-                continue
-            children.append(process_element(child))
-        if children:
-            return ''.join(children)
+# OMML tag and attribute names in Clark notation, resolved once
+M_VAL = qn('m:val')
+M_T = qn('m:t')
+M_R = qn('m:r')
+M_RPR = qn('m:rPr')
+M_E = qn('m:e')
+M_NUM = qn('m:num')
+M_DEN = qn('m:den')
+M_SUB = qn('m:sub')
+M_SUP = qn('m:sup')
+M_DEG = qn('m:deg')
+M_LIM = qn('m:lim')
+M_FNAME = qn('m:fName')
+M_MR = qn('m:mr')
+M_TR = qn('m:tr')
+M_TC = qn('m:tc')
+M_DPR = qn('m:dPr')
+M_BEG_CHR = qn('m:begChr')
+M_END_CHR = qn('m:endChr')
+M_NARY_PR = qn('m:naryPr')
+M_ACC_PR = qn('m:accPr')
+M_GROUP_CHR_PR = qn('m:groupChrPr')
+M_BAR_PR = qn('m:barPr')
+M_CHR = qn('m:chr')
+M_POS = qn('m:pos')
+
+# Converted LaTeX of OMML subtrees, keyed by their serialized XML. Papers repeat
+# the same formulas across questions, so most subtrees are converted once.
+OMML_CACHE_SIZE = 4096
+_omml_latex_cache: Dict[bytes, str] = {}
+
+
+def _omml_property(elem, props_tag: str, prop_tag: str, default: Optional[str]) -> Optional[str]:
+    """``m:val`` of ``<props_tag><prop_tag/>`` under ``elem``; ``default`` if the property is absent."""
+    props = elem.find(props_tag)
+    prop = props.find(prop_tag) if props is not None else None
+    return prop.get(M_VAL) if prop is not None else default
+
+
+def _omml_text(elem) -> str:
+    if elem is None:
+        return ''
+    if elem.tag == M_T:
+        return escape_latex(elem.text or '')
+    fragments = []
+    if elem.text:
+        fragments.append(escape_latex(elem.text))
+    for child in elem:
+        fragments.append(_omml_text(child))
+        if child.tail:
+            fragments.append(escape_latex(child.tail))
+    return ''.join(fragments)
+
+
+def _omml_children(elem) -> str:
+    children = [_omml(child) for child in elem if child.tag != M_RPR]
+    if children:
+        return ''.join(children)
+    return _omml_text(elem)
+
+
+def _omml_frac(elem) -> str:
+    return f'\\frac{{{_omml(elem.find(M_NUM))}}}{{{_omml(elem.find(M_DEN))}}}'
+
+
+def _omml_sup(elem) -> str:
+    return f'{{{_omml(elem.find(M_E))}}}^{{{_omml(elem.find(M_SUP))}}}'
+
+
+def _omml_sub(elem) -> str:
+    return f'{{{_omml(elem.find(M_E))}}}_{{{_omml(elem.find(M_SUB))}}}'
+
+
+def _omml_sub_sup(elem) -> str:
+    base = _omml(elem.find(M_E))
+    sub = _omml(elem.find(M_SUB))
+    sup = _omml(elem.find(M_SUP))
+    return f'{{{base}}}_{{{sub}}}^{{{sup}}}'
+
+
+def _omml_rad(elem) -> str:
+    deg = _omml(elem.find(M_DEG))
+    base = _omml(elem.find(M_E))
+    if deg.strip():
+        return f'\\sqrt[{deg}]{{{base}}}'
+    return f'\\sqrt{{{base}}}'
+
+
+def _omml_delimiter(elem) -> str:
+    left = format_delimiter(_omml_property(elem, M_DPR, M_BEG_CHR, '('))
+    right_char = _omml_property(elem, M_DPR, M_END_CHR, GROUP_CHAR_CLOSE_MAP.get(left, ')'))
+    right = format_delimiter(GROUP_CHAR_CLOSE_MAP.get(right_char, right_char))
+    return f'\\left{left}{_omml(elem.find(M_E))}\\right{right}'
+
+
+def _omml_matrix(elem) -> str:
+    rows = [' & '.join(_omml(c) for c in r.findall(M_E)) for r in elem.findall(M_MR)]
+    return '\\begin{bmatrix}' + ' \\\\ '.join(rows) + '\\end{bmatrix}'
+
+
+def _omml_eq_array(elem) -> str:
+    rows = [_omml(e) for e in elem.findall(M_E)]
+    return '\\begin{aligned}' + ' \\\\ '.join(rows) + '\\end{aligned}'
+
+
+def _omml_nary(elem) -> str:
+    chr_val = _omml_property(elem, M_NARY_PR, M_CHR, '∑')
+    operator = NARY_LATEX_MAP.get(chr_val, f'\\operatorname{{{escape_latex(chr_val)}}}')
+    sub = _omml(elem.find(M_SUB))
+    sup = _omml(elem.find(M_SUP))
+    base = _omml(elem.find(M_E))
+    if sub.strip():
+        operator += f'_{{{sub}}}'
+    if sup.strip():
+        operator += f'^{{{sup}}}'
+    return f'{operator} {base}'.strip()
+
+
+def _omml_accent(elem) -> str:
+    latex_cmd = ACCENT_LATEX_MAP.get(_omml_property(elem, M_ACC_PR, M_CHR, '^'), r'\widehat')
+    return f'{latex_cmd}{{{_omml(elem.find(M_E))}}}'
+
+
+def _omml_group_chr(elem) -> str:
+    chr_val = _omml_property(elem, M_GROUP_CHR_PR, M_CHR, '|')
+    left = format_delimiter(chr_val)
+    right = format_delimiter(GROUP_CHAR_CLOSE_MAP.get(chr_val, chr_val))
+    return f'\\left{left}{_omml(elem.find(M_E))}\\right{right}'
+
+
+def _omml_bar(elem) -> str:
+    pos = _omml_property(elem, M_BAR_PR, M_POS, 'top')
+    base = _omml(elem.find(M_E))
+    return f'\\overline{{{base}}}' if pos == 'top' else f'\\underline{{{base}}}'
+
+
+def _omml_box(elem) -> str:
+    return f'\\boxed{{{"".join(_omml(e) for e in elem.findall(M_E))}}}'
+
+
+def _omml_limit(elem) -> str:
+    result = _omml(elem.find(M_E))
+    lim = _omml(elem.find(M_LIM))
+    sup = _omml(elem.find(M_SUP))
+    sub = _omml(elem.find(M_SUB))
+    if sub.strip():
+        result += f'_{{{sub}}}'
+    if lim.strip():
+        result += f'_{{{lim}}}'
+    if sup.strip():
+        result += f'^{{{sup}}}'
+    return result
+
+
+def _omml_func(elem) -> str:
+    fname = _omml(elem.find(M_FNAME)).strip()
+    argument = _omml(elem.find(M_E))
+    latex_func = FUNCTION_LATEX_MAP.get(fname, f'\\operatorname{{{fname}}}')
+    if latex_func.startswith('\\operatorname'):
+        return f'{latex_func}\\left({argument}\\right)'
+    return f'{latex_func}{{{argument}}}'
+
+
+def _omml_table(elem) -> str:
+    rows = [[_omml(cell) for cell in row.findall(M_TC)] for row in elem.findall(M_TR)]
+    max_cols = max((len(cells) for cells in rows), default=0)
+    if max_cols == 2:
+        return '\\begin{cases}' + ' \\\\ '.join(' & '.join(row) for row in rows) + '\\end{cases}'
+    body = ' \\\\ '.join(' & '.join(c) for c in rows)
+    cols = 'c' * max_cols if max_cols else 'c'
+    return f'\\begin{{array}}{{{cols}}}{body}\\end{{array}}'
 
-        return get_text_content(elem)
 
-    return process_element(math_element)
+def _omml_phantom(elem) -> str:
+    return f'\\phantom{{{_omml(elem.find(M_E))}}}'
+
+
+def _omml_run(elem) -> str:
+    return ''.join(_omml(child) for child in elem if child.tag != M_RPR) or _omml_text(elem)
+
+
+def _omml_t(elem) -> str:
+    return escape_latex(elem.text or '')
+
+
+_OMML_LEAF_HANDLERS = {
+    M_R: _omml_run,
+    M_T: _omml_t,
+    qn('m:brk'): lambda elem: r'\\',
+}
+
+# Structures worth memoizing: converting them costs more than serializing them
+_OMML_STRUCTURE_HANDLERS = {
+    qn('m:f'): _omml_frac,
+    qn('m:frac'): _omml_frac,
+    qn('m:sSup'): _omml_sup,
+    qn('m:sSub'): _omml_sub,
+    qn('m:sSubSup'): _omml_sub_sup,
+    qn('m:rad'): _omml_rad,
+    qn('m:d'): _omml_delimiter,
+    qn('m:delim'): _omml_delimiter,
+    qn('m:m'): _omml_matrix,
+    qn('m:matrix'): _omml_matrix,
+    qn('m:eqArr'): _omml_eq_array,
+    qn('m:nary'): _omml_nary,
+    qn('m:acc'): _omml_accent,
+    qn('m:groupChr'): _omml_group_chr,
+    qn('m:bar'): _omml_bar,
+    qn('m:box'): _omml_box,
+    qn('m:limLow'): _omml_limit,
+    qn('m:limUpp'): _omml_limit,
+    qn('m:lim'): _omml_limit,
+    qn('m:func'): _omml_func,
+    qn('m:tbl'): _omml_table,
+    qn('m:phant'): _omml_phantom,
+}
+
+
+def _omml_memoized(elem, convert) -> str:
+    key = etree.tostring(elem, with_tail=False)
+    latex = _omml_latex_cache.get(key)
+    if latex is None:
+        latex = convert(elem)
+        if len(_omml_latex_cache) >= OMML_CACHE_SIZE:
+            _omml_latex_cache.clear()
+        _omml_latex_cache[key] = latex
+    return latex
+
+
+def _omml(elem) -> str:
+    if elem is None:
+        return ''
+    leaf = _OMML_LEAF_HANDLERS.get(elem.tag)
+    if leaf is not None:
+        return leaf(elem)
+    structure = _OMML_STRUCTURE_HANDLERS.get(elem.tag)
+    if structure is not None:
+        return _omml_memoized(elem, structure)
+    return _omml_children(elem)
+
+
+def omml_to_latex(math_element) -> str:
+    """Convert an OMML element (usually m:oMath) to LaTeX."""
+    if math_element is None:
+        return ''
+    return _omml_memoized(math_element, _omml)
+
+
+# Content-addressed files this process has already stored or seen on disk
+_stored_images: set = set()
+
+
+def store_image(blob: bytes, image_dir: Path, ext: str) -> str:
+    """Store image bytes as ``<sha256><ext>`` in ``image_dir`` and return the file name.
+
+    Identical images share one file, so an image that is already stored is not
+    written again. New files are written under a temporary name and renamed, so
+    concurrent imports of the same image never expose a partial file.
+    """
+    filename = hashlib.sha256(blob).hexdigest() + ext
+    image_path = image_dir / filename
+    key = str(image_path)
+    if key in _stored_images:
+        return filename
+    if not image_path.exists():
+        image_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = image_dir / f'.{filename}.{os.getpid()}.tmp'
+        temp_path.write_bytes(blob)
+        os.replace(temp_path, image_path)
+    _stored_images.add(key)
+    return filename
 
 
 def extract_image_html(
@@ -538,19 +647,31 @@ def extract_image_html(
         ext = guess_image_extension(mime) or ''
         filename_template = image_config.get('namer')
         ext_suffix = ext if ext else ''
-        if filename_template:
-            filename = filename_template.format(
-                para=para_idx if para_idx is not None else 0,
-                run=run_idx,
-                index=img_idx,
-                ext=ext_suffix.lstrip('.')
-            )
+        if image_config.get('content_addressed'):
+            # A part referenced several times in one document is hashed once
+            known_parts = image_config.setdefault('stored_parts', {})
+            filename = known_parts.get(image_part.partname)
+            if filename is None:
+                filename = known_parts[image_part.partname] = store_image(image_part.blob, image_dir, ext_suffix)
         else:
-            filename = f'image_{para_idx if para_idx is not None else 0}_{run_idx}_{img_idx}{ext_suffix}'
+            # Running count of images written with this config, for names that must not repeat
+            image_config['written'] = image_config.get('written', 0) + 1
+            if filename_template:
+                filename = filename_template.format(
+                    para=para_idx if para_idx is not None else 0,
+                    run=run_idx,
+                    index=img_idx,
+                    seq=image_config['written'],
+                    ext=ext_suffix.lstrip('.')
+                )
+            else:
+                filename = f'image_{para_idx if para_idx is not None else 0}_{run_idx}_{img_idx}{ext_suffix}'
+            with (image_dir / filename).open('wb') as fp:
+                fp.write(image_part.blob)
         image_path = image_dir / filename
-        with image_path.open('wb') as fp:
-            fp.write(image_part.blob)
-        src = html.escape(image_path.as_posix())
+        # 'url' serves the directory under a public prefix; without it the file path is used
+        url_prefix = image_config.get('url')
+        src = html.escape(f"{url_prefix.rstrip('/')}/{filename}" if url_prefix else image_path.as_posix())
         return f'<img src="{src}"{alt_attr}{style_attr}/>', ''
     b64 = base64.b64encode(image_part.blob).decode()
     src = f'data:{mime};base64,{b64}'
@@ -895,22 +1016,14 @@ def table_to_html(
     return '<table>' + ''.join(rows_html) + '</table>', paragraphs_consumed
 
 
-def extract_questions_from_docx(
-    input_file: Union[str, Path]
-) -> List[str]:
-    """Convert a DOCX into a flat list of non-empty content fragments.
-
-    The output preserves inline HTML (including embedded images) produced by
-    ``process_paragraph_with_equations`` so callers can further parse the
-    question/option delimiters ("==" and "--") while keeping media intact.
-    """
-
-    doc = Document(str(input_file))
-    image_config: Dict[str, Union[bool, Path, str]] = {'embed': True}
-    fragments: List[str] = []
-    paragraph_index = 0
-
-    for block in iter_block_items(doc):
+def iter_block_fragments(
+    doc: DocxDocument,
+    blocks: Iterable,
+    image_config: Dict[str, Union[bool, Path, str]],
+    paragraph_index: int = 0
+) -> Iterator[str]:
+    """Yield the HTML fragment of each non-empty body block (paragraph or table) in order."""
+    for block in blocks:
         if isinstance(block, Paragraph):
             html_content, text_content = process_paragraph_with_equations(
                 block,
@@ -922,7 +1035,7 @@ def extract_questions_from_docx(
             paragraph_index += 1
             merged = (html_content or '').strip() or (text_content or '').strip()
             if merged:
-                fragments.append(merged)
+                yield merged
         elif isinstance(block, Table):
             table_html, consumed = table_to_html(
                 block,
@@ -932,9 +1045,22 @@ def extract_questions_from_docx(
             )
             paragraph_index += consumed
             if table_html.strip():
-                fragments.append(table_html.strip())
+                yield table_html.strip()
 
-    return fragments
+
+def extract_questions_from_docx(
+    input_file: Union[str, Path]
+) -> List[str]:
+    """Convert a DOCX into a flat list of non-empty content fragments.
+
+    The output preserves inline HTML (including embedded images) produced by
+    ``process_paragraph_with_equations`` so callers can further parse the
+    question/option delimiters ("==" and "--") while keeping media intact.
+    """
+
+    doc = Document(str(input_file))
+    image_config: Dict[str, Union[bool, Path, str]] = {'embed': True}
+    return list(iter_block_fragments(doc, iter_block_items(doc), image_config))
 
 
 def docx_to_html_with_latex(
@@ -1,10 +1,121 @@
 # Backend/app/utils/hashing.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from app.lib.config import settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Stored instead of a hash for accounts that must never log in (anonymous candidates)
+UNUSABLE_PASSWORD = "!"
+
+T = TypeVar("T")
+
+
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, password_hash: str):
-    return pwd_context.verify(plain_password, password_hash)
\ No newline at end of file
+    if not password_hash or password_hash.startswith(UNUSABLE_PASSWORD):
+        return False
+    return pwd_context.verify(plain_password, password_hash)
+
+
+class PasswordHashPool:
+    """Bounded thread pool for bcrypt work, with admission control.
+
+    bcrypt releases the GIL while hashing, so a few threads run hashes in
+    parallel without stalling the event loop. At most ``workers`` hashes run
+    at once and at most ``max_pending`` more wait; beyond that callers get a
+    503 instead of piling up behind a login storm. With ``workers`` <= 0 the
+    work runs inline on the event loop (the old behaviour, kept for
+    comparison in benchmarks).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0  # admitted and not finished: running + queued
+        self.peak_queue_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - max(self.workers, 0))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self.workers <= 0:
+            started = time.perf_counter()
+            result = fn(*args)
+            self.run_seconds += time.perf_counter() - started
+            self.completed += 1
+            return result
+
+        if self.in_flight >= self.workers + self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            return fn(*args), started, time.perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self._get_executor(), timed)
+        finally:
+            self.in_flight -= 1
+
+        self.queue_wait_seconds += started - submitted
+        self.run_seconds += finished - started
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_queue_wait_ms": round(1000 * self.queue_wait_seconds / self.completed, 2) if self.completed else 0.0,
+            "avg_run_ms": round(1000 * self.run_seconds / self.completed, 2) if self.completed else 0.0,
+        }
+
+
+password_hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password-hash pool."""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, password_hash: str) -> bool:
+    """Verify a password on the password-hash pool."""
+    if not password_hash or password_hash.startswith(UNUSABLE_PASSWORD):
+        return False
+    return await password_hash_pool.run(verify_password, plain_password, password_hash)
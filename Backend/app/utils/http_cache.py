@@ -0,0 +1,42 @@
+# Backend/app/utils/http_cache.py
+from typing import Iterable, Optional
+
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """Evaluate an If-None-Match header against strong ETags (weak comparison, per RFC 9110).
+
+    Pass the ETag of every representation of the resource (e.g. one per
+    content-coding); matching any of them means the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """Pick the first of ``available`` (in server preference order) the client accepts, or None."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
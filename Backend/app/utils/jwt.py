@@ -7,7 +7,9 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.lib.cache import LRUCache
 from app.lib.db import get_db
 from app.models.user import User
 from sqlalchemy import select
@@ -55,33 +57,63 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
 
 
+# Column snapshots of recently authenticated users, keyed by (user id, token iat).
+# Entries expire after PRINCIPAL_CACHE_TTL_SECONDS, so changes made through other
+# workers (role changes, bans) are seen within that window; changes made through
+# this worker call invalidate_principal() and apply immediately.
+_principal_cache = LRUCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+_user_columns = tuple(column.key for column in User.__table__.columns)
+
+
+def invalidate_principal(user_id: Optional[int] = None) -> None:
+    """Forget cached principals of a user (all their tokens), or of everyone."""
+    if user_id is None:
+        _principal_cache.clear()
+        return
+    for key in _principal_cache.keys():
+        if key[0] == user_id:
+            _principal_cache.pop(key)
+
+
+async def load_principal(db: AsyncSession, user_id: int, issued_at: Optional[int]) -> Optional[User]:
+    """Return the User behind a token, answering from the principal cache when possible.
+
+    Cached users are attached to ``db`` without a query (merge with load=False),
+    so callers get a normal session-bound instance either way.
+    """
+    key = (user_id, issued_at)
+    snapshot = _principal_cache.get(key)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    result = await db.execute(select(User).filter(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is not None:
+        _principal_cache.set(key, {column: getattr(user, column) for column in _user_columns})
+    return user
+
+
 async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
     try:
-        print("Decoding token:", token)
         payload = decode_token(token)
         user_id = payload.get("sub")
         try:
             user_id = int(user_id) if user_id else None
-            print("Extracted user_id:", user_id)
         except (ValueError, TypeError):
-             print("Invalid user_id in token payload:", user_id)
              user_id = None
-        print("Fetching user from DB with ID:", user_id)
              
         if user_id is None:
-            print("User ID is None, invalid token payload")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
         
-            
-        result = await db.execute(select(User).filter(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await load_principal(db, user_id, payload.get("iat"))
         
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
         return user
     except JWTError as e:
         print("JWT Error:", str(e))
-        print("Failed to decode token:", token)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
 
 
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: persisting one submission's Answer rows.
+
+Compares the ORM unit-of-work path with the bulk paths of insert_answer_rows()
+("values" = multi-row INSERT via insertmanyvalues, "copy" = asyncpg COPY) at 50, 200 and 500
+questions. Everything runs inside one transaction that is rolled back, so it
+is safe to point at a development database:
+
+    cd Backend && python benchmarks/bench_answer_insert.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from app.lib.db import AsyncSessionLocal, engine
+from app.models import User, Exam, Question, Result
+from app.services.result_service import insert_answer_rows
+
+SIZES = (50, 200, 500)
+METHODS = ("orm", "values", "copy")
+REPEATS = 20
+
+
+async def run():
+    async with AsyncSessionLocal() as db:
+        user = User(name="Bench User", email=f"bench-{time.time_ns()}@example.com", password_hash="!", role="USER")
+        exam = Exam(
+            title="Answer insert benchmark",
+            start_time=datetime.utcnow(),
+            duration_minutes=60,
+            end_time=(datetime.utcnow() + timedelta(days=1)).date(),
+            mark=max(SIZES),
+            minus_mark=0.25,
+        )
+        db.add_all([user, exam])
+        await db.flush()
+        questions = [
+            Question(exam_id=exam.id, q_type="MCQ", content=f"Q{i}", answer="A")
+            for i in range(max(SIZES))
+        ]
+        db.add_all(questions)
+        await db.flush()
+
+        # Results are unique per (exam, user, attempt), so every iteration is a new attempt
+        attempt = 0
+        print(f"{'questions':>9} {'method':>7} {'median ms':>10} {'p95 ms':>8}")
+        for size in SIZES:
+            for method in METHODS:
+                timings = []
+                for _ in range(REPEATS):
+                    attempt += 1
+                    result = Result(
+                        exam_id=exam.id, user_id=user.id, correct_answers=size,
+                        incorrect_answers=0, mark=size, attempt_number=attempt,
+                    )
+                    db.add(result)
+                    await db.flush()
+                    rows = [
+                        {
+                            "result_id": result.id,
+                            "question_id": q.id,
+                            "exam_id": exam.id,
+                            "selected_option": 0,
+                            "submitted_answer_text": None,
+                            "uploaded_file": None,
+                            "is_correct": True,
+                            "correct_option_index": 0,
+                            "marks_obtained": 1.0,
+                        }
+                        for q in questions[:size]
+                    ]
+                    started = time.perf_counter()
+                    await insert_answer_rows(db, rows, method=method)
+                    await db.flush()
+                    timings.append((time.perf_counter() - started) * 1000)
+                    db.expunge_all()
+                timings.sort()
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(f"{size:>9} {method:>7} {statistics.median(timings):>10.2f} {p95:>8.2f}")
+
+        await db.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,78 @@
+"""
+Benchmark: list detection in numbered-option question banks.
+
+Builds banks of increasing size where every question lists its options as a
+numbered list that restarts at "a." (Word writes a new w:num per restart, so
+the numbering part grows with the document), then classifies every
+paragraph with detect_list_info and reports the time per list paragraph. The
+numbering index makes that a dict lookup; the XPath lookups it replaced
+scanned the numbering part once or twice per paragraph.
+
+    cd Backend && python benchmarks/bench_list_numbering.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from docx import Document
+from docx.oxml import parse_xml
+
+from app.utils.docx_utils import detect_list_info, iter_block_items
+
+SIZES = (100, 500, 2000)
+
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+FORMATS = ("lowerLetter", "decimal", "bullet")
+
+
+def abstract_num(abs_id: int, fmt: str) -> str:
+    return (f'<w:abstractNum {W_NS} w:abstractNumId="{abs_id}">'
+            + ''.join(f'<w:lvl w:ilvl="{i}"><w:start w:val="1"/><w:numFmt w:val="{fmt}"/></w:lvl>' for i in range(3))
+            + '</w:abstractNum>')
+
+
+def build_document(path: str, questions: int) -> None:
+    doc = Document()
+    numbering = doc.part.numbering_part.element
+    base = 100
+    for offset, fmt in enumerate(FORMATS):
+        numbering.insert(0, parse_xml(abstract_num(base + offset, fmt)))
+    for i in range(questions):
+        num_id = 1000 + i
+        numbering.append(parse_xml(
+            f'<w:num {W_NS} w:numId="{num_id}"><w:abstractNumId w:val="{base + i % len(FORMATS)}"/></w:num>'
+        ))
+        doc.add_paragraph(f"Question {i + 1}: pick the correct option")
+        for option in "ABCD":
+            para = doc.add_paragraph(f"Option {option}")
+            para._p.get_or_add_pPr()._insert_numPr(parse_xml(
+                f'<w:numPr {W_NS}><w:ilvl w:val="0"/><w:numId w:val="{num_id}"/></w:numPr>'
+            ))
+    doc.save(path)
+
+
+def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        for questions in SIZES:
+            path = os.path.join(tmp, f"bank-{questions}.docx")
+            build_document(path, questions)
+            doc = Document(path)
+            # Style lookups are the same either way; keep them out of the measurement
+            paragraphs = [(para, (para.style.name if para.style else '').lower()) for para in iter_block_items(doc)]
+            t0 = time.perf_counter()
+            found = [detect_list_info(para, style_name) for para, style_name in paragraphs]
+            elapsed = time.perf_counter() - t0
+            lists = [info for info in found if info]
+            types = {t: sum(info['type'] == t for info in lists) for t in ('ol', 'ul')}
+            print(
+                f"{questions:5d} questions: {len(lists):5d} list paragraphs {types} in {elapsed * 1000:8.1f} ms"
+                f"  ({elapsed / len(lists) * 1_000_000:6.1f} us each)"
+            )
+
+
+if __name__ == "__main__":
+    run()
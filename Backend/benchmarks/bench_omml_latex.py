@@ -0,0 +1,179 @@
+"""
+Benchmark: OMML to LaTeX conversion on equation-heavy DOCX files.
+
+Builds a corpus of DOCUMENTS question papers, each with EQUATIONS equations
+drawn from a set of templates (fractions, scripts, roots, n-ary operators,
+matrices, delimiters, functions, accents, limits, case tables). Like real
+papers, most formulas recur across questions and papers with only a few
+constants changed. Every m:oMath element of the corpus is converted
+  plain:    with the dispatch table, memo disabled,
+  cold:     with the subtree memo starting empty,
+  warm:     again with the memo filled by the cold pass (a re-import),
+and all three must produce the same LaTeX.
+
+    cd Backend && python benchmarks/bench_omml_latex.py
+"""
+import html
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from docx import Document
+from docx.oxml import parse_xml
+
+from app.utils import docx_utils
+
+DOCUMENTS = 20
+EQUATIONS = 300
+ROUNDS = 3
+
+MATH_NS = 'xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math"'
+
+
+def r(text) -> str:
+    return f'<m:r><m:rPr><m:sty m:val="i"/></m:rPr><m:t>{html.escape(str(text))}</m:t></m:r>'
+
+
+def frac(num: str, den: str) -> str:
+    return f'<m:f><m:num>{num}</m:num><m:den>{den}</m:den></m:f>'
+
+
+def sup(base: str, exp: str) -> str:
+    return f'<m:sSup><m:e>{base}</m:e><m:sup>{exp}</m:sup></m:sSup>'
+
+
+def sub(base: str, index: str) -> str:
+    return f'<m:sSub><m:e>{base}</m:e><m:sub>{index}</m:sub></m:sSub>'
+
+
+def delim(content: str, begin: str = "(", end: str = ")") -> str:
+    return (f'<m:d><m:dPr><m:begChr m:val="{begin}"/><m:endChr m:val="{end}"/></m:dPr>'
+            f'<m:e>{content}</m:e></m:d>')
+
+
+def nary(op: str, lower: str, upper: str, body: str) -> str:
+    return (f'<m:nary><m:naryPr><m:chr m:val="{op}"/></m:naryPr><m:sub>{lower}</m:sub>'
+            f'<m:sup>{upper}</m:sup><m:e>{body}</m:e></m:nary>')
+
+
+def func(name: str, arg: str) -> str:
+    return f'<m:func><m:fName>{r(name)}</m:fName><m:e>{arg}</m:e></m:func>'
+
+
+def matrix(rows) -> str:
+    return '<m:m>' + ''.join(
+        '<m:mr>' + ''.join(f'<m:e>{r(c)}</m:e>' for c in row) + '</m:mr>' for row in rows
+    ) + '</m:m>'
+
+
+def quadratic(rng):
+    b, c = rng.choice((1, 2, 3, 4)), rng.choice((1, 2, 5))
+    disc = f'<m:rad><m:radPr><m:degHide m:val="1"/></m:radPr><m:deg/><m:e>{sup(r("b"), r(2))}{r(f"-{c}ac")}</m:e></m:rad>'
+    return r("x=") + frac(r(f"-{b}b±") + disc, r("2a"))
+
+
+def series(rng):
+    n = rng.choice(("n", "N", "10"))
+    return nary("∑", r("i=1"), r(n), sup(sub(r("x"), r("i")), r(2))) + r("=") + frac(r(f"{n}({n}+1)"), r(2))
+
+
+def integral(rng):
+    upper = rng.choice(("1", "π", "∞"))
+    body = func("sin", r("x")) + r("⋅") + sup(r("e"), r(f"-{rng.randint(1, 3)}x"))
+    return nary("∫", r(0), r(upper), body + r("dx"))
+
+
+def determinant(rng):
+    a = rng.randint(1, 4)
+    return delim(matrix([[str(a), "b"], ["c", "d"]]), "|", "|") + r(f"={a}d-bc")
+
+
+def limit(rng):
+    inner = frac(func("sin", r("x")), r("x"))
+    low = f'<m:limLow><m:e>{r("lim")}</m:e><m:lim>{r("x→0")}</m:lim></m:limLow>'
+    return f'<m:func><m:fName>{low}</m:fName><m:e>{inner}</m:e></m:func>' + r(f"={rng.choice((1, 1, 2))}")
+
+
+def vector(rng):
+    acc = f'<m:acc><m:accPr><m:chr m:val="⃗"/></m:accPr><m:e>{r("v")}</m:e></m:acc>'
+    bar = f'<m:bar><m:barPr><m:pos m:val="top"/></m:barPr><m:e>{r("AB")}</m:e></m:bar>'
+    return acc + r("=") + delim(sub(r("v"), r("x")) + r(",") + sub(r("v"), r("y"))) + r(f"+{rng.randint(1, 5)}") + bar
+
+
+def piecewise(rng):
+    k = rng.randint(0, 2)
+    cells = lambda a, b: f'<m:tr><m:tc>{a}</m:tc><m:tc>{b}</m:tc></m:tr>'
+    table = f'<m:tbl>{cells(sup(r("x"), r(2)), r(f"x≥{k}"))}{cells(r("-x"), r(f"x<{k}"))}</m:tbl>'
+    return r("f(x)=") + delim(table, "{", "")
+
+
+TEMPLATES = (quadratic, series, integral, determinant, limit, vector, piecewise)
+
+
+def build_corpus(directory: str):
+    rng = random.Random(2026)
+    paths = []
+    for d in range(DOCUMENTS):
+        doc = Document()
+        for i in range(EQUATIONS):
+            para = doc.add_paragraph(f"Question {i + 1}: ")
+            template = rng.choice(TEMPLATES)
+            para._p.append(parse_xml(f'<m:oMath {MATH_NS}>{template(rng)}</m:oMath>'))
+        path = os.path.join(directory, f"paper-{d}.docx")
+        doc.save(path)
+        paths.append(path)
+    return paths
+
+
+def convert_all(equations):
+    return [docx_utils.omml_to_latex(eq) for eq in equations]
+
+
+def timed(equations, memo: bool):
+    memoized = docx_utils._omml_memoized
+    if not memo:
+        docx_utils._omml_memoized = lambda elem, convert: convert(elem)
+    try:
+        t0 = time.perf_counter()
+        latex = convert_all(equations)
+        return time.perf_counter() - t0, latex
+    finally:
+        docx_utils._omml_memoized = memoized
+
+
+def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_corpus(tmp)
+        equations = []
+        for path in paths:
+            body = Document(path).element.body
+            equations.extend(body.iter(docx_utils.qn("m:oMath")))
+        distinct = len({docx_utils.etree.tostring(eq) for eq in equations})
+        print(f"corpus: {len(paths)} documents, {len(equations)} equations, {distinct} distinct")
+
+        plain = min(timed(equations, memo=False)[0] for _ in range(ROUNDS))
+        cold = []
+        for _ in range(ROUNDS):
+            docx_utils._omml_latex_cache.clear()
+            cold.append(timed(equations, memo=True)[0])
+        warm, memo_latex = timed(equations, memo=True)
+        _, plain_latex = timed(equations, memo=False)
+
+        per_eq = lambda seconds: seconds / len(equations) * 1_000_000
+        print(f"plain: {plain * 1000:7.1f} ms  ({per_eq(plain):5.1f} us/equation)")
+        print(f"cold:  {min(cold) * 1000:7.1f} ms  ({per_eq(min(cold)):5.1f} us/equation)  {plain / min(cold):4.1f}x")
+        print(f"warm:  {warm * 1000:7.1f} ms  ({per_eq(warm):5.1f} us/equation)  {plain / warm:4.1f}x")
+        print(f"memo entries: {len(docx_utils._omml_latex_cache)}")
+        same = memo_latex == plain_latex
+        print(f"identical output: {same}")
+        if not same:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
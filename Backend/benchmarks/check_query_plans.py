@@ -0,0 +1,132 @@
+"""
+Plan regression check: the hot service queries must be able to use their indexes.
+
+Builds the same statements the services run, EXPLAINs each one and checks the
+plan names the expected index. Sequential scans are disabled for the check
+(inside a rolled-back transaction), so on a small development database the
+planner still shows which index serves each shape instead of falling back
+to scanning a few pages. Exits non-zero if any query lost its index:
+
+    cd Backend && python benchmarks/check_query_plans.py
+"""
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.lib.db import AsyncSessionLocal, engine
+from app.models import Answer, Exam, ExamSchedule, Question, Result, UserCourseRelation
+from app.services.result_service import _result_list_query
+
+EXAM_ID, USER_ID, COURSE_ID, RESULT_ID, QUESTION_ID = 1, 1, 1, 1, 1
+HORIZON = datetime(2026, 1, 1)
+
+# (description, statement, index the plan must use -- or a tuple of acceptable ones)
+CHECKS = [
+    (
+        "latest attempt of a user (get_detailed_exam_result_service)",
+        select(Result).where(Result.exam_id == EXAM_ID, Result.user_id == USER_ID)
+        .order_by(Result.attempt_number.desc()).limit(1),
+        "uq_result_exam_user_attempt",
+    ),
+    (
+        "student result history (get_all_results_service)",
+        select(Result).where(Result.user_id == USER_ID),
+        "ix_result_user_id",
+    ),
+    (
+        "answers of a page of results (selectinload / _load_answers_for_results)",
+        select(Answer).where(Answer.result_id.in_([RESULT_ID, RESULT_ID + 1])),
+        "ix_answer_result_id",
+    ),
+    (
+        "answers to a question",
+        select(Answer).where(Answer.question_id == QUESTION_ID),
+        "ix_answer_question_id",
+    ),
+    (
+        "written_submission_file subquery (get_results_page_service)",
+        _result_list_query(exam_id=EXAM_ID).limit(50),
+        "ix_answer_result_uploaded",
+    ),
+    (
+        "answer key columns of an exam (get_answer_key)",
+        select(Question.id, Question.q_type, Question.answer).where(Question.exam_id == EXAM_ID),
+        "ix_question_exam_id",
+    ),
+    (
+        "active exams of a course (get_all_exams_service)",
+        select(Exam).where(Exam.course_id == COURSE_ID, Exam.is_active == True),
+        "ix_exam_course_active",
+    ),
+    (
+        "enrollment check",
+        select(UserCourseRelation).where(
+            UserCourseRelation.c.User_id == USER_ID, UserCourseRelation.c.Course_id == COURSE_ID
+        ),
+        # both the primary key and the roster index cover the equality pair
+        ("user_course_pkey", "ix_user_course_course_user"),
+    ),
+    (
+        "course roster (get_course_students_service)",
+        select(UserCourseRelation.c.User_id).where(UserCourseRelation.c.Course_id == COURSE_ID),
+        "ix_user_course_course_user",
+    ),
+    (
+        "exam schedule (get_exam_schedule_service)",
+        select(ExamSchedule).where(ExamSchedule.exam_id == EXAM_ID).order_by(ExamSchedule.id.desc()).limit(1),
+        "ix_exam_schedule_exam_id",
+    ),
+    (
+        "pending publishes (load_upcoming_transitions)",
+        select(ExamSchedule.id).where(ExamSchedule.is_published.isnot(True), ExamSchedule.publish_at < HORIZON),
+        "ix_exam_schedule_pending_publish",
+    ),
+    (
+        "pending expiries (load_upcoming_transitions)",
+        select(ExamSchedule.id).where(ExamSchedule.is_expired.isnot(True), ExamSchedule.end_at < HORIZON),
+        "ix_exam_schedule_pending_end",
+    ),
+    (
+        "pending removals (load_upcoming_transitions)",
+        select(ExamSchedule.id).where(ExamSchedule.is_removed.isnot(True), ExamSchedule.auto_remove_at < HORIZON),
+        "ix_exam_schedule_pending_remove",
+    ),
+]
+
+
+def _index_names(plan: dict) -> set:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+async def run() -> int:
+    failures = 0
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SET LOCAL enable_seqscan = off"))
+        for description, stmt, expected in CHECKS:
+            sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            rows = await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+            plan = rows.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            used = _index_names(plan[0]["Plan"])
+            expected = (expected,) if isinstance(expected, str) else expected
+            ok = bool(used.intersection(expected))
+            failures += not ok
+            print(f"{'PASS' if ok else 'FAIL'}  {description:<72} {' | '.join(expected)}" + ("" if ok else f"  (used: {sorted(used)})"))
+        await db.rollback()
+    await engine.dispose()
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(run()) else 0)
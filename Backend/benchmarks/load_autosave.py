@@ -0,0 +1,120 @@
+"""
+Load test: answer autosave with CANDIDATES concurrent exam sessions.
+
+Opens CANDIDATES sessions on one exam, then runs ROUNDS rounds in which every
+candidate changes one answer at once (the rate of 10k candidates clicking
+every few seconds, compressed) while the draft flusher runs. Reports the
+latency of save_draft_service, which returns once its change is written, and
+the statements the flushes took, compared with writing every click to the
+database. The test users, exam and sessions are deleted afterwards.
+
+    cd Backend && python benchmarks/load_autosave.py
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from sqlalchemy import delete, event, insert, select
+
+from app.lib.db import AsyncSessionLocal, engine
+from app.models import Exam, ExamSession, Question, User
+from app.schemas.result import AnswerCreate
+from app.services import draft_service
+from app.services.session_service import ActiveSession, register_session
+
+CANDIDATES = 10_000
+QUESTIONS = 50
+ROUNDS = 3
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run():
+    tag = time.time_ns()
+    started = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        exam = Exam(
+            title="Autosave benchmark",
+            start_time=started,
+            duration_minutes=120,
+            end_time=(started + timedelta(days=1)).date(),
+            mark=QUESTIONS,
+            minus_mark=0,
+        )
+        db.add(exam)
+        await db.flush()
+        questions = [Question(exam_id=exam.id, q_type="MCQ", content=f"Q{i}", answer="A") for i in range(QUESTIONS)]
+        db.add_all(questions)
+        user_ids = (await db.execute(
+            insert(User).returning(User.id),
+            [{"name": f"Candidate {i}", "email": f"autosave-{tag}-{i}@example.com", "password_hash": "!", "role": "USER"}
+             for i in range(CANDIDATES)],
+        )).scalars().all()
+        await db.execute(insert(ExamSession), [
+            {"exam_id": exam.id, "user_id": user_id, "started_at": started,
+             "must_complete_by": started + timedelta(minutes=120), "is_active": True}
+            for user_id in user_ids
+        ])
+        await db.commit()
+        rows = await db.execute(select(ExamSession).where(ExamSession.exam_id == exam.id))
+        for session in rows.scalars():
+            register_session(ActiveSession(session.id, session.exam_id, session.user_id, session.started_at, session.must_complete_by))
+    question_ids = [q.id for q in questions]
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+    stop = asyncio.Event()
+    flusher = asyncio.create_task(draft_service.run_draft_flusher(stop))
+
+    async def click(db, user_id: int) -> float:
+        answer = AnswerCreate(question_id=random.choice(question_ids), selected_option=random.randrange(4))
+        t0 = time.perf_counter()
+        await draft_service.save_draft_service(db, exam.id, user_id, [answer])
+        return (time.perf_counter() - t0) * 1000
+
+    try:
+        clicks = flush_statements = 0
+        for round_number in range(ROUNDS):
+            statements.clear()
+            t0 = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                latencies = await asyncio.gather(*(click(db, user_id) for user_id in user_ids))
+            round_ms = (time.perf_counter() - t0) * 1000
+            clicks += len(user_ids)
+            flush_statements += len(statements)
+            print(
+                f"round {round_number + 1}: {len(user_ids)} autosaves in {round_ms:7.1f} ms"
+                f"  p50={statistics.median(latencies):6.1f} ms  p99={percentile(latencies, 99):6.1f} ms"
+                f"  statements={len(statements)}"
+            )
+
+        print(f"{clicks} clicks -> {flush_statements} statements (one UPDATE per click would be {clicks})")
+        async with AsyncSessionLocal() as db:
+            sizes = (await db.execute(
+                select(ExamSession.draft_answers).where(ExamSession.exam_id == exam.id).limit(5)
+            )).scalars().all()
+            print(f"sample draft sizes: {[len(d or {}) for d in sizes]}")
+    finally:
+        stop.set()
+        await flusher
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(ExamSession).where(ExamSession.exam_id == exam.id))
+            await db.execute(delete(Question).where(Question.exam_id == exam.id))
+            await db.execute(delete(Exam).where(Exam.id == exam.id))
+            await db.execute(delete(User).where(User.id.in_(user_ids)))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
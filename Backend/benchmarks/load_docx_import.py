@@ -0,0 +1,172 @@
+"""
+Benchmark: DOCX question import, inline versus the process pool.
+
+Generates a chapter-sized DOCX (QUESTIONS questions, each with OMML equations
+and every IMAGE_EVERY-th with an image), then
+  1. parses it inline with docx_to_questions, as the upload endpoint used to,
+  2. parses it in chunks in the DOCX import process pool,
+     while measuring how late a 10 ms timer on the event loop fires.
+Both paths must yield the same questions, and the second parse must not write
+any image again (images are stored by content hash), and every image URL must
+resolve to a stored file under one of the app's static mounts. Nothing is
+written to the database, and the images both paths write to uploads/questions/
+are removed afterwards.
+
+    cd Backend && python benchmarks/load_docx_import.py
+"""
+import asyncio
+import io
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from docx import Document
+from docx.oxml import parse_xml
+
+from app.services.docx_import_service import _get_pool, _parse_in_pool, _scan_in_pool, shutdown_import_pool
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.main import app
+from app.utils.docx_to_questions import IMAGE_DIR, docx_to_questions
+
+QUESTIONS = 500
+IMAGE_EVERY = 10
+
+MATH_NS = 'xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math"'
+EQUATION = (
+    f'<m:oMath {MATH_NS}><m:f><m:num><m:r><m:t>a+{{n}}</m:t></m:r></m:num>'
+    '<m:den><m:sSup><m:e><m:r><m:t>x</m:t></m:r></m:e><m:sup><m:r><m:t>2</m:t></m:r></m:sup></m:sSup></m:den></m:f>'
+    '<m:rad><m:radPr><m:degHide m:val="1"/></m:radPr><m:deg/><m:e><m:r><m:t>b</m:t></m:r></m:e></m:rad>'
+    '<m:nary><m:naryPr><m:chr m:val="∑"/></m:naryPr><m:sub><m:r><m:t>i=1</m:t></m:r></m:sub>'
+    '<m:sup><m:r><m:t>n</m:t></m:r></m:sup><m:e><m:sSub><m:e><m:r><m:t>y</m:t></m:r></m:e>'
+    '<m:sub><m:r><m:t>i</m:t></m:r></m:sub></m:sSub></m:e></m:nary></m:oMath>'
+)
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+# 1x1 grey PNG
+PNG = (
+    b"\x89PNG\r\n\x1a\n"
+    + png_chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0))
+    + png_chunk(b"IDAT", zlib.compress(b"\x00\x80"))
+    + png_chunk(b"IEND", b"")
+)
+
+
+def equation_paragraph(doc, text: str, n: int):
+    para = doc.add_paragraph(text)
+    para._p.append(parse_xml(EQUATION.replace("{n}", str(n))))
+    return para
+
+
+def build_document(path: str) -> None:
+    doc = Document()
+    for i in range(QUESTIONS):
+        equation_paragraph(doc, f"Question {i + 1}: evaluate ", i)
+        if i % IMAGE_EVERY == 0:
+            doc.add_paragraph().add_run().add_picture(io.BytesIO(PNG))
+        for option in "ABCD":
+            doc.add_paragraph("--")
+            equation_paragraph(doc, f"{option}) ", i)
+        doc.add_paragraph("--")
+        doc.add_paragraph("ABCD"[i % 4])
+        doc.add_paragraph("==")
+    doc.save(path)
+
+
+async def parse_in_pool(path: str):
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    chunks = await loop.run_in_executor(pool, _scan_in_pool, path)
+    parsed = await asyncio.gather(*(loop.run_in_executor(pool, _parse_in_pool, path, chunk) for chunk in chunks))
+    return chunks, [question for chunk in parsed for question in chunk]
+
+
+def stored_images() -> dict:
+    return {image.name: image.stat().st_mtime_ns for image in IMAGE_DIR.iterdir()} if IMAGE_DIR.exists() else {}
+
+
+def served_file(url: str):
+    """The file a static mount of the app serves for ``url``, or None."""
+    for route in app.routes:
+        if isinstance(route, Mount) and isinstance(route.app, StaticFiles) and url.startswith(route.path + "/"):
+            path = Path(route.app.directory) / url[len(route.path) + 1:]
+            return path if path.is_file() else None
+    return None
+
+
+async def max_timer_lag(done: asyncio.Event) -> float:
+    worst = 0.0
+    while not done.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - t0 - 0.01)
+    return worst
+
+
+async def run():
+    fd, path = tempfile.mkstemp(suffix=".docx")
+    os.close(fd)
+    existing_images = stored_images()
+    try:
+        build_document(path)
+        print(f"document: {QUESTIONS} questions, {os.path.getsize(path) / 1024:.0f} KiB")
+
+        t0 = time.perf_counter()
+        inline = docx_to_questions(path)
+        inline_s = time.perf_counter() - t0
+        print(f"inline:   {len(inline)} questions in {inline_s:6.2f} s (the event loop is blocked for all of it)")
+        after_first_import = stored_images()
+
+        # Start the pool processes outside the measurement
+        await asyncio.get_running_loop().run_in_executor(_get_pool(), len, "warm-up")
+        done = asyncio.Event()
+        lag = asyncio.create_task(max_timer_lag(done))
+        t0 = time.perf_counter()
+        chunks, pooled = await parse_in_pool(path)
+        pooled_s = time.perf_counter() - t0
+        done.set()
+        print(
+            f"pool:     {len(pooled)} questions in {pooled_s:6.2f} s with {len(chunks)} chunks on "
+            f"{_get_pool()._max_workers} processes; worst event-loop delay {await lag * 1000:.1f} ms"
+        )
+
+        images = sum(bool(q.image_url) for q in inline)
+        rewritten = {name for name, mtime in stored_images().items() if after_first_import.get(name) != mtime}
+        print(
+            f"images:   {images} referenced, {len(after_first_import) - len(existing_images)} file(s) stored; "
+            f"the second import wrote {len(rewritten)}"
+        )
+
+        urls = {
+            url for q in inline
+            for url in (q.image_url, q.option_a_image_url, q.option_b_image_url, q.option_c_image_url, q.option_d_image_url)
+            if url
+        }
+        unserved = sorted(url for url in urls if served_file(url) is None)
+        print(f"served:   {len(urls) - len(unserved)} of {len(urls)} image URLs resolve under a static mount")
+
+        same = [q.model_dump() for q in inline] == [q.model_dump() for q in pooled]
+        print(f"identical output: {same}")
+        if not same or rewritten or unserved:
+            sys.exit(1)
+    finally:
+        shutdown_import_pool()
+        os.remove(path)
+        for name in stored_images().keys() - existing_images.keys():
+            (IMAGE_DIR / name).unlink()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
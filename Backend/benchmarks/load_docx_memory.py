@@ -0,0 +1,110 @@
+"""
+Benchmark: memory of DOCX question parsing, list pipeline versus streaming.
+
+Builds question banks of increasing size where every question carries a
+diagram of IMAGE_KB KiB, opens each once, then measures the Python heap peak
+(tracemalloc, on top of the loaded document) of
+  list:      every fragment rendered up front with images inlined as base64,
+             then split into questions (the pipeline before streaming),
+  streaming: blocks -> fragments -> segments -> questions as generators, images
+             written to disk as they are met.
+Images go to a temporary directory that is removed afterwards.
+
+    cd Backend && python benchmarks/load_docx_memory.py
+"""
+import io
+import os
+import random
+import struct
+import sys
+import tempfile
+import tracemalloc
+import zlib
+from pathlib import Path
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from docx import Document
+
+import app.lib  # noqa: F401  (app.lib has to load before app.models)
+from app.utils import docx_to_questions as parser
+from app.utils.docx_utils import iter_block_fragments, iter_block_items
+
+SIZES = (50, 200)
+IMAGE_KB = 100
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def noise_png(seed: int) -> bytes:
+    # Grey noise does not compress, so the stored image keeps its size
+    side = int((IMAGE_KB * 1024) ** 0.5)
+    rng = random.Random(seed)
+    rows = b"".join(b"\x00" + rng.randbytes(side) for _ in range(side))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + png_chunk(b"IHDR", struct.pack(">IIBBBBB", side, side, 8, 0, 0, 0, 0))
+        + png_chunk(b"IDAT", zlib.compress(rows, 0))
+        + png_chunk(b"IEND", b"")
+    )
+
+
+def build_document(path: str, questions: int) -> None:
+    doc = Document()
+    for i in range(questions):
+        doc.add_paragraph(f"Question {i + 1}: which part of the diagram is labelled X?")
+        doc.add_paragraph().add_run().add_picture(io.BytesIO(noise_png(i)))
+        for option in "ABCD":
+            doc.add_paragraph("--")
+            doc.add_paragraph(f"Part {option}")
+        doc.add_paragraph("--")
+        doc.add_paragraph("ABCD"[i % 4])
+        doc.add_paragraph("==")
+    doc.save(path)
+
+
+def list_pipeline(doc, image_dir: Path):
+    fragments = list(iter_block_fragments(doc, iter_block_items(doc), {"embed": True}))
+    return parser.fragments_to_questions(fragments)
+
+
+def streaming_pipeline(doc, image_dir: Path):
+    config = {"embed": False, "dir": image_dir, "url": "/public", "content_addressed": True}
+    count = 0
+    for _ in parser.iter_questions(iter_block_fragments(doc, iter_block_items(doc), config)):
+        count += 1  # a real consumer hands each question on instead of keeping it
+    return count
+
+
+def measure(pipeline, doc, image_dir: Path) -> float:
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    pipeline(doc, image_dir)
+    return (tracemalloc.get_traced_memory()[1] - base) / 2**20
+
+
+def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        image_dir = Path(tmp) / "images"
+        # base64 images from the list pipeline are decoded into IMAGE_DIR; keep them in tmp too
+        parser.IMAGE_DIR = image_dir
+        tracemalloc.start()
+        for questions in SIZES:
+            path = os.path.join(tmp, f"bank-{questions}.docx")
+            build_document(path, questions)
+            doc = Document(path)
+            list_mb = measure(list_pipeline, doc, image_dir)
+            stream_mb = measure(streaming_pipeline, doc, image_dir)
+            print(
+                f"{questions:4d} questions ({os.path.getsize(path) / 2**20:5.1f} MiB docx): "
+                f"peak above document  list={list_mb:7.1f} MiB  streaming={stream_mb:5.2f} MiB"
+            )
+            del doc
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,102 @@
+"""
+Load test: latency of unrelated requests during a login storm.
+
+Runs the app in-process (httpx + ASGI transport, one event loop, like one
+uvicorn worker). A background probe requests GET /api/exams/catalog every
+few milliseconds while CONCURRENCY clients log in repeatedly; the probe's
+p50/p99 is reported for three phases:
+
+    baseline      no logins
+    storm/pool    logins with bcrypt on the password-hash pool
+    storm/inline  logins with bcrypt on the event loop (PASSWORD_HASH_WORKERS=0)
+
+plus the pool's queue-depth metrics. The test user is deleted afterwards.
+
+    cd Backend && python benchmarks/load_login_storm.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+import httpx
+from sqlalchemy import delete
+
+from app.main import app
+from app.lib.db import AsyncSessionLocal, engine
+from app.models import User
+from app.utils.hashing import get_password_hash, password_hash_pool
+
+CONCURRENCY = 32
+PHASE_SECONDS = 5.0
+PROBE_INTERVAL = 0.005
+PASSWORD = "storm-password"
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/api/exams/catalog")
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+async def login_loop(client: httpx.AsyncClient, email: str, stop: asyncio.Event, counts: dict):
+    while not stop.is_set():
+        response = await client.post("/api/login", json={"email": email, "password": PASSWORD})
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_phase(client: httpx.AsyncClient, name: str, email: str = None):
+    stop = asyncio.Event()
+    samples, counts = [], {}
+    tasks = [asyncio.create_task(probe(client, stop, samples))]
+    if email:
+        tasks += [asyncio.create_task(login_loop(client, email, stop, counts)) for _ in range(CONCURRENCY)]
+    await asyncio.sleep(PHASE_SECONDS)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    print(
+        f"{name:<14} probe p50={statistics.median(samples):7.1f} ms  p99={percentile(samples, 99):7.1f} ms"
+        f"  max={max(samples):7.1f} ms  probes={len(samples):5d}  logins={counts}"
+    )
+
+
+async def run():
+    email = f"storm-{time.time_ns()}@example.com"
+    async with AsyncSessionLocal() as db:
+        user = User(name="Storm User", email=email, password_hash=get_password_hash(PASSWORD), role="USER")
+        db.add(user)
+        await db.commit()
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            await client.get("/api/exams/catalog")  # warm the catalog cache
+            await run_phase(client, "baseline")
+            await run_phase(client, "storm/pool", email)
+            print(f"{'':<14} pool metrics: {password_hash_pool.stats()}")
+
+            workers = password_hash_pool.workers
+            password_hash_pool.workers = 0
+            await run_phase(client, "storm/inline", email)
+            password_hash_pool.workers = workers
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.email == email))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())